@@ -26,6 +26,7 @@ class ConnectionManager:
         clients[id(websocket)] = {
             "websocket": websocket,
             "subscriptions": {"data": [], "indicators": []},
+            "protocol": "json",
         }
 
     def disconnect(self, websocket: WebSocket):
@@ -51,15 +52,25 @@ class ConnectionManager:
             "subscriptions"
         ]["data"]
 
+    def set_protocol(self, websocket: WebSocket, protocol: str):
+        if id(websocket) in clients:
+            clients[id(websocket)]["protocol"] = protocol
+
+    def get_protocol(self, websocket: WebSocket) -> str:
+        return clients.get(id(websocket), {}).get("protocol", "json")
+
     def add_indicator_subscription(self, websocket: WebSocket, subscription: dict):
         if id(websocket) in clients:
             clients[id(websocket)]["subscriptions"]["indicators"].append(subscription)
 
 
-async def safe_send_message(websocket: WebSocket, message: str):
+async def safe_send_message(websocket: WebSocket, message: str | bytes):
     try:
         if websocket.client_state == WebSocketState.CONNECTED:
-            await websocket.send_text(message)
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)  # binary protocol frames
+            else:
+                await websocket.send_text(message)
     except WebSocketDisconnect:
         logging.error("Attempted to write to a disconnected WebSocket.")
     except Exception as e:
@@ -10,57 +10,130 @@
 #
 # For full details, see the LICENSE.md file in the root directory of this project.
 
-import pandas as pd
-from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from .globals import lock, historical_data_cache
+import numpy as np
+
+from utils import add_coverage, get_current_date, to_ns
+from .globals import lock, historical_data_cache, candle_files
+from .store import rows_to_columns
+
+# candle files are read and written on this thread, in order, off the event
+# loop and outside of `lock` but for copying the rows
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="candle-files")
 
 
 def update_in_cache(source, name, interval, data):
     cache_key = (source, name, interval)
-    cached_data = historical_data_cache.get(cache_key, None)
-    if cached_data:
+    if cache_key in historical_data_cache:
         with lock:
-            merge_data(source, name, interval, cached_data, data)
+            merge_data(source, name, interval, data)
 
 
-def merge_data(source, name, interval, cached_data, new_klines):
+def merge_data(source, name, interval, new_klines):
     if len(new_klines) == 0:
         return  # nothing to update
 
     cache_key = (source, name, interval)
 
-    new_df = pd.DataFrame(new_klines)
-    new_df.columns = list(new_klines[0].keys())
-    new_df.date = pd.to_datetime(new_df.date)
-    new_df = new_df.set_index("date")
+    dates, values, columns = rows_to_columns(new_klines)
+
+    # Ticks and gap fetches are appended in place, older rows rebuild the series
+    historical_data_cache.merge(cache_key, dates, values, columns)
+
+    if candle_files is not None:
+        persist(cache_key, dates)
+
+
+def persist(cache_key, new_dates):
+    """Write the rows from the new candles on to disk, on the writer thread."""
+    _writer.submit(_persist, cache_key, int(new_dates.min()), int(new_dates.max()))
 
-    # Load cached data into a DataFrame, or create an empty DataFrame if cached_df is not present
-    if "cached_df" not in cached_data or cached_data["cached_df"].empty:
-        cached_df = pd.DataFrame()
-    else:
-        cached_df = cached_data["cached_df"]
 
-    # Single kline update check
-    if len(new_klines) == 1:
-        if not cached_df.empty and cached_df.index[-1] == new_df.index[-1]:
-            cached_df.iloc[-1] = new_df.iloc[-1]
-            cached_data["cached_df"] = cached_df
+def _persist(cache_key, first, last):
+    last_stored = candle_files.last_date(cache_key)
 
-            historical_data_cache[cache_key] = cached_data
+    # The forming candle is stored as of the tick that opened it. Later ticks
+    # of it are not written, it is rewritten once the next candle opens.
+    if last_stored is not None and first >= last_stored and last == last_stored:
+        return
+
+    since = first if last_stored is None else min(first, last_stored)
+
+    with lock:
+        series = historical_data_cache.series(cache_key)
+        if series is None or series.empty:
             return
+        start = 0
+        if candle_files.appends(cache_key, series.columns, since):
+            start = int(np.searchsorted(series.dates, since))
+        dates = series.dates[start:].copy()
+        values = series.values[:, start:].copy()
+        columns = list(series.columns)
+
+    try:
+        candle_files.write(cache_key, dates, values, columns, since)
+    except OSError as e:
+        logging.error(f"Unable to persist candles for {cache_key}: {e}")
+
+
+def _write_coverage(cache_key, coverage):
+    try:
+        candle_files.write_coverage(cache_key, coverage)
+    except OSError as e:
+        logging.error(f"Unable to persist coverage for {cache_key}: {e}")
+
+
+def record_coverage(source, name, interval, start, end):
+    """Remember that the provider was asked for the candles in [start, end]."""
+    cache_key = (source, name, interval)
+    series = historical_data_cache.series(cache_key)
+    if series is None or series.empty:
+        return
+
+    start, end = to_ns(start), to_ns(end)
+    if end >= to_ns(get_current_date(interval)):
+        # the forming candle keeps changing, coverage stops at the last one
+        end = min(end, int(series.dates[-1]))
+    if end < start:
+        return
+
+    coverage = add_coverage(historical_data_cache.coverage(cache_key), start, end)
+    historical_data_cache.set_coverage(cache_key, coverage)
+
+    if candle_files is not None:
+        _writer.submit(_write_coverage, cache_key, coverage)
+
+
+def _load(cache_key):
+    stored = candle_files.load(cache_key)
+    if stored is None:
+        return None, None
+    return stored, candle_files.load_coverage(cache_key)
+
+
+async def restore_from_disk(source, name, interval):
+    """Warm start: load a series stored by a previous run or evicted from memory."""
+    cache_key = (source, name, interval)
+    if candle_files is None or cache_key in historical_data_cache:
+        return
 
-    # Concatenate cached_df and new_df and then drop duplicates, keeping the latest entry
-    merged_df = pd.concat([cached_df, new_df])
-    merged_df = merged_df[~merged_df.index.duplicated(keep="last")]
-    merged_df.sort_index(inplace=True)
+    # read on the writer thread, after the writes queued before
+    loop = asyncio.get_running_loop()
+    stored, coverage = await loop.run_in_executor(_writer, _load, cache_key)
+    if stored is None:
+        return
 
-    # Update the cached data with the merged DataFrame
-    if cache_key not in historical_data_cache:
-        cached_data = {
-            "cached_df": pd.DataFrame(),
-            "last_fetched_time": datetime.now(timezone.utc),
-        }
+    # The last stored candle may have been forming when it was written.
+    # Coverage ends at the candle before it, so the gap fetch refreshes it.
+    dates = stored[0]
+    covered = int(dates[-2]) if len(dates) > 1 else int(dates[0]) - 1
+    coverage = coverage or [[int(dates[0]), covered]]
+    coverage = [[s, min(e, covered)] for s, e in coverage if s <= covered]
 
-    cached_data["cached_df"] = merged_df
-    historical_data_cache[cache_key] = cached_data
+    with lock:
+        if cache_key not in historical_data_cache:
+            historical_data_cache.put(cache_key, *stored, coverage=coverage)
+            logging.info(f"Restored {len(dates)} candles of {cache_key} from disk")
@@ -0,0 +1,73 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import json
+
+import numpy as np
+
+from utils import to_ns
+
+
+def history_slice(series, start=None, end=None, count=None):
+    """
+    Rows of a CandleSeries to send: the last `count` candles, or the candles
+    dated between `start` and `end` (both inclusive). Returns views.
+    """
+    if series is None:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0))
+
+    dates, values = series.dates, series.values
+    if count is not None:
+        return dates[-count:], values[:, -count:]
+
+    lo = 0 if start is None else np.searchsorted(dates, to_ns(start), "left")
+    hi = len(dates) if end is None else np.searchsorted(dates, to_ns(end), "right")
+    return dates[lo:hi], values[:, lo:hi]
+
+
+def format_dates(dates):
+    """int64 ns dates as `%Y-%m-%d %H:%M:%S` strings."""
+    text = np.datetime_as_string(dates.view("datetime64[ns]"), unit="s").tolist()
+    return [date.replace("T", " ") for date in text]
+
+
+def format_values(values):
+    """
+    Floats as JSON numbers, NaN/inf as null. The C encoder of `json.dumps`
+    formats the whole column at once, same digits as the former per-row path.
+    """
+    text = json.dumps(np.asarray(values, dtype=np.float64).tolist())[1:-1]
+    if "N" in text or "I" in text:
+        text = text.replace("NaN", "null").replace("-Infinity", "null")
+        text = text.replace("Infinity", "null")
+    return text.split(", ")
+
+
+def encode_rows(dates, values, columns):
+    """
+    JSON array of `{"date": ..., "<column>": value, ...}` objects, written
+    straight from the columns with one `%` substitution per row, no dicts.
+    """
+    if len(dates) == 0:
+        return "[]"
+
+    fields = "".join(
+        ", " + json.dumps(column).replace("%", "%%") + ": %s" for column in columns
+    )
+    row = '{"date": "%s"' + fields + "}"
+    rows = zip(format_dates(dates), *(format_values(v) for v in values))
+    return "[" + ", ".join(map(row.__mod__, rows)) + "]"
+
+
+def encode_message(message, data_json):
+    """`json.dumps(message)` with an already encoded "data" field."""
+    return json.dumps(message)[:-1] + ', "data": ' + data_json + "}"
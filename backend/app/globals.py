@@ -17,12 +17,22 @@ import db
 from config import Config
 
 from .fetcher import BlockingFetcher
+from .scheduler import PriorityScheduler, parse_limits
+from .persist import CandleFiles
+from .store import CandleStore
 
 dbconn = db.create_connection(Config.DB)
 
 _manager = Manager()
-historical_data_cache = _manager.dict()
-indicator_cache = _manager.dict()
+historical_data_cache = CandleStore(
+    _manager.dict(),
+    compact_rows=int(Config.CANDLE_STORE_COMPACT_ROWS),
+    max_bytes=int(Config.HISTORICAL_CACHE_MAX_MB) * 1024 * 1024,
+    policy=Config.HISTORICAL_CACHE_EVICTION,
+)
+candle_files = (
+    CandleFiles(Config.CANDLE_STORE_PATH) if Config.CANDLE_STORE_PATH else None
+)
 
 last_update = {}
 last_date = {}
@@ -39,3 +49,8 @@ indicator_fetcher = BlockingFetcher(
     int(Config.INDICATOR_WORKERS),
     shared_cache=historical_data_cache,
 )
+indicator_scheduler = PriorityScheduler(
+    indicator_fetcher,
+    int(Config.INDICATOR_WORKERS),
+    parse_limits(Config.INDICATOR_WORKER_LIMITS, int(Config.INDICATOR_WORKERS)),
+)
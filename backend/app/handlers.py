@@ -12,6 +12,7 @@
 
 import logging
 import asyncio
+import math
 from queue import Empty
 from datetime import datetime, timedelta, timezone
 import numpy as np
@@ -23,32 +24,45 @@ from fastapi import WebSocket
 
 from utils import (
     determine_data_needs,
-    get_last_n_items,
-    filter_data,
-    filter_df,
     get_lookback_period,
     get_current_date,
     resource_path,
     generate_method_key,
+    to_ns,
 )
-from cache import cached
+from config import Config
 from db import indicators
-from ga import calculate as ga_calculate
-from .data import update_in_cache, merge_data
+from indicators.data.rolling import shared_windows
+from .data import update_in_cache, merge_data, record_coverage, restore_from_disk
 from .globals import (
     providers,
     clients,
     historical_data_cache,
-    indicator_cache,
     last_update,
     last_date,
     lock,
-    indicator_fetcher,
+    indicator_scheduler,
+)
+from .connection import safe_send_message, conn
+from .encoder import encode_message, encode_rows, history_slice
+from .indicator_dispatch import IndicatorDispatcher
+from .indicator_io import SeriesReader, input_rows, load_inputs
+from .indicator_results import indicator_result
+from .indicator_state import incremental_update, seed_state
+from .indicator_sweep import input_sets, local_sweep, sweep, sweep_message
+from .protocol import encode_series, encode_update
+from .scheduler import LANES
+from .resample import (
+    base_candles_needed,
+    derive_series,
+    derived_base,
+    stop_aggregator,
+    update_derived,
 )
-from .connection import safe_send_message
 from .fetcher import get_shared_cache
 
 futures = {}
+inflight = {}  # (source, name, interval) -> [(start, stop, future)]
 
 
 async def send_historical_data(
@@ -61,17 +75,6 @@ async def send_historical_data(
     metadata=None,
     force_request_data=False,
 ):
-    key = generate_method_key(
-        "send_historical_data",
-        source,
-        name,
-        interval,
-        count,
-        end,
-        r=random.randint(1, 999999),
-    )
-    futures[key] = asyncio.Future()
-
     # count = count if count > 300 else 300 # minimum
     # count += 300 # for indicators
 
@@ -85,7 +88,84 @@ async def send_historical_data(
     else:
         end_dt = datetime.now(timezone.utc)
 
+    base = derived_base(source, interval)
+    if base is None:
+        await load_history(
+            websocket,
+            source,
+            name,
+            interval,
+            count,
+            end,
+            end_dt,
+            metadata,
+            message_type,
+            force_request_data,
+        )
+    else:
+        # intervals the provider does not serve are resampled from a finer one
+        await load_history(
+            websocket,
+            source,
+            name,
+            base,
+            base_candles_needed(interval, base, count),
+            end,
+            end_dt,
+            metadata,
+            message_type,
+            force_request_data,
+        )
+        with lock:
+            derive_series(source, name, interval, base)
+
+    series = historical_data_cache.series((source, name, interval))
+
+    required_start_time = get_lookback_period(interval, end_dt, count)
+    required_end_time = end_dt
+
+    if end == "now UTC":
+        dates, values = history_slice(series, count=count)
+    else:
+        dates, values = history_slice(series, required_start_time, required_end_time)
+        logging.info(f"historical data returned {len(dates)}")
+
+    # written straight from the columns in the client's wire format
+    await safe_send_message(
+        websocket,
+        encode_series(
+            conn.get_protocol(websocket),
+            {
+                "type": message_type,
+                "source": source,
+                "name": name,
+                "interval": interval,
+                "metadata": metadata,
+            },
+            dates,
+            values,
+            series.columns if series else [],
+        ),
+    )
+
+
+async def load_history(
+    websocket: WebSocket,
+    source,
+    name,
+    interval,
+    count,
+    end,
+    end_dt,
+    metadata,
+    message_type,
+    force_request_data=False,
+):
+    """Make sure the cache holds `count` candles till `end_dt`, fetching the gaps."""
     cache_key = (source, name, interval)
+    await restore_from_disk(
+        source, name, interval
+    )  # only the gap is fetched afterwards
     cached_data = historical_data_cache.get(
         cache_key,
         {"cached_df": pd.DataFrame(), "last_fetched_time": datetime.now(timezone.utc)},
@@ -103,170 +183,217 @@ async def send_historical_data(
     required_start_time = get_lookback_period(interval, end_dt, count)
     required_end_time = end_dt
 
-    start_needed, end_needed = determine_data_needs(
-        cached_data, required_start_time, required_end_time
+    # A gap shorter than one candle cannot hold a candle; unless forced, the
+    # forming candle is then left to the stream
+    tolerance = 0
+    if not force_request_data:
+        tolerance = to_ns(required_end_time) - to_ns(
+            get_lookback_period(interval, required_end_time, 1)
+        )
+
+    missing = determine_data_needs(
+        historical_data_cache.coverage(cache_key),
+        required_start_time,
+        required_end_time,
+        tolerance,
     )
 
-    if force_request_data or (
-        not request_recent_data_and_has_last_date and (start_needed or end_needed)
-    ):
-        date_format = "%Y-%m-%d %H:%M:%S"  # "%d %b %Y %H:%M:%S"
-        start_time_query = (
-            start_needed.strftime(date_format)
-            if start_needed or cached_data["cached_df"].empty
-            else cached_data["cached_df"].index[-1].strftime(date_format)
-        )
-        # Update only the last candle if end_needed and we have cached data covering up to the latest full candle
-        if end_needed and not cached_data["cached_df"].empty:
-            last_cached_time = cached_data["cached_df"].index[-1]
-            start_time_query = last_cached_time.strftime(date_format)
-        end_time_query = (
-            end_dt.strftime(date_format)
-            if end_needed
-            else required_end_time.strftime(date_format)
+    if force_request_data or (not request_recent_data_and_has_last_date and missing):
+        logging.info(f"Waiting for response from provider for {len(missing)} ranges")
+        await asyncio.gather(
+            *[
+                fetch_history(
+                    websocket,
+                    source,
+                    name,
+                    interval,
+                    start,
+                    stop,
+                    end if end == "now UTC" and stop == to_ns(end_dt) else None,
+                    count,
+                    metadata,
+                    message_type,
+                )
+                for start, stop in missing
+            ]
         )
+    else:
+        logging.debug("hit the cache")
 
-        if end == "now UTC":
-            end_time_query = end
 
-        logging.info(f"Waiting for response from provider")
-        providers[source].request(
-            {
-                "action": "get_history",
-                "args": (name, interval, start_time_query, end_time_query, count),
-                "source": source,
-                "name": name,
-                "interval": interval,
-                "metadata": metadata,
-                "count": count,
-                "end": end,
-                "message_type": message_type,
-                "ws_client": id(websocket),
-                "range": [required_start_time, required_end_time],
-                "future_key": key,
-            }
-        )
+async def fetch_history(
+    websocket: WebSocket,
+    source,
+    name,
+    interval,
+    start,
+    stop,
+    end_query,
+    count,
+    metadata,
+    message_type,
+):
+    """
+    Ask the provider for the candles between `start` and `stop` (ns) and
+    wait until they are merged into the cache. `end_query` overrides the end
+    of the provider query, e.g. "now UTC".
 
-        if key in futures:
-            await futures[key]
-            del futures[key]
+    Concurrent fetches are coalesced: a range already being fetched for the
+    series is awaited instead of requested again.
+    """
+    flights = inflight.setdefault((source, name, interval), [])
+    for flight_start, flight_stop, future in flights:
+        if flight_start <= start and stop <= flight_stop:
+            logging.debug(f"joined in-flight history fetch of {source} {name}")
+            await asyncio.shield(future)
+            return
 
-    else:
-        downloaded = 0
-        logging.debug("hit the cache")
-        if end == "now UTC":
-            data_to_return = get_last_n_items(cached_data, count)
-        else:
-            data_to_return = filter_data(
-                cached_data, required_start_time, required_end_time
-            )
-            logging.info(
-                f"historical data downloaded {downloaded} returned {len(data_to_return)}"
-            )
+    key = generate_method_key(
+        "fetch_history",
+        source,
+        name,
+        interval,
+        start,
+        stop,
+        r=random.randint(1, 999999),
+    )
+    future = futures[key] = asyncio.Future()
 
-        await safe_send_message(
-            websocket,
-            json.dumps(
-                {
-                    "type": message_type,
-                    "source": source,
-                    "name": name,
-                    "interval": interval,
-                    "data": data_to_return,
-                    "metadata": metadata,
-                }
-            ),
-        )
+    # a fetch up to "now UTC" serves any request that ends before it lands
+    flight = (start, math.inf if end_query == "now UTC" else stop, future)
+    flights.append(flight)
 
-        if key in futures:
-            if not futures[key].done():
-                futures[key].set_result("Done!")
-            del futures[key]
+    def land(_):
+        futures.pop(key, None)
+        flights.remove(flight)
+        if not flights and inflight.get((source, name, interval)) is flights:
+            del inflight[(source, name, interval)]
 
+    future.add_done_callback(land)
 
-async def _do_indicator(
-    ws,
-    fetcher,
-    message_type: str,
-    id_: str,
-    indicator: dict,
-    inputs: dict,
-    data_map: dict,
-    range: int | None = None,
-    count: int = 600,
-) -> None:
+    date_format = "%Y-%m-%d %H:%M:%S"  # "%d %b %Y %H:%M:%S"
+    start_time_query = pd.Timestamp(start).strftime(date_format)
+    end_time_query = end_query or pd.Timestamp(stop).strftime(date_format)
+
+    providers[source].request(
+        {
+            "action": "get_history",
+            "args": (name, interval, start_time_query, end_time_query, count),
+            "source": source,
+            "name": name,
+            "interval": interval,
+            "metadata": metadata,
+            "count": count,
+            "end": end_time_query,
+            "message_type": message_type,
+            "ws_client": id(websocket),
+            "range": [start, stop],
+            "future_key": key,
+        }
+    )
+
+    # shielded, a waiter going away must not cancel the fetch for the others
+    await asyncio.shield(future)
+
+
+async def _do_indicators(ws, fetcher, message_type: str, specs: list) -> None:
     """
-    Runs `send_indicator_data(...)` in the process pool and pushes its result
-    back to *this* websocket.
+    Runs `send_indicator_batch(...)` in the process pool and pushes its
+    results back to *this* websocket.
     """
-    result = await fetcher.fetch(
-        send_indicator_data,
-        (
-            message_type,
-            id_,
-            indicator,
-            inputs,
-            data_map,
-            range,
-            count,
-        ),
-    )
-    await safe_send_message(ws, result)
+    results = await fetcher.fetch(send_indicator_batch, (message_type, specs))
+    for result in results:
+        if result is not None:
+            await safe_send_message(ws, result)
 
 
-def _is_fresh(payload, args, kwargs):
-    indicator = args[2]
-    has_update_on_close = (
-        "update_on" in indicator["details"]
-        and indicator["details"]["update_on"] == "close"
+async def _do_indicator_sweep(ws, fetcher, d: dict) -> None:
+    """
+    Evaluates one indicator over many input sets, across the process pool,
+    and pushes the 2-D result back to *this* websocket.
+    """
+    try:
+        await _indicator_sweep(ws, fetcher, d)
+    except Exception as e:
+        logging.error(f"Error in indicator sweep {d.get('id')}: {e}")
+        await safe_send_message(
+            ws, json.dumps({"type": "notification", "message": f"Error: {e}"})
+        )
+
+
+async def _indicator_sweep(ws, fetcher, d):
+    indicator = d.get("indicator") or {}
+    if indicator.get("id") not in indicators:
+        raise ValueError(f"unknown indicator {indicator.get('id')}")
+    if not d.get("range") and not d.get("count"):
+        raise ValueError("indicator_sweep needs a range or a count")
+    sets = input_sets(d.get("inputs"), d.get("grid"))
+
+    output = d.get("output") or indicators[indicator["id"]]["klass"].outputs[0]["name"]
+    result = await sweep(
+        fetcher,
+        int(Config.INDICATOR_WORKERS),
+        indicator,
+        d.get("dataMap"),
+        sets,
+        output,
+        d.get("range"),
+        d.get("count"),
     )
-    if not has_update_on_close:
-        return False
-
-    payload_json = json.loads(payload)
-    has_cache = payload_json.get("data", None) and len(payload_json["data"]) > 0
-    if not has_cache:
-        return False
-
-    historical_data_cache = get_shared_cache()
-    data_map = args[4]
-    for output, datasource in data_map.items():
-        source = datasource["source"]
-        name = datasource["name"]
-        interval = datasource["interval"]
-        cache_key = (source, name, interval)
-        cached_data = historical_data_cache.get(cache_key, None)
-        has_df = cache_key is not None and not cached_data["cached_df"].empty
-        if has_df:
-
-            last_date_in_system = (
-                cached_data["cached_df"].index[-1].strftime("%Y-%m-%d %H:%M:%S")
-            )
-            if (
-                "last_dates" in payload_json
-                and f"{source}-{name}-{interval}" in payload_json["last_dates"]
-            ):
-                last_date_in_cache = payload_json["last_dates"][
-                    f"{source}-{name}-{interval}"
-                ]
-                if str(last_date_in_system) == str(last_date_in_cache):
-                    pass
-                else:
-                    return False
-            else:
-                # print(f"last dates do not have key {source}-{name}-{interval}")
-                return False
-        else:
-            # print("does not have DF in cache")
-            return False
+    if result is None:
+        await safe_send_message(ws, json.dumps({"type": "no_data", "id": d.get("id")}))
+        return
 
-    return True
+    dates, rows = result
+    message = sweep_message(
+        d.get("id"),
+        indicator,
+        output,
+        sets,
+        dates,
+        rows,
+        d.get("range"),
+        d.get("count"),
+    )
+    await safe_send_message(ws, message)
 
 
-@cached(maxsize=100, ttl=60 * 20, validator=_is_fresh, shared_dict=indicator_cache)
 def send_indicator_data(
     message_type, id, indicator, inputs, data_map, range=None, count=600
 ):
+    return send_indicator_batch(
+        message_type, [(id, indicator, inputs, data_map, range, count)]
+    )[0]
+
+
+def send_indicator_batch(message_type, specs):
+    """
+    `send_indicator_data` for several `(id, indicator, inputs, data_map,
+    range, count)` in one worker call: every series is read from the shared
+    cache once, the inputs of every data map built once, and the rolling
+    windows shared. Returns the
+    messages in the order of `specs`.
+    """
+    cache = SeriesReader(get_shared_cache())
+    loaded = {}
+    messages = []
+    with shared_windows():
+        for spec in specs:
+            try:
+                messages.append(_indicator_message(message_type, *spec, cache, loaded))
+            except Exception as e:
+                logging.error(f"Error calculating indicator {spec[1].get('id')}: {e}")
+                messages.append(None)
+    return messages
+
+
+def _indicator_message(
+    message_type, id, indicator, inputs, data_map, range, count, cache, loaded
+):
+    if message_type == "indicator_update":
+        update = incremental_update(id, indicator, inputs, data_map)
+        if update is not None:
+            return update
 
     length = 0
     if "length" in inputs:
@@ -276,169 +403,153 @@ def send_indicator_data(
     ):  # case when there is no length, we need to calculate from the whole dataset
         count = 300
 
-    last_dates = {}
-
-    df = pd.DataFrame()
-    for output, datasource in data_map.items():
-        source = datasource["source"]
-        name = datasource["name"]
-        interval = datasource["interval"]
-        column = datasource["value"]
-        cache_key = (source, name, interval)
-        historical_data_cache = get_shared_cache()
-        cached_data = historical_data_cache.get(cache_key, None)
-        if cached_data is None or (
-            cache_key is not None and cached_data["cached_df"].empty
-        ):
-            return json.dumps({"type": "no_data", "id": id})
-
-        last_dates[f"{source}-{name}-{interval}"] = (
-            cached_data["cached_df"]
-            .index[-1]
-            .to_pydatetime()
-            .strftime("%Y-%m-%d %H:%M:%S")
-        )
-
-        if range:
-            f = datetime.strptime(range[0], "%Y-%m-%d %H:%M:%S")
-            t = (
-                cached_data["cached_df"].index[-1].to_pydatetime()
-            )  # datetime.strptime(range[1], "%Y-%m-%d %H:%M:%S")
-
-            # abs_difference = np.abs(cached_data['cached_df'].index.to_pydatetime() - f)
-            # index_from = np.argmin(abs_difference)
-            # index_from -= (length * 2)
-            # if index_from < 0: index_from = 0
-            index_from = 0
+    key = json.dumps(data_map, sort_keys=True)
+    if key not in loaded:
+        loaded[key] = load_inputs(cache, data_map, range, count)
+    if loaded[key] is None:
+        return json.dumps({"type": "no_data", "id": id})
 
-            abs_difference = np.abs(cached_data["cached_df"].index.to_pydatetime() - t)
-            index_to = np.argmin(abs_difference)
-
-            idf = cached_data["cached_df"].iloc[index_from : index_to + 1]
-            idf = pd.DataFrame(
-                [[index, float(row[column])] for index, row in idf.iterrows()]
-            )
-
-        elif count:
-            # idf = pd.DataFrame(
-            #     [[index, float(row[column])] for index, row in cached_data['cached_df'].tail(count + (length*2)).iterrows()]
-            # )
-            idf = pd.DataFrame(
-                [
-                    [index, float(row[column])]
-                    for index, row in cached_data["cached_df"].iterrows()
-                ]
-            )
-        else:
-            logging.error(f"Error: range nor count found in your request")
-            continue
-        idf.columns = ["Date", column]
-        if df.empty:
-            df = idf
-        else:
-            df = pd.merge(df, idf, on=["Date"], how="inner")
-
-    if df.empty:
+    dates, columns, last_dates, versions = loaded[key]
+    if len(dates) == 0:
         logging.error("Error: No data?")
         return
 
-    df["Date"] = df["Date"].dt.strftime("%Y-%m-%d %H:%M:%S")
-
     cls = indicators[indicator["id"]]["klass"]
     obj = cls()
 
     try:
-        ret = obj.calc(df.values, **inputs)
-
-        # Accept either a single object or a (outputs, annotations) tuple.
-        if isinstance(ret, tuple):
-            outputs = ret[0]
-            annotations = ret[1] if len(ret) > 1 else None
-        else:
-            outputs = ret
-            annotations = None
+        (index, names, values, annotations, rows), (lo, hi), start = indicator_result(
+            obj,
+            indicator,
+            data_map,
+            dates,
+            columns,
+            versions,
+            inputs,
+            (message_type, inputs, range, count),
+        )
     except Exception as e:
         logging.error(f"Error calculating indicator: {e}")
         return None
 
-    df = pd.DataFrame()
-    for i, output_description in enumerate(obj.outputs):
-        if "multi" in output_description and output_description["multi"]:
-            for output_description_with_data in outputs[i]:
-                idf = pd.DataFrame(output_description_with_data["data"])
-                if not idf.empty:
-                    idf.columns = [
-                        "date",
-                        f"{id}-{output_description['name']}-{output_description_with_data['name']}",
-                    ]
-                    if df.empty:
-                        df = idf
-                    else:
-                        df = pd.merge(df, idf, on=["date"], how="outer")
-        else:
-            output = outputs[i]
-            idf = pd.DataFrame(output)
-            if not idf.empty:
-                idf.columns = ["date", f"{id}-{output_description['name']}"]
-                if df.empty:
-                    df = idf
-                else:
-                    df = pd.merge(df, idf, on=["date"], how="outer")
-
-    df = df.replace([np.inf, -np.inf], np.nan)
-    df = df.astype(object).where(pd.notnull(df), None)
-    # df = df.dropna()
+    names = [f"{id}-{name}" for name in names]
+    data_json = encode_rows(index[lo:hi], values[:, lo:hi], names)
 
+    message = {
+        "type": message_type,
+        "id": id,
+        "annotations": annotations,
+        "last_dates": last_dates,
+    }
     if message_type == "indicator_update":
-        if len(df) == 0:  # no update
-            data = {}
-        else:
-            data = df.to_dict(orient="records")[-1]
-        return json.dumps(
-            {
-                "type": message_type,
-                "id": id,
-                "data": data,
-                "annotations": annotations,
-                "last_dates": last_dates,
-            }
-        )
+        data_json = data_json[1:-1] or "{}"  # the last record, not a list
+        if lo < hi:
+            if rows is None:
+                rows = input_rows(dates[start:], [c[start:] for c in columns])
+            seed_state(id, indicator, inputs, data_map, rows, json.loads(data_json))
 
-    else:
-        X = 0
-        if "length" in inputs:
-            X = int(inputs["length"])
-        Y = 0  # select from the end
-
-        if range:
-            last_dt = df["date"].iat[-1]
-            end_date = (
-                last_dt
-                if not df.empty
-                else datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return encode_message(message, data_json)
+
+
+indicator_dispatcher = IndicatorDispatcher(
+    indicator_scheduler.lane(LANES["indicator_update"]), send_indicator_batch
+)
+
+
+async def dispatch_data_update(ws_client_key, source, name, interval, message):
+    """Send a streamed update to a client."""
+    key = (source, name, interval)
+    last_update[key] = datetime.now(timezone.utc)
+
+    data = json.loads(message)
+    protocol = clients[ws_client_key].get("protocol", "json")
+    if protocol != "json" and data["type"] == "data_update":
+        message = encode_update(protocol, data)
+
+    await safe_send_message(clients[ws_client_key]["websocket"], message)
+
+
+def _request_indicator_updates(ws_client_key, source, name, interval, is_new_date):
+    """Queue the updates of the client's indicators that use the series."""
+    for indicator in clients[ws_client_key]["subscriptions"]["indicators"]:
+        if indicator.get("indicator").get("details").get("update_on", None) == "close":
+            if not is_new_date:
+                continue
+
+        for d in indicator.get("dataMap").values():
+            if (
+                d["source"] == source
+                and d["name"] == name
+                and d["interval"] == interval
+            ):
+                indicator_dispatcher.request(
+                    clients[ws_client_key]["websocket"],
+                    indicator.get("id"),
+                    indicator.get("indicator"),
+                    indicator.get("inputs"),
+                    indicator.get("dataMap"),
+                )
+                break  # update once
+
+
+def dispatch_indicator_updates(ws_client_keys, source, name, interval, message):
+    """
+    Refresh the indicators of the clients that depend on a streamed series,
+    every unique indicator being computed once for all of them.
+    """
+    key = (source, name, interval)
+    data = json.loads(message)
+    is_new_date = True
+    if data["type"] == "data_update":
+        current_date = data["data"]["date"]
+        if key in last_date:
+            is_new_date = last_date[key] != current_date
+        last_date[key] = current_date
+
+    for ws_client_key in ws_client_keys:
+        if ws_client_key in clients:
+            _request_indicator_updates(
+                ws_client_key, source, name, interval, is_new_date
             )
-            df.date = pd.to_datetime(df.date)
-            df = df.set_index("date")
-            df = filter_df(df, range[0], end_date)  # range[1]
-        else:
-            # count
-            Y = count
-
-        if len(df) == 0:  # no update
-            data = []
-        else:
-            # df_sorted = df.sort_values(by='date').reset_index(drop=True)
-            data = df.to_dict(orient="records")[X:][-Y:]
-
-        return json.dumps(
+    indicator_dispatcher.flush()
+
+
+async def send_derived_updates(source, name, base, new_klines):
+    """Stream the intervals resampled from an updated base series."""
+    with lock:
+        updates = update_derived(source, name, base, new_klines)
+
+    if updates:
+        # derived subscribers are not known to the provider
+        last_update[(source, name, base)] = datetime.now(timezone.utc)
+
+    for interval, datapoint in updates.items():
+        key = (source, name, interval)
+        subscribers = [
+            ws_client_key
+            for ws_client_key, c in clients.items()
+            if key in c["subscriptions"]["data"]
+        ]
+
+        if not subscribers:
+            if stop_aggregator(source, name, interval, base):
+                providers[source].request(
+                    {"action": "on_close", "args": (None, name, base)}
+                )
+            continue
+
+        message = json.dumps(
             {
-                "type": message_type,
-                "id": id,
-                "data": data,
-                "annotations": annotations,
-                "last_dates": last_dates,
+                "type": "data_update",
+                "source": source,
+                "name": name,
+                "interval": interval,
+                "data": datapoint,
             }
         )
+        for ws_client_key in subscribers:
+            await dispatch_data_update(ws_client_key, source, name, interval, message)
+        dispatch_indicator_updates(subscribers, source, name, interval, message)
 
 
 async def handle_message_from_provider(provider):
@@ -452,59 +563,20 @@ async def handle_message_from_provider(provider):
             if message["action"] == "write_message":
                 for ws_client_key in message["ws_clients"]:
                     if ws_client_key in clients:
-                        source = message["source"]
-                        name = message["name"]
-                        interval = message["interval"]
-
-                        key = (source, name, interval)
-                        last_update[key] = datetime.now(timezone.utc)
-
-                        await safe_send_message(
-                            clients[ws_client_key]["websocket"], *message["args"]
+                        await dispatch_data_update(
+                            ws_client_key,
+                            message["source"],
+                            message["name"],
+                            message["interval"],
+                            *message["args"],
                         )
-
-                        data = json.loads(message["args"][0])
-                        is_new_date = True
-                        if data["type"] == "data_update":
-                            current_date = data["data"]["date"]
-                            if key in last_date:
-                                is_new_date = last_date[key] != current_date
-                            last_date[key] = current_date
-
-                        for indicator in clients[ws_client_key]["subscriptions"][
-                            "indicators"
-                        ]:
-                            update = True
-                            if (
-                                indicator.get("indicator")
-                                .get("details")
-                                .get("update_on", None)
-                                == "close"
-                            ):
-                                if not is_new_date:
-                                    update = False
-
-                            if update:
-                                for key, d in indicator.get("dataMap").items():
-                                    if (
-                                        d["source"] == source
-                                        and d["name"] == name
-                                        and d["interval"] == interval
-                                    ):
-                                        asyncio.create_task(
-                                            _do_indicator(
-                                                clients[ws_client_key]["websocket"],
-                                                indicator_fetcher,
-                                                "indicator_update",
-                                                indicator.get("id"),
-                                                indicator.get("indicator"),
-                                                indicator.get("inputs"),
-                                                indicator.get("dataMap"),
-                                                None,  # range
-                                                1,  # count
-                                            )
-                                        )
-                                        break  # update once
+                dispatch_indicator_updates(
+                    message["ws_clients"],
+                    message["source"],
+                    message["name"],
+                    message["interval"],
+                    *message["args"],
+                )
 
             elif message["action"] == "data_update_merge":
                 for ws_client_key in message["ws_clients"]:
@@ -577,89 +649,33 @@ async def handle_message_from_provider(provider):
                                 ),
                             )
 
-                        for indicator in clients[ws_client_key]["subscriptions"][
-                            "indicators"
-                        ]:
-                            for key, d in indicator.get("dataMap").items():
-                                if (
-                                    d["source"] == source
-                                    and d["name"] == name
-                                    and d["interval"] == interval
-                                ):
-
-                                    asyncio.create_task(
-                                        _do_indicator(
-                                            clients[ws_client_key]["websocket"],
-                                            indicator_fetcher,
-                                            "indicator_update",  # ⟵ message_type
-                                            indicator.get("id"),
-                                            indicator.get("indicator"),
-                                            indicator.get("inputs"),
-                                            indicator.get("dataMap"),
-                                            None,  # range
-                                            1,  # count
-                                        )
-                                    )
+                        _request_indicator_updates(
+                            ws_client_key, source, name, interval, True
+                        )
+                indicator_dispatcher.flush()
 
             elif message["action"] == "history":
-                if message["ws_client"] in clients:
-                    new_klines = message["new_klines"]
-                    downloaded = len(new_klines)
-
-                    cache_key = (
+                # send_historical_data answers the client from the cache
+                # once all of its missing ranges are merged
+                logging.info(f"historical data downloaded {len(message['new_klines'])}")
+                with lock:
+                    merge_data(
                         message["source"],
                         message["name"],
                         message["interval"],
+                        message["new_klines"],
                     )
-                    cached_data = historical_data_cache.get(
-                        cache_key,
-                        {
-                            "cached_df": pd.DataFrame(),
-                            "last_fetched_time": datetime.now(timezone.utc),
-                        },
-                    )
-
-                    with lock:
-                        merge_data(
+                    if not message.get("error"):
+                        record_coverage(
                             message["source"],
                             message["name"],
                             message["interval"],
-                            cached_data,
-                            new_klines,
-                        )
-
-                    cached_data = historical_data_cache.get(cache_key)
-
-                    required_start_time = message["range"][0]
-                    required_end_time = message["range"][1]
-
-                    if message["end"] == "now UTC":
-                        data_to_return = get_last_n_items(cached_data, message["count"])
-                    else:
-                        data_to_return = filter_data(
-                            cached_data, required_start_time, required_end_time
-                        )
-                        logging.info(
-                            f"historical data downloaded {downloaded} returned {len(data_to_return)}"
-                        )
-
-                    if message["ws_client"] in clients:
-                        m = json.dumps(
-                            {
-                                "type": message["message_type"],
-                                "source": message["source"],
-                                "name": message["name"],
-                                "interval": message["interval"],
-                                "metadata": message["metadata"],
-                                "data": data_to_return,
-                            }
-                        )
-                        await safe_send_message(
-                            clients[message["ws_client"]]["websocket"], m
+                            *message["range"],
                         )
 
             elif message["action"] == "update_in_cache":
                 update_in_cache(*message["args"])
+                await send_derived_updates(*message["args"])
 
             else:
                 logging.info(f"Unknown action: {message['action']}")
@@ -718,6 +734,8 @@ def optimize_indicator_params(
     history,
     data_provider_config,
 ):
+    from ga import calculate as ga_calculate  # pygad, only when optimizing
+
     best_fitness, inputs = ga_calculate(
         strategy,
         settings,
@@ -728,6 +746,7 @@ def optimize_indicator_params(
         data_map,
         history,
         data_provider_config["full_url"],
+        _generation_sweep(indicator, data_map, history),
     )
     message = json.dumps(
         {
@@ -739,3 +758,24 @@ def optimize_indicator_params(
         }
     )
     return message
+
+
+def _generation_sweep(indicator, data_map, history):
+    """
+    `sweep(input_sets, output)` for the GA: the `indicator_sweep` message of
+    the last `history` candles as a dict, None without data. It is computed
+    in the GA's worker, as a sweep request would wait for a worker the GA
+    may be holding.
+    """
+
+    def run(sets, output):
+        result = local_sweep(indicator, data_map, sets, output, count=history)
+        if result is None:
+            return None
+        dates, rows = result
+        message = sweep_message(
+            indicator["id"], indicator, output, sets, dates, rows, count=history
+        )
+        return json.loads(message)
+
+    return run
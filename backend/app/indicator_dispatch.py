@@ -0,0 +1,133 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Streamed indicator updates, computed once per unique indicator and sent to
+all of its subscribers.
+"""
+
+import json
+import asyncio
+import logging
+
+from .connection import safe_send_message
+from .indicator_io import data_series, indicator_key
+
+# id the shared updates are computed for, replaced by the id every client
+# gave the indicator
+SHARED_ID = "__indicator__"
+
+
+def with_id(payload, id):
+    """An update computed for `SHARED_ID`, for the indicator `id`."""
+    payload = payload.replace(json.dumps(SHARED_ID), json.dumps(id))
+    # the output columns are named f"{id}-{name}"
+    return payload.replace(f'"{SHARED_ID}-', json.dumps(f"{id}-")[:-1])
+
+
+class IndicatorDispatcher:
+    """
+    Runs `compute_batch(message_type, specs)` in the `fetcher`, a scheduler
+    lane, once per (indicator id, inputs, data map) and sends every result to
+    all the subscribers of the indicator. Indicators reading the same series
+    are computed in one worker call.
+
+    Updates are latest-wins per subscription. A tick arriving while its
+    indicator waits for a worker is served by that job, which reads the
+    candles once it starts. Ticks arriving while it is computed are
+    coalesced: it runs once more afterwards, over the latest candles, and
+    the subscribers waiting for that run are not sent the stale result.
+    """
+
+    def __init__(self, fetcher, compute_batch):
+        self._fetcher = fetcher
+        self._compute_batch = compute_batch
+        self._running = set()  # keys queued or computed
+        # key -> batch entry of the jobs not admitted to a worker yet
+        self._queued = {}
+        # key -> (indicator, inputs, data map, {(websocket id, id): websocket})
+        self._pending = {}
+        # requested: updates asked for, computed: indicators computed,
+        # superseded: updates a newer tick took over before they ran,
+        # dropped: stale results not sent
+        self._counts = dict.fromkeys(
+            ("requested", "computed", "superseded", "dropped"), 0
+        )
+
+    def request(self, websocket, id_, indicator, inputs, data_map):
+        """Ask for an update of the indicator `id_` of a client, see `flush`."""
+        key = indicator_key(indicator, inputs, data_map)
+        if key in self._queued:
+            entry = self._queued[key]
+        else:
+            entry = self._pending.setdefault(key, (indicator, inputs, data_map, {}))
+
+        subscriber = (id(websocket), id_)
+        self._counts["requested"] += 1
+        if subscriber in entry[3]:
+            self._counts["superseded"] += 1
+        entry[3][subscriber] = websocket
+
+    def stats(self):
+        return dict(self._counts)
+
+    def flush(self):
+        """Start computing the requested indicators that are not running."""
+        batches = {}
+        for key in list(self._pending):
+            if key not in self._running:
+                data_map = self._pending[key][2]
+                batch = batches.setdefault(data_series(data_map), {})
+                batch[key] = self._pending.pop(key)
+
+        for batch in batches.values():
+            # requests from now on join the batch until a worker admits it
+            self._running.update(batch)
+            self._queued.update(batch)
+            asyncio.create_task(self._run(batch))
+
+    async def _run(self, batch):
+        specs = [
+            (SHARED_ID, indicator, inputs, data_map, None, 1)  # range, count
+            for indicator, inputs, data_map, _ in batch.values()
+        ]
+
+        def admitted():
+            for key in batch:
+                self._queued.pop(key, None)
+
+        try:
+            payloads = await self._fetcher.fetch(
+                self._compute_batch, ("indicator_update", specs), admitted
+            )
+        except Exception as e:
+            logging.error(f"Error updating indicators {list(batch)}: {e}")
+            payloads = [None] * len(batch)
+        finally:
+            admitted()
+            self._running.difference_update(batch)
+        self._counts["computed"] += len(batch)
+
+        # subscribers with a newer tick wait for the next run
+        sends = []
+        for key, payload in zip(batch, payloads):
+            newer = self._pending[key][3] if key in self._pending else {}
+            for subscriber, websocket in batch[key][3].items():
+                if subscriber in newer:
+                    self._counts["dropped"] += 1
+                elif payload is not None:
+                    sends.append(
+                        safe_send_message(websocket, with_id(payload, subscriber[1]))
+                    )
+        self.flush()  # ticks that came in meanwhile
+
+        await asyncio.gather(*sends)
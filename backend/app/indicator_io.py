@@ -0,0 +1,273 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Indicator inputs straight from the candle columns of the shared cache, and
+their outputs aligned as columns for encoding.
+"""
+
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from utils import to_ns
+from .encoder import format_dates
+
+
+def indicator_key(indicator, inputs, data_map):
+    """Key of an indicator computation: indicator id, inputs and data map."""
+    return (
+        indicator["id"],
+        json.dumps(inputs, sort_keys=True),
+        json.dumps(data_map, sort_keys=True),
+    )
+
+
+def data_series(data_map):
+    """The `(source, name, interval)` series a data map reads, sorted."""
+    return tuple(
+        sorted({(d["source"], d["name"], d["interval"]) for d in data_map.values()})
+    )
+
+
+def align(dates, other):
+    """
+    Positions in `dates` and in `other` (both sorted, unique) of the dates
+    they share, located with `searchsorted`.
+    """
+    pos = np.searchsorted(other, dates)
+    found = pos < len(other)
+    found[found] = other[pos[found]] == dates[found]
+    return np.flatnonzero(found), pos[found]
+
+
+class SeriesReader:
+    """`cache.series` reading every series once, for a batch of indicators."""
+
+    def __init__(self, cache):
+        self._cache = cache
+        self._series = {}
+
+    def series(self, key):
+        if key not in self._series:
+            self._series[key] = self._cache.series(key)
+        return self._series[key]
+
+
+def load_inputs(cache, data_map, range=None, count=None):
+    """
+    The bars shared by the datasources of `data_map`: `(dates, columns,
+    last_dates, versions)` with int64 dates, one float64 array per datasource
+    (in data map order), the last cached date and the `(segment, version)`
+    of every series. None when a series is not cached.
+    """
+    dates = None
+    columns = []
+    last_dates = {}
+    versions = []
+    for datasource in data_map.values():
+        source = datasource["source"]
+        name = datasource["name"]
+        interval = datasource["interval"]
+        series = cache.series((source, name, interval))
+        if series is None or series.empty:
+            return None
+
+        last_dates[f"{source}-{name}-{interval}"] = format_dates(series.dates[-1:])[0]
+        versions.append((series.segment, series.version))
+
+        if not range and not count:
+            logging.error("Error: range nor count found in your request")
+            continue
+
+        # the whole series is used in both modes, the lookback of the
+        # indicator needs the history before the range
+        column = series.column(datasource["value"])
+        if dates is None:
+            dates = series.dates
+            columns.append(column)
+            continue
+
+        # inner join on the dates
+        left, right = align(dates, series.dates)
+        dates = dates[left]
+        columns = [c[left] for c in columns]
+        columns.append(column[right])
+
+    if dates is None:
+        return np.empty(0, dtype=np.int64), [], last_dates, tuple(versions)
+
+    dates = np.array(dates, dtype=np.int64)
+    columns = [np.array(c, dtype=np.float64) for c in columns]
+    return dates, columns, last_dates, tuple(versions)
+
+
+def input_rows(dates, columns):
+    """Rows for `Indicator.calc`: `[date string, value, ...]`."""
+    rows = np.empty((len(dates), 1 + len(columns)), dtype=object)
+    rows[:, 0] = format_dates(dates)
+    for i, column in enumerate(columns):
+        rows[:, 1 + i] = column.tolist()
+    return rows
+
+
+def _output_dates(dates):
+    try:
+        return np.array(dates, dtype="datetime64[ns]").view(np.int64)
+    except (TypeError, ValueError):
+        return (
+            pd.to_datetime(pd.Series(dates)).to_numpy("datetime64[ns]").view(np.int64)
+        )
+
+
+def _output_values(values):
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(np.float64)
+
+
+def output_columns(descriptions, outputs, dates=None):
+    """
+    Outputs of an indicator aligned on one sorted int64 index, the union of
+    their dates: `(index, names, values)` with `values` of shape
+    `(len(names), len(index))`. Names are those of the outputs, `multi` parts
+    as `output-part`; messages prefix them with the indicator's id.
+
+    `outputs` are arrays aligned with `dates` (`calc_arrays`), or else lists
+    of `[date, value]` pairs, `multi` outputs being lists of
+    `{"name": ..., "data": [[date, value], ...]}`. Empty outputs are left
+    out.
+    """
+    if dates is not None:
+        names = [d["name"] for d in descriptions]
+        values = np.array(outputs, dtype=np.float64).reshape(len(names), len(dates))
+        return np.asarray(dates, dtype=np.int64), names, values
+
+    names, series = [], []
+    for description, output in zip(descriptions, outputs):
+        if description.get("multi"):
+            parts = [
+                (f"{description['name']}-{part['name']}", part["data"])
+                for part in output
+            ]
+        else:
+            parts = [(description["name"], output)]
+
+        for name, pairs in parts:
+            if len(pairs) == 0:
+                continue
+            pairs = list(zip(*pairs))
+            names.append(name)
+            series.append((_output_dates(pairs[0]), _output_values(pairs[1])))
+
+    if not series:
+        return np.empty(0, dtype=np.int64), [], np.empty((0, 0))
+
+    index = series[0][0]
+    if any(
+        len(d) != len(index) or not np.array_equal(d, index) for d, _ in series[1:]
+    ) or np.any(np.diff(index) <= 0):
+        index = np.unique(np.concatenate([d for d, _ in series]))
+
+    values = np.full((len(series), len(index)), np.nan)
+    for i, (output_dates, output_values) in enumerate(series):
+        if output_dates is index:
+            values[i] = output_values
+        else:
+            values[i, np.searchsorted(index, output_dates)] = output_values
+    return index, names, values
+
+
+def select_rows(index, message_type, inputs, range=None, count=None):
+    """
+    Positions `(lo, hi)` of the output rows to send: the last one for an
+    update, otherwise the rows in the range or the last `count`, without
+    the first `length` ones.
+    """
+    n = len(index)
+    if message_type == "indicator_update":
+        return max(n - 1, 0), n
+
+    skip = int(inputs["length"]) if "length" in inputs else 0
+    if range:
+        lo = int(np.searchsorted(index, to_ns(range[0]), "left"))
+        return min(lo + skip, n), n
+
+    lo = min(skip, n)
+    if count:
+        lo = max(lo, n - count)
+    return lo, n
+
+
+def warmup_start(warmup, dates, message_type, inputs, range=None, count=None):
+    """
+    First input row the requested output rows need, given the `warmup` of
+    the indicator; 0 for the whole history.
+    """
+    if warmup is None:
+        return 0
+
+    if range:
+        lo = int(np.searchsorted(dates, to_ns(range[0]), "left"))
+        return max(lo - warmup, 0)
+
+    if message_type == "indicator_update":
+        needed = 1
+    elif count:
+        needed = count
+    else:
+        return 0
+    skip = int(inputs["length"]) if "length" in inputs else 0
+    return max(len(dates) - needed - skip - warmup, 0)
+
+
+def run_indicator(obj, dates, columns, inputs):
+    """
+    Compute the indicator over the rows: `(index, names, values,
+    annotations, rows)`, `rows` being the calc rows if they were built.
+    """
+    if hasattr(obj, "calc_arrays"):
+        rows = None
+        ret = obj.calc_arrays(dates, dict(zip(obj.columns, columns)), **inputs)
+    else:
+        rows = input_rows(dates, columns)
+        ret = obj.calc(rows, **inputs)
+
+    # Accept either a single object or a (outputs, annotations) tuple.
+    if isinstance(ret, tuple):
+        outputs = ret[0]
+        annotations = ret[1] if len(ret) > 1 else None
+    else:
+        outputs = ret
+        annotations = None
+
+    index, names, values = output_columns(
+        obj.outputs, outputs, None if rows is not None else dates
+    )
+    return index, names, values, annotations, rows
+
+
+def compute(obj, dates, columns, inputs, selection):
+    """
+    `run_indicator` over the rows the `selection` (`message_type, inputs,
+    range, count` as for `select_rows`) needs after the warm-up of the
+    indicator. Returns the result and the first row it was computed from.
+    """
+    message_type, _, range, count = selection
+    start = warmup_start(
+        obj.warmup(**inputs), dates, message_type, inputs, range, count
+    )
+    result = run_indicator(obj, dates[start:], [c[start:] for c in columns], inputs)
+    return result, start
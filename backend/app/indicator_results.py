@@ -0,0 +1,180 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Indicator results kept as output columns in the indicator workers.
+
+An entry holds the outputs of one indicator, inputs and data map over the
+candles at given series segments and versions. Requests for any `count` or
+`range` the entry covers are sliced from it. When a candle is added or the
+forming one revised, only the rows from the former last candle on are
+recomputed, over the warm-up they need, and replace the tail of the entry.
+The store only writes the last candles of a segment in place: when a
+series was rewritten into a new segment (history loaded in front, a
+restated closed candle), the entry is recomputed.
+"""
+
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+from config import Config
+from .indicator_io import (
+    compute,
+    indicator_key,
+    run_indicator,
+    select_rows,
+)
+
+MAX_BYTES = int(Config.INDICATOR_RESULTS_CACHE_MB) * 1024 * 1024
+
+# (indicator id, inputs, data map) -> _Entry, least recently used first;
+# separate in every worker process
+results = OrderedDict()
+
+
+def same_segments(versions, other):
+    """Whether two `load_inputs` versions read the same store segments."""
+    return [segment for segment, _ in versions] == [segment for segment, _ in other]
+
+
+class _Entry:
+    def __init__(self, index, names, values, annotations, versions, dates):
+        self.index = index
+        self.names = names
+        self.values = values
+        self.annotations = annotations
+        self.versions = versions
+        self.first_date = int(dates[0])
+        self.last_date = int(dates[-1])  # the forming candle
+        self.length = len(dates)
+        self.start_date = None  # first candle computed from
+        self.valid_date = None  # first row matching the whole history
+
+    @property
+    def nbytes(self):
+        return self.index.nbytes + self.values.nbytes
+
+    def current(self, dates, versions, update_on_close):
+        """Whether the entry is the result for these candles."""
+        if not same_segments(self.versions, versions):
+            return False
+        if self.first_date != int(dates[0]) or self.length != len(dates):
+            return False
+        if self.last_date != int(dates[-1]):
+            return False
+        return update_on_close or self.versions == versions
+
+    def rows(self, dates, selection):
+        """Positions `(lo, hi)` of the selected rows, None if not covered."""
+        if self.valid_date is None:
+            return select_rows(self.index, *selection)
+
+        lo, _ = select_rows(dates, *selection)
+        if lo >= len(dates) or dates[lo] < self.valid_date:
+            return None
+        return int(np.searchsorted(self.index, dates[lo])), len(self.index)
+
+
+def _store(key, entry):
+    results.pop(key, None)
+    results[key] = entry
+    total = sum(e.nbytes for e in results.values())
+    while total > MAX_BYTES and len(results) > 1:
+        _, evicted = results.popitem(last=False)
+        total -= evicted.nbytes
+
+
+def _computed(obj, dates, columns, versions, inputs, selection):
+    (index, names, values, annotations, rows), start = compute(
+        obj, dates, columns, inputs, selection
+    )
+    entry = _Entry(index.copy(), names, values, annotations, versions, dates)
+    entry.start_date = int(dates[start])
+    if start > 0:
+        warmup = obj.warmup(**inputs)
+        entry.valid_date = int(dates[min(start + warmup, len(dates) - 1)])
+    return entry, rows
+
+
+def _appended(obj, entry, dates, columns, versions, inputs):
+    """
+    The entry with its rows from the former last candle on recomputed, None
+    when the candles before it changed or the indicator needs its whole
+    history.
+    """
+    warmup = obj.warmup(**inputs)
+    if warmup is None:
+        return None
+    if entry.annotations is not None or not same_segments(entry.versions, versions):
+        return None
+
+    pos = entry.length - 1  # the former last candle
+    if int(dates[0]) != entry.first_date or len(dates) <= pos:
+        return None
+    if int(dates[pos]) != entry.last_date:
+        return None
+
+    start = max(pos - warmup, 0)
+    index, names, values, annotations, _ = run_indicator(
+        obj, dates[start:], [c[start:] for c in columns], inputs
+    )
+    if names != entry.names or annotations is not None:
+        return None
+
+    keep = int(np.searchsorted(entry.index, entry.last_date))
+    tail = int(np.searchsorted(index, entry.last_date))
+    appended = _Entry(
+        np.concatenate([entry.index[:keep], index[tail:]]),
+        names,
+        np.hstack([entry.values[:, :keep], values[:, tail:]]),
+        None,
+        versions,
+        dates,
+    )
+    appended.start_date = entry.start_date
+    appended.valid_date = entry.valid_date
+    return appended
+
+
+def indicator_result(
+    obj, indicator, data_map, dates, columns, versions, inputs, selection
+):
+    """
+    The outputs of the indicator for the candles, `(index, names, values,
+    annotations, rows)` as `run_indicator` returns them, with the positions
+    `(lo, hi)` of the rows the `selection` (`message_type, inputs, range,
+    count`) asks for and the first candle they were computed from.
+    """
+    key = indicator_key(indicator, inputs, data_map)
+    update_on_close = indicator["details"].get("update_on") == "close"
+    rows = None
+    entry = results.get(key) if MAX_BYTES > 0 else None
+
+    if entry is not None and not entry.current(dates, versions, update_on_close):
+        try:
+            entry = _appended(obj, entry, dates, columns, versions, inputs)
+        except Exception as e:
+            logging.error(f"Error appending to {indicator['id']} result: {e}")
+            entry = None
+
+    selected = entry.rows(dates, selection) if entry is not None else None
+    if selected is None:
+        entry, rows = _computed(obj, dates, columns, versions, inputs, selection)
+        selected = entry.rows(dates, selection) or select_rows(entry.index, *selection)
+    if MAX_BYTES > 0:
+        _store(key, entry)
+
+    start = int(np.searchsorted(dates, entry.start_date))
+    result = (entry.index, entry.names, entry.values, entry.annotations, rows)
+    return result, selected, start
@@ -0,0 +1,187 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Incremental `indicator_update` ticks, evaluated in the indicator workers.
+
+The first tick of an indicator is computed in full; its rows then seed the
+indicator's incremental state (`Indicator.initialize`), which is kept in the
+worker process. Following ticks only revise the forming bar, or commit it
+when the next bar opens, at O(1) per tick.
+
+A state is dropped whenever the series moved in any other way (history
+loaded in front, more than one new bar, restated candles); the tick is then
+computed in full and seeds a new state. The store rewrites the segment of a
+series for anything but appending or revising its last candle, so a state is
+tied to the segments it was seeded from. States that do not reproduce the
+full computation on their seed are never used.
+"""
+
+import json
+import math
+import logging
+
+from db import indicators
+from .encoder import format_dates
+from .fetcher import get_shared_cache
+from .indicator_io import indicator_key
+
+MAX_STATES = 512
+
+# (indicator id, inputs, data map) -> _State, or None if the indicator has to
+# be computed in full; separate in every worker process
+states = {}
+
+
+class _State:
+    def __init__(self, obj, segments, forming):
+        self.obj = obj
+        self.segments = segments  # of the series, their closed rows unchanged
+        self.forming = forming  # date of the forming bar, int ns
+
+
+def _tails(data_map):
+    """Cached series of the datasources, None unless they end on the same bars."""
+    cache = get_shared_cache()
+    tails = []
+    for datasource in data_map.values():
+        key = (datasource["source"], datasource["name"], datasource["interval"])
+        series = cache.series(key)
+        if series is None or len(series) < 2:
+            return None
+        tails.append((series, datasource["value"]))
+
+    last_two = {tuple(series.dates[-2:].tolist()) for series, _ in tails}
+    if len(last_two) != 1:
+        return None
+    return tails
+
+
+def _row(tails, position):
+    series = tails[0][0]
+    date = format_dates(series.dates[[position]])[0]
+    return [date] + [float(series.column(c)[position]) for series, c in tails]
+
+
+def _output_values(id, descriptions, outputs):
+    data = {}
+    for description, value in zip(descriptions, outputs):
+        finite = not math.isnan(value) and not math.isinf(value)
+        data[f"{id}-{description['name']}"] = float(value) if finite else None
+    return data
+
+
+def incremental_update(id, indicator, inputs, data_map):
+    """
+    The `indicator_update` message from the kept state of the indicator,
+    None when it has to be computed in full.
+    """
+    key = indicator_key(indicator, inputs, data_map)
+    state = states.get(key)
+    if state is None:
+        return None
+
+    tails = _tails(data_map)
+    if tails is None:
+        states.pop(key, None)
+        return None
+
+    series = tails[0][0]
+    segments = tuple(s.segment for s, _ in tails)
+    last, previous = int(series.dates[-1]), int(series.dates[-2])
+    outputs = None
+    try:
+        if segments != state.segments:
+            pass  # history loaded or closed candles restated
+        elif last == state.forming:
+            outputs = state.obj.revise(_row(tails, -1))
+        elif previous == state.forming:
+            state.obj.revise(_row(tails, -2))  # final values of the closed bar
+            outputs = state.obj.update(_row(tails, -1))
+            state.forming = last
+    except Exception as e:
+        logging.error(f"Error updating {indicator['id']} state: {e}")
+        outputs = None
+
+    if outputs is None:
+        states.pop(key, None)
+        return None
+
+    last_dates = {}
+    for (series, _), datasource in zip(tails, data_map.values()):
+        source_key = (
+            f"{datasource['source']}-{datasource['name']}-{datasource['interval']}"
+        )
+        last_dates[source_key] = format_dates(series.dates[-1:])[0]
+
+    data = {"date": _row(tails, -1)[0]}
+    data.update(_output_values(id, state.obj.outputs, outputs))
+    return json.dumps(
+        {
+            "type": "indicator_update",
+            "id": id,
+            "data": data,
+            "annotations": None,
+            "last_dates": last_dates,
+        }
+    )
+
+
+def seed_state(id, indicator, inputs, data_map, rows, expected):
+    """
+    Seed the state from the `rows` a full computation ran on, if it gives
+    the same outputs for the forming bar as the `expected` update data.
+    """
+    key = indicator_key(indicator, inputs, data_map)
+    if key in states and states[key] is None:
+        return  # known not to be incremental
+
+    tails = _tails(data_map)
+    if tails is None or len(rows) == 0 or rows[-1][0] != _row(tails, -1)[0]:
+        return
+
+    obj = indicators[indicator["id"]]["klass"]()
+    if any(o.get("multi") for o in obj.outputs):
+        outputs = None
+    else:
+        try:
+            outputs = obj.initialize(rows, **inputs)
+        except Exception as e:
+            logging.error(f"Unable to initialize {indicator['id']} state: {e}")
+            outputs = None
+
+    if outputs is not None:
+        values = _output_values(id, obj.outputs, outputs)
+        for name, value in values.items():
+            value = math.nan if value is None else value
+            want = expected.get(name)
+            want = math.nan if want is None else float(want)
+            if not (
+                (math.isnan(value) and math.isnan(want))
+                or math.isclose(value, want, rel_tol=1e-7, abs_tol=1e-9)
+            ):
+                logging.warning(
+                    f"Incremental {indicator['id']} differs from its full "
+                    f"computation ({value} != {want}), computing it in full"
+                )
+                outputs = None
+                break
+
+    if key not in states and len(states) >= MAX_STATES:
+        states.pop(next(iter(states)))
+
+    if outputs is None:
+        states[key] = None
+        return
+
+    segments = tuple(s.segment for s, _ in tails)
+    states[key] = _State(obj, segments, int(tails[0][0].dates[-1]))
@@ -0,0 +1,209 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Parameter sweeps: one indicator over many input sets against the same
+candles, as a 2-D result with a row per input set and a column per candle.
+
+Indicators with `sweep_arrays` compute all the sets in one worker call,
+sharing the work between them. The others are split across the indicator
+workers, each reading the candles once for its share of the sets. Code
+already running in a worker, such as the GA, sweeps in its own process with
+`local_sweep`.
+"""
+
+import asyncio
+import logging
+import itertools
+
+import numpy as np
+
+from db import indicators
+from indicators.data.rolling import shared_windows
+from utils import to_ns
+from .encoder import encode_message, format_dates, format_values
+from .fetcher import get_shared_cache
+from .indicator_io import (
+    align,
+    load_inputs,
+    run_indicator,
+    warmup_start,
+)
+
+MAX_INPUT_SETS = 5000
+
+
+def input_sets(inputs=None, grid=None):
+    """
+    The input sets of a sweep: the list `inputs`, or every combination of
+    the `grid` values (`{name: [value, ...]}`), the last name varying
+    fastest.
+    """
+    if grid:
+        names = list(grid)
+        sets = [
+            dict(zip(names, values))
+            for values in itertools.product(*(grid[name] for name in names))
+        ]
+    else:
+        sets = list(inputs or [])
+
+    if len(sets) > MAX_INPUT_SETS:
+        raise ValueError(f"{len(sets)} input sets, at most {MAX_INPUT_SETS}")
+    return sets
+
+
+def _output_row(obj, dates, columns, inputs, output):
+    index, names, values, _, _ = run_indicator(obj, dates, columns, inputs)
+    if output not in names:
+        return np.full(len(dates), np.nan)
+
+    values = values[names.index(output)]
+    if index is dates:
+        return values
+    row = np.full(len(dates), np.nan)
+    left, right = align(index, dates)
+    row[right] = values[left]
+    return row
+
+
+def _shared_rows(obj, dates, columns, sets, output):
+    """Rows from `sweep_arrays`, None when it does not apply to the sets."""
+    names = [o["name"] for o in obj.outputs]
+    outputs = obj.sweep_arrays(dates, dict(zip(obj.columns, columns)), sets)
+    if outputs is None or output not in names:
+        return None
+    return np.asarray(outputs[names.index(output)], dtype=np.float64)
+
+
+def _lookback(obj, dates, sets, range, count):
+    """First candle the sweep needs: the longest warm-up before the requested ones."""
+    warmups = [obj.warmup(**inputs) for inputs in sets]
+    if any(w is None for w in warmups):
+        return 0
+    return warmup_start(max(warmups), dates, "indicator", {}, range, count)
+
+
+def sweep_rows(indicator, data_map, sets, output, shared, range=None, count=None):
+    """
+    Worker side of a sweep: `(dates, rows)` of the `output` for the input
+    `sets` over the `range` or last `count` candles and their warm-up, `rows`
+    being None if `shared` asks for `sweep_arrays` and it does not apply.
+    None when a series is not cached.
+    """
+    loaded = load_inputs(get_shared_cache(), data_map, range, count)
+    if loaded is None:
+        return None
+
+    dates, columns, _, _ = loaded
+    obj = indicators[indicator["id"]]["klass"]()
+    start = _lookback(obj, dates, sets, range, count)
+    dates, columns = dates[start:], [c[start:] for c in columns]
+    if shared:
+        return dates, _shared_rows(obj, dates, columns, sets, output)
+
+    rows = np.full((len(sets), len(dates)), np.nan)
+    with shared_windows():
+        for i, inputs in enumerate(sets):
+            try:
+                rows[i] = _output_row(obj, dates, columns, inputs, output)
+            except Exception as e:
+                logging.error(f"Error sweeping {indicator['id']} {inputs}: {e}")
+    return dates, rows
+
+
+async def sweep(
+    fetcher, workers, indicator, data_map, sets, output, range=None, count=None
+):
+    """
+    `(dates, rows)` of the `output` for all the input `sets` over the
+    `range` or last `count` candles (see `sweep_rows`), None when a series
+    is not cached.
+    """
+    if not sets:
+        return None
+
+    klass = indicators[indicator["id"]]["klass"]
+    if hasattr(klass, "sweep_arrays"):
+        result = await fetcher.fetch(
+            sweep_rows, (indicator, data_map, sets, output, True, range, count)
+        )
+        if result is None or result[1] is not None:
+            return result
+
+    size = -(-len(sets) // max(min(workers, len(sets)), 1))
+    chunks = [sets[i : i + size] for i in range(0, len(sets), size)]
+    results = await asyncio.gather(
+        *(
+            fetcher.fetch(
+                sweep_rows, (indicator, data_map, chunk, output, False, range, count)
+            )
+            for chunk in chunks
+        )
+    )
+    if any(result is None for result in results):
+        return None
+
+    # a candle may have been added while the chunks ran
+    dates = results[0][0]
+    rows = []
+    for chunk_dates, chunk_rows in results:
+        aligned = np.full((len(chunk_rows), len(dates)), np.nan)
+        left, right = align(dates, chunk_dates)
+        aligned[:, left] = chunk_rows[:, right]
+        rows.append(aligned)
+    return dates, np.vstack(rows)
+
+
+def local_sweep(indicator, data_map, sets, output, range=None, count=None):
+    """
+    `sweep` computed in the calling process, for callers already running in
+    an indicator worker: a sweep they asked the scheduler for could wait on
+    the worker they hold.
+    """
+    if not sets:
+        return None
+
+    if hasattr(indicators[indicator["id"]]["klass"], "sweep_arrays"):
+        result = sweep_rows(indicator, data_map, sets, output, True, range, count)
+        if result is None or result[1] is not None:
+            return result
+    return sweep_rows(indicator, data_map, sets, output, False, range, count)
+
+
+def sweep_message(id, indicator, output, sets, dates, rows, range=None, count=None):
+    """
+    The `indicator_sweep` message: the dates in the range or the last
+    `count`, and "data" with a row of values per input set.
+    """
+    lo, hi = 0, len(dates)
+    if range:
+        lo = int(np.searchsorted(dates, to_ns(range[0]), "left"))
+        if len(range) > 1 and range[1]:
+            hi = int(np.searchsorted(dates, to_ns(range[1]), "right"))
+    elif count:
+        lo = max(hi - int(count), 0)
+
+    data_json = (
+        "["
+        + ", ".join("[" + ", ".join(format_values(r[lo:hi])) + "]" for r in rows)
+        + "]"
+    )
+    message = {
+        "type": "indicator_sweep",
+        "id": id,
+        "indicator": indicator,
+        "output": output,
+        "inputs": sets,
+        "dates": format_dates(dates[lo:hi]),
+    }
+    return encode_message(message, data_json)
@@ -18,6 +18,7 @@ from datetime import datetime, timedelta, timezone
 from config import Config
 
 from .connection import conn
+from .resample import derived_base, with_bases
 from .globals import (
     clients,
     periodic_tasks,
@@ -27,8 +28,6 @@ from .globals import (
     historical_data_cache,
 )
 
-last_used_historical_cache = {}
-
 
 def cleanup_websockets():
     # cleanup not connected websockets
@@ -51,28 +50,13 @@ def get_subscriptions():
 
 
 def release_historical_cache(subscriptions):
-    cleaned_keys = []
+    # subscribed series (and the bases of derived ones) are pinned, the byte
+    # budget is enforced on every write
     with lock:
-        cache_keys = list(historical_data_cache.keys())
-        for key in cache_keys:
-            if key in subscriptions:
-                last_used_historical_cache[key] = datetime.now(timezone.utc)
-            else:  # nobody is connected
-                if key not in last_used_historical_cache:
-                    last_used_historical_cache[key] = datetime.now(timezone.utc)
-                else:
-                    if (
-                        datetime.now(timezone.utc)
-                        - timedelta(
-                            minutes=int(Config.RELEASE_HISTORICAL_CACHE_MINUTES)
-                        )
-                        > last_used_historical_cache[key]
-                    ):
-                        cleaned_keys.append(key)
-
-                        del historical_data_cache[
-                            key
-                        ]  # remove cache, not used for some time
+        historical_data_cache.set_pinned(with_bases(subscriptions))
+        cleaned_keys = historical_data_cache.release_idle(
+            int(Config.RELEASE_HISTORICAL_CACHE_MINUTES) * 60
+        )
 
     if len(cleaned_keys) > 0:
         logging.info(f"Released cache: {cleaned_keys}")
@@ -82,8 +66,13 @@ def release_historical_cache(subscriptions):
 
 def send_no_update_to_provider(subscriptions):
 
+    # derived intervals are streamed from their base interval
+    streams = set()
+    for source, name, interval in subscriptions:
+        streams.add((source, name, derived_base(source, interval) or interval))
+
     now = datetime.now(timezone.utc)
-    for s in subscriptions:
+    for s in streams:
         source, name, interval = s
         if s in last_update and last_update[s] < now - timedelta(seconds=60):
             last_update[s] = now
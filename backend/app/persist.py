@@ -0,0 +1,268 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import os
+import re
+import json
+import struct
+import logging
+from hashlib import sha1
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"TRDNCNDL"
+FORMAT_VERSION = 1
+CHUNK_ROWS = 4096
+
+# magic | version, header_size, chunk_rows, ncols, rows, first_date, last_date, json_len
+_HEADER = struct.Struct("<8s8q")
+_TAIL = struct.Struct("<3q")  # rows, first_date, last_date
+_TAIL_OFFSET = 8 + 4 * 8
+
+
+def _filename(key):
+    readable = re.sub(r"[^a-zA-Z0-9]", "-", "-".join(key))
+    digest = sha1(repr(key).encode()).hexdigest()[:10]  # intervals differ by case
+    return f"{readable}-{digest}.candles"
+
+
+class CandleFiles:
+    """
+    Append-only candle files, one per (source, name, interval).
+
+    A file starts with a header holding the column names and a tail index
+    (row count, first and last date), followed by fixed-size chunks of
+    `CHUNK_ROWS` rows. Each chunk is columnar: int64 dates, then one float64
+    block per column, so the whole file can be memory-mapped as
+    `(chunks, 1 + ncols, CHUNK_ROWS)`.
+
+    New candles are appended to the last chunk and only the tail index is
+    rewritten; replacing rows from a date onwards truncates the tail first.
+    History older than the first stored candle rewrites the file.
+
+    The fetched ranges of a series are kept next to it in a small JSON file.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._tails = {}
+
+    def _path(self, key):
+        return self.root / _filename(key)
+
+    def _tail(self, key):
+        if key in self._tails:
+            return self._tails[key]
+
+        tail = None
+        path = self._path(key)
+        if path.exists():
+            try:
+                with open(path, "rb") as f:
+                    fields = _HEADER.unpack(f.read(_HEADER.size))
+                    magic, version, header_size, chunk_rows, ncols = fields[:5]
+                    rows, first_date, last_date, json_len = fields[5:]
+                    if magic == MAGIC and version == FORMAT_VERSION:
+                        columns = json.loads(f.read(json_len))
+                        if len(columns) == ncols:
+                            tail = {
+                                "header_size": header_size,
+                                "chunk_rows": chunk_rows,
+                                "columns": columns,
+                                "rows": rows,
+                                "first_date": first_date,
+                                "last_date": last_date,
+                            }
+            except Exception as e:
+                logging.error(f"Unreadable candle file {path}: {e}")
+                tail = None
+
+        self._tails[key] = tail
+        return tail
+
+    def last_date(self, key):
+        tail = self._tail(key)
+        if tail is None or tail["rows"] == 0:
+            return None
+        return tail["last_date"]
+
+    # ------------------------------------------------------------------ #
+    # Reading                                                            #
+    # ------------------------------------------------------------------ #
+    def _map(self, key, tail):
+        ncols = len(tail["columns"])
+        chunk_rows = tail["chunk_rows"]
+        chunks = -(-tail["rows"] // chunk_rows)
+        return np.memmap(
+            self._path(key),
+            dtype="<i8",
+            mode="r",
+            offset=tail["header_size"],
+            shape=(chunks, 1 + ncols, chunk_rows),
+        )
+
+    def load(self, key):
+        """Return `(dates, values, columns)` of a stored series, or None."""
+        tail = self._tail(key)
+        if tail is None or tail["rows"] == 0:
+            return None
+
+        rows = tail["rows"]
+        ncols = len(tail["columns"])
+        try:
+            mm = self._map(key, tail)
+        except ValueError as e:  # truncated file
+            logging.error(f"Dropping damaged candle file for {key}: {e}")
+            self._tails[key] = None
+            self._path(key).unlink(missing_ok=True)
+            return None
+
+        dates = np.array(mm[:, 0, :].reshape(-1)[:rows], dtype=np.int64)
+        values = np.array(
+            mm[:, 1:, :].view("<f8").transpose(1, 0, 2).reshape(ncols, -1)[:, :rows],
+            dtype=np.float64,
+        )
+        del mm
+        return dates, values, list(tail["columns"])
+
+    def load_coverage(self, key):
+        path = self._path(key).with_suffix(".coverage")
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logging.error(f"Unreadable coverage file {path}: {e}")
+            return None
+
+    # ------------------------------------------------------------------ #
+    # Writing                                                            #
+    # ------------------------------------------------------------------ #
+    def appends(self, key, columns, since):
+        """
+        Whether `write` replaces the stored rows from `since` on in place,
+        rather than rewriting the file from the whole series.
+        """
+        tail = self._tail(key)
+        return not (
+            tail is None
+            or tail["rows"] == 0
+            or tail["columns"] != list(columns)
+            or since <= tail["first_date"]
+        )
+
+    def write(self, key, dates, values, columns, since):
+        """
+        Persist the rows of a series dated `since` or later, replacing what
+        is stored from that date onwards. `dates`/`values` must hold the
+        whole series unless `appends` is true, then the rows from `since` on
+        are enough.
+        """
+        columns = list(columns)
+        if not self.appends(key, columns, since):
+            self._rewrite(key, dates, values, columns)
+            return
+
+        tail = self._tail(key)
+        if since == tail["last_date"]:
+            pos = tail["rows"] - 1
+        elif since > tail["last_date"]:
+            pos = tail["rows"]
+        else:
+            mm = self._map(key, tail)
+            stored = mm[:, 0, :].reshape(-1)[: tail["rows"]]
+            pos = int(np.searchsorted(stored, since))
+            del mm
+
+        start = int(np.searchsorted(dates, since))
+        with open(self._path(key), "r+b") as f:
+            self._write_rows(f, tail, pos, dates[start:], values[:, start:])
+
+    def _rewrite(self, key, dates, values, columns):
+        columns_json = json.dumps(columns).encode()
+        header_size = -(-(_HEADER.size + len(columns_json)) // 4096) * 4096
+        tail = {
+            "header_size": header_size,
+            "chunk_rows": CHUNK_ROWS,
+            "columns": columns,
+            "rows": 0,
+            "first_date": 0,
+            "last_date": 0,
+        }
+
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    MAGIC,
+                    FORMAT_VERSION,
+                    header_size,
+                    CHUNK_ROWS,
+                    len(columns),
+                    0,
+                    0,
+                    0,
+                    len(columns_json),
+                )
+            )
+            f.write(columns_json)
+            f.truncate(header_size)
+            self._write_rows(f, tail, 0, dates, values)
+        os.replace(tmp_path, path)
+
+        self._tails[key] = tail
+
+    def _write_rows(self, f, tail, pos, dates, values):
+        if len(dates) == 0:
+            return
+
+        ncols = len(tail["columns"])
+        chunk_rows = tail["chunk_rows"]
+        chunk_bytes = (1 + ncols) * chunk_rows * 8
+        size = os.fstat(f.fileno()).st_size
+
+        i = 0
+        while i < len(dates):
+            chunk, offset = divmod(pos + i, chunk_rows)
+            n = min(chunk_rows - offset, len(dates) - i)
+            base = tail["header_size"] + chunk * chunk_bytes
+            if size < base + chunk_bytes:
+                size = base + chunk_bytes
+                f.truncate(size)
+
+            f.seek(base + offset * 8)
+            f.write(np.ascontiguousarray(dates[i : i + n], dtype="<i8").tobytes())
+            for c in range(ncols):
+                f.seek(base + ((1 + c) * chunk_rows + offset) * 8)
+                f.write(
+                    np.ascontiguousarray(values[c, i : i + n], dtype="<f8").tobytes()
+                )
+            i += n
+
+        # the tail index is updated last, after the rows are on disk
+        if pos == 0:
+            tail["first_date"] = int(dates[0])
+        tail["rows"] = pos + len(dates)
+        tail["last_date"] = int(dates[-1])
+        f.seek(_TAIL_OFFSET)
+        f.write(_TAIL.pack(tail["rows"], tail["first_date"], tail["last_date"]))
+
+    def write_coverage(self, key, coverage):
+        path = self._path(key).with_suffix(".coverage")
+        tmp_path = path.with_suffix(".coverage-tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(coverage, f)
+        os.replace(tmp_path, path)
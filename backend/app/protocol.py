@@ -0,0 +1,114 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Wire formats of chart data messages (data_init, data_history, data_update),
+chosen per connection with `/websocket/?protocol=<name>`:
+
+    json      rows of `{"date": ..., "<key>": value}` (default)
+    columnar  JSON with the key prefix stated once and one array per column:
+              {"format": "columnar", "prefix": "Binance-BTCUSDT-1m-",
+               "columns": ["open", ...], "date": [epoch seconds, ...],
+               "values": [[...], ...], ...}
+    binary    a binary frame, little-endian:
+              uint32 header length, JSON header (as columnar, without date and
+              values, plus "rows"), zero padding to 8 bytes, float64 dates in
+              epoch milliseconds, then float64 values column after column
+"""
+
+import json
+import struct
+
+import numpy as np
+
+from .encoder import encode_rows, encode_message, format_values
+
+PROTOCOLS = ("json", "columnar", "binary")
+
+
+def split_prefix(columns):
+    """Common key prefix up to its last "-", and the column names without it."""
+    if not columns:
+        return "", []
+    prefix = columns[0] if len(columns) == 1 else _common_prefix(columns)
+    prefix = prefix[: prefix.rfind("-") + 1]
+    return prefix, [c[len(prefix) :] for c in columns]
+
+
+def _common_prefix(columns):
+    first, last = min(columns), max(columns)
+    for i, char in enumerate(first):
+        if char != last[i]:
+            return first[:i]
+    return first
+
+
+def _header(message, columns, fmt):
+    prefix, names = split_prefix(list(columns))
+    return dict(message, format=fmt, prefix=prefix, columns=names)
+
+
+def encode_columnar(message, dates, values, columns):
+    header = _header(message, columns, "columnar")
+    seconds = (np.asarray(dates, dtype=np.int64) // 10**9).tolist()
+    arrays = ", ".join("[" + ", ".join(format_values(v)) + "]" for v in values)
+    return (
+        json.dumps(header)[:-1]
+        + ', "date": '
+        + json.dumps(seconds)
+        + ', "values": ['
+        + (arrays if len(dates) else "")
+        + "]}"
+    )
+
+
+def encode_binary(message, dates, values, columns):
+    header = _header(message, columns, "binary")
+    header["rows"] = len(dates)
+    header = json.dumps(header).encode()
+
+    size = 4 + len(header)
+    padding = -size % 8
+    milliseconds = np.asarray(dates, dtype=np.int64) // 10**6
+    return b"".join(
+        [
+            struct.pack("<I", len(header)),
+            header,
+            b"\0" * padding,
+            milliseconds.astype("<f8").tobytes(),
+            np.ascontiguousarray(values, dtype="<f8").tobytes(),
+        ]
+    )
+
+
+def encode_series(protocol, message, dates, values, columns):
+    """A chart data message with the rows `dates`/`values` as `data`."""
+    if protocol == "columnar":
+        return encode_columnar(message, dates, values, columns)
+    if protocol == "binary":
+        return encode_binary(message, dates, values, columns)
+    return encode_message(message, encode_rows(dates, values, columns))
+
+
+def encode_update(protocol, message):
+    """Re-encode a row-shaped data_update message for the protocol."""
+    if protocol not in ("columnar", "binary"):
+        return json.dumps(message)
+
+    data = message["data"]
+    columns = [c for c in data if c != "date"]
+    date = np.datetime64(data["date"], "ns").astype(np.int64)
+    values = np.array(
+        [[np.nan if data[c] is None else data[c]] for c in columns], dtype=np.float64
+    )
+    header = {k: v for k, v in message.items() if k != "data"}
+    return encode_series(protocol, header, np.array([date]), values, columns)
@@ -0,0 +1,272 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import math
+import logging
+
+import numpy as np
+import pandas as pd
+
+from utils import candle_starts, get_interval_duration, parse_interval
+from .globals import providers, historical_data_cache
+from .store import rows_to_columns
+
+# How a column is aggregated, by the last part of its key (`...-1m-close`)
+AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+}
+
+# (source, name, base interval) -> {derived interval: IntervalAggregator}
+live_aggregators = {}
+
+# derived cache key -> (segment, version) of the base series it was built from
+built_from = {}
+
+
+def native_intervals(source):
+    """Intervals the provider serves itself, None if it takes any interval."""
+    provider = providers.get(source)
+    provider_class = getattr(provider, "provider_class", None)
+    return getattr(provider_class, "intervals", None)
+
+
+def with_bases(keys):
+    """`keys` plus the base series their derived intervals are built from."""
+    keys = set(keys)
+    for source, name, interval in list(keys):
+        base = derived_base(source, interval)
+        if base is not None:
+            keys.add((source, name, base))
+    return keys
+
+
+def derived_base(source, interval):
+    """
+    The native interval `interval` is built from, or None when the provider
+    serves it (or nothing finer divides it). The coarsest candidate wins.
+    """
+    native = native_intervals(source)
+    if native is None or interval in native:
+        return None
+
+    count, unit = parse_interval(interval)
+    minutes = get_interval_duration(interval)
+
+    candidates = []
+    for base in native:
+        base_count, base_unit = parse_interval(base)
+        if unit == "M":
+            # calendar months are built from months or from whole days
+            fits = (base_unit == "M" and count % base_count == 0) or (
+                base_unit not in ("w", "M") and 1440 % get_interval_duration(base) == 0
+            )
+        else:
+            fits = base_unit != "M" and minutes % get_interval_duration(base) == 0
+        if fits:
+            candidates.append(base)
+
+    if not candidates:
+        return None
+    return max(candidates, key=get_interval_duration)
+
+
+def base_candles_needed(interval, base, count):
+    """Base candles needed for `count` candles of `interval`."""
+    factor = math.ceil(get_interval_duration(interval) / get_interval_duration(base))
+    return (count + 1) * factor
+
+
+def rename_column(column, base, interval):
+    prefix, sep, field = column.rpartition(f"-{base}-")
+    if sep:
+        return f"{prefix}-{interval}-{field}"
+    if column.endswith(f"-{base}"):
+        return column[: -len(base)] + interval
+    return column
+
+
+def aggregation(column):
+    return AGGREGATIONS.get(column.rsplit("-", 1)[-1], "last")
+
+
+def resample(dates, values, columns, interval):
+    """
+    Aggregate sorted base candles (`dates` int64 ns, `values` of shape
+    `(ncols, n)`) into `interval` candles, OHLCV by column name, anything
+    else keeps its last value. Returns the new dates and values.
+    """
+    if len(dates) == 0:
+        return dates, np.empty((len(columns), 0))
+
+    starts = candle_starts(dates, interval)
+    first = np.flatnonzero(np.append(True, starts[1:] != starts[:-1]))
+    last = np.append(first[1:], len(dates)) - 1
+
+    out = np.empty((len(columns), len(first)))
+    for i, column in enumerate(columns):
+        how = aggregation(column)
+        column_values = np.asarray(values[i], dtype=np.float64)
+        if how == "first":
+            out[i] = column_values[first]
+        elif how == "max":
+            out[i] = np.fmax.reduceat(column_values, first)
+        elif how == "min":
+            out[i] = np.fmin.reduceat(column_values, first)
+        elif how == "sum":
+            out[i] = np.add.reduceat(np.nan_to_num(column_values), first)
+        else:
+            out[i] = column_values[last]
+
+    return starts[first], out
+
+
+class IntervalAggregator:
+    """
+    Folds streamed base candles into the forming candle of a derived
+    interval. Base candles that closed inside the current bucket are kept as
+    one partial aggregate, so every tick costs O(columns).
+    """
+
+    def __init__(self, columns, interval):
+        self.columns = list(columns)
+        self.interval = interval
+        self.how = [aggregation(c) for c in self.columns]
+        self.bucket = None
+        self.closed = None  # aggregate of the closed base candles in the bucket
+        self.forming_date = None
+        self.forming = None
+
+    def _combine(self, a, b):
+        if a is None:
+            return b
+        combined = np.empty_like(b)
+        for i, how in enumerate(self.how):
+            if how == "first":
+                combined[i] = a[i]
+            elif how == "max":
+                combined[i] = np.fmax(a[i], b[i])
+            elif how == "min":
+                combined[i] = np.fmin(a[i], b[i])
+            elif how == "sum":
+                combined[i] = np.nansum([a[i], b[i]])
+            else:
+                combined[i] = b[i]
+        return combined
+
+    def seed(self, dates, values):
+        """Start from the cached base candles, the last one is still forming."""
+        if len(dates) == 0:
+            return
+        bucket = candle_starts(dates[-1:], self.interval)[0]
+        start = int(np.searchsorted(dates, bucket))
+        for j in range(start, len(dates)):
+            self.update(int(dates[j]), np.asarray(values[:, j], dtype=np.float64))
+
+    def update(self, date, row):
+        """Fold one base candle in, returns (bucket date, candle values)."""
+        bucket = candle_starts([date], self.interval)[0]
+        if bucket != self.bucket:
+            self.bucket = bucket
+            self.closed = None
+        elif date != self.forming_date:
+            self.closed = self._combine(self.closed, self.forming)
+
+        self.forming_date = date
+        self.forming = row
+        return self.bucket, self._combine(self.closed, self.forming)
+
+
+def start_aggregator(source, name, interval, base):
+    """Register a live derived interval, seeded from the cached base series."""
+    aggregators = live_aggregators.setdefault((source, name, base), {})
+    if interval in aggregators:
+        return
+
+    series = historical_data_cache.series((source, name, base))
+    if series is None:
+        logging.info(f"No cached {base} candles to derive {interval} from")
+        return
+
+    aggregator = IntervalAggregator(series.columns, interval)
+    aggregator.seed(series.dates, series.values)
+    aggregators[interval] = aggregator
+
+
+def stop_aggregator(source, name, interval, base):
+    """Forget a derived interval, True once nothing is derived from `base`."""
+    aggregators = live_aggregators.get((source, name, base), {})
+    aggregators.pop(interval, None)
+    if not aggregators:
+        live_aggregators.pop((source, name, base), None)
+        return True
+    return False
+
+
+def derive_series(source, name, interval, base):
+    """Build the cached `interval` series from the cached base series."""
+    base_series = historical_data_cache.series((source, name, base))
+    if base_series is None or base_series.empty:
+        return
+
+    # versions restart when an evicted base is fetched again, segments do not
+    base_version = (base_series.segment, base_series.version)
+    cache_key = (source, name, interval)
+    if built_from.get(cache_key) == base_version and (
+        cache_key in historical_data_cache
+    ):
+        return  # base did not change
+
+    dates, values = resample(
+        base_series.dates, base_series.values, base_series.columns, interval
+    )
+    columns = [rename_column(c, base, interval) for c in base_series.columns]
+    coverage = historical_data_cache.coverage((source, name, base))
+    historical_data_cache.put(cache_key, dates, values, columns, coverage=coverage)
+    built_from[cache_key] = base_version
+
+
+def update_derived(source, name, base, new_klines):
+    """
+    Fold streamed base candles into the live derived intervals of the
+    series. Returns `{interval: datapoint}` of the updated forming candles.
+    """
+    aggregators = live_aggregators.get((source, name, base))
+    if not aggregators or len(new_klines) == 0:
+        return {}
+
+    dates, values, columns = rows_to_columns(new_klines)
+
+    updates = {}
+    for interval, aggregator in aggregators.items():
+        if not set(aggregator.columns) <= set(columns):
+            continue
+        rows = values[[columns.index(c) for c in aggregator.columns]]
+        for j in range(len(dates)):
+            bucket, candle = aggregator.update(int(dates[j]), rows[:, j])
+
+        derived_columns = [rename_column(c, base, interval) for c in aggregator.columns]
+        cache_key = (source, name, interval)
+        if cache_key in historical_data_cache:
+            historical_data_cache.merge(
+                cache_key, np.array([bucket]), candle[:, None], derived_columns
+            )
+
+        datapoint = {"date": pd.Timestamp(bucket).strftime("%Y-%m-%d %H:%M:%S")}
+        for column, value in zip(derived_columns, candle):
+            datapoint[column] = None if np.isnan(value) else float(value)
+        updates[interval] = datapoint
+
+    return updates
@@ -36,17 +36,24 @@ from scanner import (
 from security import register_request, is_request_allowed, is_ip_address_whitelisted
 
 from .connection import safe_send_message, conn
-from .globals import dbconn, providers, indicator_fetcher
+from .protocol import PROTOCOLS
+from .resample import derived_base, start_aggregator, with_bases
+from .globals import dbconn, providers, indicator_scheduler, historical_data_cache
+from .indicator_io import data_series
+from .scheduler import LANES
 from .handlers import (
     send_historical_data,
     optimize_indicator_params,
-    _do_indicator,
+    _do_indicators,
+    _do_indicator_sweep,
     _do_optimize_indicator_params,
+    indicator_dispatcher,
 )
 
-
 websocket_router = APIRouter()
 
+INDICATOR_TYPES = ("indicator", "indicator_history")
+
 ip_conns = {}
 last_alert_created = datetime.now(timezone.utc).strftime("%Y-%m-%d")
 ip_alerts = {}
@@ -62,6 +69,11 @@ async def websocket_endpoint(
 ):
     await conn.connect(websocket)
 
+    # wire format of chart data, see app/protocol.py
+    protocol = websocket.query_params.get("protocol", "json")
+    if protocol in PROTOCOLS:
+        conn.set_protocol(websocket, protocol)
+
     client_ip = websocket.client.host
 
     if not is_ip_address_whitelisted(
@@ -137,14 +149,81 @@ async def handle_message(
     # Await all 'data' type message handling tasks
     await asyncio.gather(*tasks, return_exceptions=True)
 
+    # Indicators reading the same series are computed in one worker call
+    indicators = [d for d in data if d.get("type") in INDICATOR_TYPES]
+    if indicators:
+        await process_indicators(websocket, indicators)
+
     # Handle all other types of messages
-    for d in [d for d in data if d.get("type") not in handle_first]:
+    for d in data:
+        if d.get("type") in handle_first or d.get("type") in INDICATOR_TYPES:
+            continue
         task = asyncio.create_task(
             process_message(websocket, d, alert_queue, scanner_queue)
         )
         await task
 
 
+async def _data_request_allowed(websocket: WebSocket):
+    """Count a data request of the client, False when over its limit."""
+    client_ip = websocket.client.host
+
+    if not is_ip_address_whitelisted(
+        client_ip, Config.WHITELIST_IP
+    ) and not is_request_allowed(
+        Config.MAX_DATA_REQUESTS_PER_IP_PER_HOUR, data_requests, client_ip
+    ):
+        logging.warning(f"Too many data requests: {client_ip}")
+        await safe_send_message(
+            websocket,
+            json.dumps(
+                {"type": "notification", "message": "Error: Too many data requests"}
+            ),
+        )
+        return False
+
+    if not is_ip_address_whitelisted(client_ip, Config.WHITELIST_IP):
+        register_request(data_requests, client_ip)
+    return True
+
+
+async def process_indicators(websocket: WebSocket, items: list):
+    """
+    Indicator requests of one message, batched per message type and the
+    series they read, see `send_indicator_batch`.
+    """
+    batches = {}
+    for d in items:
+        if not await _data_request_allowed(websocket):
+            continue
+
+        if d.get("type") == "indicator":
+            message_type = "indicator_init"
+            if d.get("stream", True):
+                conn.add_indicator_subscription(websocket, d)
+        else:
+            message_type = "indicator_history"
+
+        spec = (
+            d.get("id"),
+            d.get("indicator"),
+            d.get("inputs"),
+            d.get("dataMap"),
+            d.get("range", None),
+            d.get("count", 300),
+        )
+        try:
+            key = (message_type, data_series(d.get("dataMap")))
+        except Exception as e:
+            logging.error(f"Invalid indicator request {d.get('id')}: {e}")
+            continue
+        batches.setdefault(key, []).append(spec)
+
+    for (message_type, _), specs in batches.items():
+        lane = indicator_scheduler.lane(LANES[message_type])
+        asyncio.create_task(_do_indicators(websocket, lane, message_type, specs))
+
+
 async def process_message(
     websocket: WebSocket, d: dict, alert_queue: Queue, scanner_queue: Queue
 ):
@@ -163,26 +242,16 @@ async def process_message(
 
         return _
 
-    if d.get("type") in ["data", "data_history", "indicator", "indicator_history"]:
-        client_ip = websocket.client.host
-
-        if not is_ip_address_whitelisted(
-            client_ip, Config.WHITELIST_IP
-        ) and not is_request_allowed(
-            Config.MAX_DATA_REQUESTS_PER_IP_PER_HOUR, data_requests, client_ip
-        ):
-            logging.warning(f"Too many data requests: {client_ip}")
-            await safe_send_message(
-                websocket,
-                json.dumps(
-                    {"type": "notification", "message": "Error: Too many data requests"}
-                ),
-            )
+    if d.get("type") in [
+        "data",
+        "data_history",
+        "indicator_sweep",
+        "cache_stats",
+        "indicator_stats",
+    ]:
+        if not await _data_request_allowed(websocket):
             return
 
-        if not is_ip_address_whitelisted(client_ip, Config.WHITELIST_IP):
-            register_request(data_requests, client_ip)
-
     try:
         if d.get("type") == "search_data":
             results = search_data_entities(dbconn, d.get("search"), type="data")
@@ -205,6 +274,9 @@ async def process_message(
                 key = (d.get("source"), d.get("name"), d.get("interval"))
                 if key not in conn.get_data_subscriptions(websocket):
                     conn.add_data_subscription(websocket, key)
+                # a derived interval is rebuilt from its base, keep both cached
+                for pinned in with_bases([key]):
+                    historical_data_cache.pin(pinned)
 
             metadata = get_metadata(dbconn, d.get("source"), d.get("name"))
 
@@ -219,12 +291,25 @@ async def process_message(
             )
 
             if stream:
-                providers[d.get("source")].request(
-                    {
-                        "action": "start_streaming",
-                        "args": (id(websocket), d.get("name"), d.get("interval")),
-                    }
-                )
+                base = derived_base(d.get("source"), d.get("interval"))
+                if base is None:
+                    providers[d.get("source")].request(
+                        {
+                            "action": "start_streaming",
+                            "args": (id(websocket), d.get("name"), d.get("interval")),
+                        }
+                    )
+                else:
+                    # the base stream feeds the derived interval on the server
+                    start_aggregator(
+                        d.get("source"), d.get("name"), d.get("interval"), base
+                    )
+                    providers[d.get("source")].request(
+                        {
+                            "action": "start_streaming",
+                            "args": (None, d.get("name"), base),
+                        }
+                    )
 
         elif (
             d.get("type") == "data_history"
@@ -241,29 +326,10 @@ async def process_message(
                 d.get("end"),
             )
 
-        elif d.get("type") == "indicator" or d.get("type") == "indicator_history":
-
-            stream = d.get("stream", True)
-
-            if d.get("type") == "indicator":
-                message_type = "indicator_init"
-                if stream:
-                    conn.add_indicator_subscription(websocket, d)
-
-            else:
-                message_type = "indicator_history"
-
+        elif d.get("type") == "indicator_sweep":
             asyncio.create_task(
-                _do_indicator(
-                    websocket,
-                    indicator_fetcher,
-                    message_type,
-                    d.get("id"),
-                    d.get("indicator"),
-                    d.get("inputs"),
-                    d.get("dataMap"),
-                    d.get("range", None),
-                    d.get("count", 300),
+                _do_indicator_sweep(
+                    websocket, indicator_scheduler.lane(LANES["indicator_sweep"]), d
                 )
             )
 
@@ -274,7 +340,7 @@ async def process_message(
             asyncio.create_task(
                 _do_optimize_indicator_params(
                     websocket,
-                    indicator_fetcher,
+                    indicator_scheduler.lane(LANES["optimize_indicator_params"]),
                     d.get("strategy"),
                     d.get("strategySettings"),
                     dm_first["source"],
@@ -334,6 +400,26 @@ async def process_message(
                 ),
             )
 
+        elif d.get("type") == "cache_stats":
+            await safe_send_message(
+                websocket,
+                json.dumps(
+                    {"type": "cache_stats", "stats": historical_data_cache.stats()}
+                ),
+            )
+
+        elif d.get("type") == "indicator_stats":
+            await safe_send_message(
+                websocket,
+                json.dumps(
+                    {
+                        "type": "indicator_stats",
+                        "stats": indicator_scheduler.stats(),
+                        "updates": indicator_dispatcher.stats(),
+                    }
+                ),
+            )
+
         elif d.get("type") == "scan":
 
             task = {"action": "scan", "settings": d, "client_id": id(websocket)}
@@ -0,0 +1,156 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Priority scheduling of the indicator jobs on the shared process pool.
+
+Jobs come in four classes, from the most urgent:
+- interactive: indicators a client asked for,
+- update: indicator updates on streamed ticks,
+- history: scrollback and parameter sweeps,
+- optimization: GA runs of `optimize_indicator_params`.
+
+The scheduler keeps at most one job per worker in the pool and queues the
+others. When a worker frees up, it admits the oldest job of the most urgent
+class that is under its limit of workers, so a GA run holds at most its
+class's workers and never delays charts behind it in the pool's queue. A job
+already running is not preempted.
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+
+PRIORITIES = ("interactive", "update", "history", "optimization")
+
+# the class of the jobs computing each message type
+LANES = {
+    "indicator_init": "interactive",
+    "indicator_update": "update",
+    "indicator_history": "history",
+    "indicator_sweep": "history",
+    "optimize_indicator_params": "optimization",
+}
+
+
+def parse_limits(limits, workers):
+    """
+    Workers per class from `"class=n,..."`, 0 or a missing class for all of
+    them.
+    """
+    parsed = {priority: workers for priority in PRIORITIES}
+    for item in filter(None, (i.strip() for i in limits.split(","))):
+        try:
+            priority, n = (part.strip() for part in item.split("="))
+            if priority not in parsed:
+                raise ValueError(f"unknown class {priority}")
+            parsed[priority] = min(int(n), workers) if int(n) > 0 else workers
+        except ValueError as e:
+            logging.error(f"Invalid indicator worker limit {item!r}: {e}")
+    return parsed
+
+
+class _Lane:
+    """The `fetch` of one class, for code taking a `BlockingFetcher`."""
+
+    def __init__(self, scheduler, priority):
+        self._scheduler = scheduler
+        self.priority = priority
+
+    async def fetch(self, fn, args, admitted=None):
+        return await self._scheduler.fetch(self.priority, fn, args, admitted)
+
+
+class PriorityScheduler:
+    """
+    Admission queue in front of a `BlockingFetcher` with `workers` processes.
+    `limits` maps every class to the workers it may use at once.
+    """
+
+    def __init__(self, fetcher, workers, limits):
+        self._fetcher = fetcher
+        self._workers = max(int(workers), 1)
+        self._limits = limits
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._running = {priority: 0 for priority in PRIORITIES}
+        self._lanes = {priority: _Lane(self, priority) for priority in PRIORITIES}
+        # admitted jobs, total and longest seconds they queued
+        self._waits = {priority: [0, 0.0, 0.0] for priority in PRIORITIES}
+
+    def lane(self, priority):
+        return self._lanes[priority]
+
+    async def fetch(self, priority, fn, args, admitted=None):
+        """
+        `fetcher.fetch(fn, args)` once the scheduler admits it, calling
+        `admitted()` first if given.
+        """
+        await self._admit(priority)
+        if admitted is not None:
+            admitted()
+        job = asyncio.ensure_future(self._fetcher.fetch(fn, args))
+        # the worker stays busy until the job ends, even if the caller is gone
+        job.add_done_callback(lambda _: self._release(priority))
+        return await asyncio.shield(job)
+
+    async def _admit(self, priority):
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, time.monotonic())
+        self._queues[priority].append(entry)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(priority)  # admitted as it was cancelled
+            elif entry in self._queues[priority]:
+                self._queues[priority].remove(entry)
+            raise
+
+    def _release(self, priority):
+        self._running[priority] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while sum(self._running.values()) < self._workers:
+            for priority in PRIORITIES:
+                queue = self._queues[priority]
+                while queue and queue[0][0].done():
+                    queue.popleft()  # cancelled while queued
+                if queue and self._running[priority] < self._limits[priority]:
+                    break
+            else:
+                return
+
+            waiter, queued = self._queues[priority].popleft()
+            self._running[priority] += 1
+            waited = time.monotonic() - queued
+            stats = self._waits[priority]
+            stats[0] += 1
+            stats[1] += waited
+            stats[2] = max(stats[2], waited)
+            waiter.set_result(None)
+
+    def stats(self):
+        """Per class: limit, running and queued jobs, and their queue waits."""
+        return {
+            priority: {
+                "limit": self._limits[priority],
+                "running": self._running[priority],
+                "queued": len(self._queues[priority]),
+                "admitted": admitted,
+                "wait_ms_mean": round(total / admitted * 1e3, 3) if admitted else 0,
+                "wait_ms_max": round(longest * 1e3, 3),
+            }
+            for priority, (admitted, total, longest) in self._waits.items()
+        }
@@ -17,7 +17,7 @@ from provider import register_provider, initialize_providers
 from vapid import generate as generate_vapid_keys
 from . import app
 from .periodic import run_periodic_tasks
-from .globals import startup_actions
+from .globals import startup_actions, historical_data_cache
 from alert import init as alert_init
 from scanner import init as scanner_init
 
@@ -58,5 +58,6 @@ async def custom_startup():
 async def custom_shutdown():
     logging.info("Shutting down...")
     # Cancel periodic tasks on shutdown
+    historical_data_cache.close()
     app.state.periodic_task_runner.cancel()
     await app.state.periodic_task_runner
@@ -0,0 +1,590 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import time
+import logging
+from datetime import datetime, timezone
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+MIN_CAPACITY = 1024
+META_SLOTS = 2  # [length, version] stored in front of every segment
+
+
+def _layout(shm, header):
+    """
+    Map a segment to numpy arrays:
+
+        int64   meta[2]                 (length, version)
+        int64   dates[capacity]         (datetime64[ns] as int64)
+        float   values[ncols, capacity] (one row per column, float64/float32)
+    """
+    capacity = header["capacity"]
+    ncols = len(header["columns"])
+    meta = np.ndarray((META_SLOTS,), dtype=np.int64, buffer=shm.buf)
+    offset = META_SLOTS * 8
+    dates = np.ndarray((capacity,), dtype=np.int64, buffer=shm.buf, offset=offset)
+    offset += capacity * 8
+    values = np.ndarray(
+        (ncols, capacity), dtype=header["dtype"], buffer=shm.buf, offset=offset
+    )
+    return meta, dates, values
+
+
+def _segment_size(capacity, ncols, dtype):
+    return META_SLOTS * 8 + capacity * 8 + ncols * capacity * np.dtype(dtype).itemsize
+
+
+def _to_float64(values):
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+
+
+def _to_datetime64(dates):
+    try:
+        return np.asarray(dates, dtype="datetime64[ns]").view(np.int64)
+    except ValueError:
+        return pd.to_datetime(dates).values.astype("datetime64[ns]").view(np.int64)
+
+
+def rows_to_columns(rows):
+    """
+    Split provider datapoints (`{"date": ..., "<column>": value, ...}`) into
+    int64 dates, a float64 `(ncols, nrows)` value block and the column names.
+    """
+    columns = [c for c in rows[0].keys() if c != "date"]
+    dates = _to_datetime64([r["date"] for r in rows])
+    values = np.empty((len(columns), len(rows)), dtype=np.float64)
+    for i, column in enumerate(columns):
+        values[i] = _to_float64([r.get(column) for r in rows])
+    return dates, values, columns
+
+
+def _df_to_columns(df):
+    dates = df.index.values.astype("datetime64[ns]").view(np.int64)
+    values = np.empty((len(df.columns), len(df)), dtype=np.float64)
+    for i, column in enumerate(df.columns):
+        values[i] = pd.to_numeric(df[column], errors="coerce").to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+    return dates, values
+
+
+class CandleSeries:
+    """
+    Read-only view of one (source, name, interval) series. The arrays point
+    straight into shared memory, nothing is copied.
+
+    `segment` names the shared memory segment: while it stays the same, only
+    the last row may have changed since.
+    """
+
+    def __init__(
+        self, dates, values, columns, version, last_fetched_time, segment=None
+    ):
+        self.dates = dates
+        self.values = values
+        self.columns = columns
+        self.version = version
+        self.last_fetched_time = last_fetched_time
+        self.segment = segment
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def empty(self):
+        return len(self.dates) == 0
+
+    def column(self, name):
+        return self.values[self.columns.index(name)]
+
+    def to_df(self):
+        index = pd.DatetimeIndex(self.dates.view("datetime64[ns]"), name="date")
+        return pd.DataFrame(
+            self.values.T, index=index, columns=list(self.columns), copy=False
+        )
+
+
+class CandleStore:
+    """
+    Historical candle cache shared between the server and the indicator
+    workers.
+
+    Every series lives in its own `SharedMemory` segment as typed columns;
+    only a small header (segment name, capacity, columns) is kept in the
+    manager registry, so readers attach to the segment instead of receiving
+    a pickled DataFrame.
+
+    Only the server process writes. Writers never modify rows a reader can
+    see except for the last one: anything else allocates a new segment and
+    swaps the header, the old segment is unlinked. Every swap or unlink
+    bumps a generation counter in its own small segment; readers seeing it
+    change close their mappings of the segments no header points to anymore,
+    so evicted series are not kept resident by the workers.
+
+    Values are float64; series longer than `compact_rows` candles are kept
+    as float32 instead (0 disables the compaction).
+
+    Each header also records the coverage of the series, the ranges that
+    were actually fetched from the provider, so holes between them can be
+    told apart from periods without candles.
+
+    The writer also accounts the bytes of every segment. Once they exceed
+    `max_bytes` (0 disables the budget) the least recently used, or with
+    `policy="lfu"` the least frequently used, series are evicted; pinned
+    series (live subscriptions) are never evicted.
+
+    The mapping interface (`get`, `[]`, `del`, `keys`) mirrors the former
+    `{"cached_df": ..., "last_fetched_time": ...}` dict entries.
+    """
+
+    def __init__(self, registry, compact_rows=0, max_bytes=0, policy="lru"):
+        self._registry = registry
+        self._compact_rows = compact_rows
+        self._headers = {}  # headers written by this process (the writer)
+        self._segments = {}  # key -> SharedMemory, per process
+        self._retired = []  # segments still referenced by numpy views
+        # created by the owner on the first swap or pickle, so processes that
+        # merely import the store do not leave a segment behind
+        self._generation_shm = None
+        self._generation = None
+        self._seen = 0
+        self._init_budget(max_bytes, policy)
+
+    def _init_generation(self):
+        self._generation = np.ndarray(
+            (1,), dtype=np.int64, buffer=self._generation_shm.buf
+        )
+        self._seen = int(self._generation[0])
+
+    def _create_generation(self):
+        if self._generation_shm is None:
+            self._generation_shm = shared_memory.SharedMemory(create=True, size=8)
+            self._init_generation()
+            self._generation[0] = 0
+            self._seen = 0
+
+    def _init_budget(self, max_bytes, policy):
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.pinned = set()
+        self.evictions = 0
+        self._nbytes = {}  # key -> segment size, writer only
+        self._usage = {}  # key -> [last used (monotonic), hits], writer only
+
+    def __getstate__(self):
+        self._create_generation()
+        return {
+            "_registry": self._registry,
+            "_compact_rows": self._compact_rows,
+            "_generation": self._generation_shm.name,
+        }
+
+    def __setstate__(self, state):
+        self._registry = state["_registry"]
+        self._compact_rows = state["_compact_rows"]
+        self._headers = {}
+        self._segments = {}
+        self._retired = []
+        self._generation_shm = shared_memory.SharedMemory(name=state["_generation"])
+        self._init_generation()
+        self._init_budget(0, "lru")  # workers only read
+
+    def _header(self, key):
+        header = self._headers.get(key)
+        if header is None:
+            header = self._registry.get(key)
+        return header
+
+    # ------------------------------------------------------------------ #
+    # Segments                                                           #
+    # ------------------------------------------------------------------ #
+    def _release(self, shm, unlink=False):
+        if unlink:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        try:
+            shm.close()
+        except BufferError:
+            # numpy views of this segment are still alive
+            self._retired.append(shm)
+
+    def _collect_retired(self):
+        retired = self._retired
+        self._retired = []
+        for shm in retired:
+            self._release(shm)
+
+    def _bump(self):
+        # after the registry changed and the old segment was unlinked
+        self._create_generation()
+        self._generation[0] += 1
+        self._seen = int(self._generation[0])
+
+    def _prune(self):
+        """Close the mappings of segments swapped or unlinked by the writer."""
+        if self._generation is None:
+            return  # the writer itself, nothing swapped yet
+        generation = int(self._generation[0])
+        if generation == self._seen:
+            return
+        self._seen = generation
+
+        for key, shm in list(self._segments.items()):
+            header = self._registry.get(key)
+            if header is None or header["shm"] != shm.name:
+                del self._segments[key]
+                self._release(shm)
+        self._collect_retired()
+
+    def _touch(self, key):
+        usage = self._usage.get(key)
+        if usage is not None:
+            usage[0] = time.monotonic()
+            usage[1] += 1
+
+    def _attach(self, key, header):
+        shm = self._segments.get(key)
+        if shm is not None and shm.name == header["shm"]:
+            return shm
+
+        if shm is not None:
+            self._release(shm)
+        self._collect_retired()
+
+        shm = shared_memory.SharedMemory(name=header["shm"])
+        self._segments[key] = shm
+        return shm
+
+    # ------------------------------------------------------------------ #
+    # Reading                                                            #
+    # ------------------------------------------------------------------ #
+    def series(self, key):
+        self._prune()
+        for _ in range(3):
+            header = self._header(key)
+            if header is None:
+                return None
+            try:
+                shm = self._attach(key, header)
+            except FileNotFoundError:
+                continue  # segment was swapped in the meantime, re-read header
+
+            self._touch(key)
+            meta, dates, values = _layout(shm, header)
+            length, version = int(meta[0]), int(meta[1])
+            dates = dates[:length]
+            values = values[:, :length]
+            dates.flags.writeable = False
+            values.flags.writeable = False
+
+            return CandleSeries(
+                dates,
+                values,
+                header["columns"],
+                version,
+                header["last_fetched_time"],
+                header["shm"],
+            )
+
+        logging.error(f"Unable to attach candle segment for {key}")
+        return None
+
+    def get(self, key, default=None):
+        series = self.series(key)
+        if series is None:
+            return default
+        return {
+            "cached_df": series.to_df(),
+            "last_fetched_time": series.last_fetched_time,
+        }
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return key in self._headers or key in self._registry
+
+    def keys(self):
+        return self._registry.keys()
+
+    # ------------------------------------------------------------------ #
+    # Writing (server process only)                                      #
+    # ------------------------------------------------------------------ #
+    def put(self, key, dates, values, columns, last_fetched_time=None, coverage=None):
+        """
+        Replace the whole series with `dates` (int64 ns) and `values`.
+
+        `coverage` defaults to the current one, or to the span of `dates` for
+        a new series.
+        """
+        header = self._header(key)
+        version = 0
+        if header is not None:
+            try:
+                meta, _, _ = _layout(self._attach(key, header), header)
+                version = int(meta[1])
+            except FileNotFoundError:
+                pass
+            if last_fetched_time is None:
+                last_fetched_time = header["last_fetched_time"]
+            if coverage is None:
+                coverage = header.get("coverage")
+
+        if coverage is None:
+            coverage = [[int(dates[0]), int(dates[-1])]] if len(dates) else []
+
+        if last_fetched_time is None:
+            last_fetched_time = datetime.now(timezone.utc)
+
+        length = len(dates)
+        capacity = max(MIN_CAPACITY, length + length // 2)
+        dtype = np.float64
+        if self._compact_rows and length > self._compact_rows:
+            dtype = np.float32
+
+        shm = shared_memory.SharedMemory(
+            create=True, size=_segment_size(capacity, len(columns), dtype)
+        )
+        header = {
+            "shm": shm.name,
+            "capacity": capacity,
+            "columns": list(columns),
+            "dtype": np.dtype(dtype).str,
+            "last_fetched_time": last_fetched_time,
+            "coverage": coverage,
+        }
+        meta, seg_dates, seg_values = _layout(shm, header)
+        seg_dates[:length] = dates
+        seg_values[:, :length] = values
+        meta[1] = version + 1
+        meta[0] = length
+
+        old = self._segments.pop(key, None)
+        self._segments[key] = shm
+        self._headers[key] = header
+        self._registry[key] = header
+        if old is not None:
+            self._release(old, unlink=True)
+            self._bump()
+
+        self._nbytes[key] = shm.size
+        self._usage.setdefault(key, [0.0, 0])
+        self._touch(key)
+        self._evict(keep=key)
+
+    def coverage(self, key):
+        """Sorted `[start, end]` ranges (int64 ns) fetched for the series."""
+        header = self._header(key)
+        if header is None:
+            return []
+        return header.get("coverage", [])
+
+    def set_coverage(self, key, coverage):
+        header = self._header(key)
+        if header is None:
+            return
+        header = dict(header, coverage=coverage)
+        self._headers[key] = header
+        self._registry[key] = header
+
+    def merge(self, key, dates, values, columns):
+        """
+        Merge rows into the series; on equal dates the new row wins.
+
+        Sorted rows starting at or after the last candle (streaming ticks,
+        gap fetches) are written into the segment in place, which is O(1)
+        per row. Anything else rebuilds the segment once.
+        """
+        if len(dates) == 0:
+            return
+
+        columns = list(columns)
+        header = self._header(key)
+
+        if header is not None and columns == header["columns"]:
+            in_order = len(dates) == 1 or bool(np.all(dates[1:] > dates[:-1]))
+            if in_order and self._append(key, header, dates, values):
+                self._touch(key)  # a streamed series is in use
+                return
+
+        if header is None:
+            all_dates, all_values, all_columns = dates, values, columns
+        else:
+            series = self.series(key)
+            all_columns = list(header["columns"])
+            all_columns += [c for c in columns if c not in all_columns]
+
+            all_dates = np.concatenate([series.dates, dates])
+            all_values = np.full((len(all_columns), len(all_dates)), np.nan)
+            all_values[: len(header["columns"]), : len(series)] = series.values
+            for i, column in enumerate(columns):
+                all_values[all_columns.index(column), len(series) :] = values[i]
+
+        # stable sort keeps the newer row last among equal dates
+        order = np.argsort(all_dates, kind="stable")
+        all_dates = all_dates[order]
+        all_values = all_values[:, order]
+        keep = np.append(all_dates[1:] != all_dates[:-1], True)
+
+        self.put(key, all_dates[keep], all_values[:, keep], all_columns)
+
+    def _append(self, key, header, dates, values):
+        capacity = header["capacity"]
+        meta, seg_dates, seg_values = _layout(self._attach(key, header), header)
+        length = int(meta[0])
+
+        start = length
+        if length > 0:
+            last = seg_dates[length - 1]
+            if dates[0] < last:
+                return False
+            if dates[0] == last:
+                start = length - 1  # overwrite the forming candle
+
+        end = start + len(dates)
+        if end > capacity:
+            self.put(
+                key,
+                np.concatenate([seg_dates[:start], dates]),
+                np.concatenate([seg_values[:, :start], values], axis=1),
+                header["columns"],
+            )
+            return True
+
+        seg_dates[start:end] = dates
+        seg_values[:, start:end] = values
+        meta[0] = end  # publish the new length after the rows are written
+        meta[1] += 1
+        return True
+
+    def __setitem__(self, key, cached_data):
+        df = cached_data["cached_df"]
+        dates, values = _df_to_columns(df)
+        self.put(
+            key, dates, values, list(df.columns), cached_data.get("last_fetched_time")
+        )
+
+    def __delitem__(self, key):
+        self._nbytes.pop(key, None)
+        self._usage.pop(key, None)
+        self._headers.pop(key, None)
+        header = self._registry.pop(key)
+        shm = self._segments.pop(key, None)
+        if shm is None:
+            try:
+                shm = shared_memory.SharedMemory(name=header["shm"])
+            except FileNotFoundError:
+                return
+        self._release(shm, unlink=True)
+        self._bump()
+
+    # ------------------------------------------------------------------ #
+    # Memory budget (server process only)                                #
+    # ------------------------------------------------------------------ #
+    @property
+    def nbytes(self):
+        return sum(self._nbytes.values())
+
+    def pin(self, key):
+        self.pinned.add(key)
+
+    def set_pinned(self, keys):
+        self.pinned = set(keys)
+
+    def _evictable(self, keep=None):
+        keys = [k for k in self._usage if k not in self.pinned and k != keep]
+        if self.policy == "lfu":
+            return sorted(keys, key=lambda k: (self._usage[k][1], self._usage[k][0]))
+        return sorted(keys, key=lambda k: self._usage[k][0])
+
+    def _evict(self, keep=None):
+        if not self.max_bytes:
+            return []
+
+        total = self.nbytes
+        evicted = []
+        if total > self.max_bytes:
+            for key in self._evictable(keep):
+                total -= self._nbytes[key]
+                del self[key]
+                evicted.append(key)
+                if total <= self.max_bytes:
+                    break
+
+        if evicted:
+            self.evictions += len(evicted)
+            logging.info(f"Evicted {len(evicted)} series from the candle store")
+        if total > self.max_bytes:
+            logging.warning(
+                f"Candle store holds {total} bytes over its budget of {self.max_bytes}"
+            )
+        return evicted
+
+    def release_idle(self, seconds):
+        """Drop unpinned series not used for `seconds`."""
+        now = time.monotonic()
+        idle = [k for k in self._evictable() if now - self._usage[k][0] > seconds]
+        for key in idle:
+            del self[key]
+        return idle
+
+    def stats(self):
+        now = time.monotonic()
+        entries = [
+            {
+                "source": key[0],
+                "name": key[1],
+                "interval": key[2],
+                "bytes": self._nbytes[key],
+                "hits": self._usage[key][1],
+                "idle_seconds": round(now - self._usage[key][0], 1),
+                "pinned": key in self.pinned,
+            }
+            for key in self._nbytes
+        ]
+        entries.sort(key=lambda e: e["bytes"], reverse=True)
+        return {
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "policy": self.policy,
+            "series": len(entries),
+            "pinned": sum(e["pinned"] for e in entries),
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+    def close(self):
+        """Unlink all segments, called once on shutdown."""
+        for key in list(self._registry.keys()):
+            try:
+                del self[key]
+            except KeyError:
+                pass
+        self._collect_retired()
+        if self._generation_shm is not None:
+            self._generation = None
+            self._generation_shm.close()
+            self._generation_shm.unlink()
+            self._generation_shm = None
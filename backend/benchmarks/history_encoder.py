@@ -0,0 +1,113 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Per-row cost of serializing a data_init/data_history payload: the DataFrame
+path (the former `utils.get_last_n_items` + `json.dumps`) against
+`app/encoder.py`.
+
+    cd backend && python benchmarks/history_encoder.py
+"""
+
+import os
+import sys
+import json
+import timeit
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+def load(name):
+    # load the module alone, importing the app package starts the server state
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(BACKEND, "app", f"{name}.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+store = load("store")
+encoder = load("encoder")
+
+
+def make_series(rows, dtype=np.float64):
+    rng = np.random.default_rng(0)
+    dates = np.arange(rows, dtype=np.int64) * 60 * 10**9 + 1_700_000_040 * 10**9
+    close = 30000 + rng.normal(size=rows).cumsum()
+    values = np.vstack([close, close + 5, close - 5, close + 1, rng.random(rows) * 100])
+    columns = [
+        f"Binance-BTCUSDT-1m-{c}" for c in ("open", "high", "low", "close", "volume")
+    ]
+    return store.CandleSeries(dates, values.astype(dtype), columns, 1, None)
+
+
+MESSAGE = {
+    "type": "data_init",
+    "source": "Binance",
+    "name": "BTCUSDT",
+    "interval": "1m",
+    "metadata": None,
+}
+
+
+def get_last_n_items(cached_data, n):
+    # the records path the encoder replaced, kept here for comparison
+    last_n_df = cached_data["cached_df"].tail(n).copy().reset_index()
+    if "date" in last_n_df.columns and pd.api.types.is_datetime64_any_dtype(
+        last_n_df["date"]
+    ):
+        last_n_df["date"] = last_n_df["date"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return last_n_df.replace({np.nan: None}).to_dict("records")
+
+
+def dataframe_path(series, count):
+    cached_data = {"cached_df": series.to_df()}
+    return json.dumps(dict(MESSAGE, data=get_last_n_items(cached_data, count)))
+
+
+def encoder_path(series, count):
+    dates, values = encoder.history_slice(series, count=count)
+    return encoder.encode_message(
+        MESSAGE, encoder.encode_rows(dates, values, series.columns)
+    )
+
+
+def bench(fn, series, count, repeat=5):
+    number = max(1, 20000 // count)
+    best = min(timeit.repeat(lambda: fn(series, count), number=number, repeat=repeat))
+    return best / number / count * 1e6  # microseconds per row
+
+
+def main():
+    print(
+        f"{'rows':>6} {'dtype':>8} {'dataframe us/row':>17} {'encoder us/row':>15} {'x':>6}"
+    )
+    for dtype in (np.float64, np.float32):
+        series = make_series(10000, dtype)
+        for count in (300, 1000, 5000):
+            assert json.loads(dataframe_path(series, count)) == json.loads(
+                encoder_path(series, count)
+            )
+            old = bench(dataframe_path, series, count)
+            new = bench(encoder_path, series, count)
+            name = np.dtype(dtype).name
+            print(f"{count:>6} {name:>8} {old:>17.2f} {new:>15.2f} {old / new:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Building the input rows of `send_indicator_data` for two datasources: the
+former DataFrame path (`iterrows` per source, `pd.merge` on the dates)
+against `app/indicator_io.py`.
+
+    cd backend && python benchmarks/indicator_inputs.py
+"""
+
+import os
+import sys
+import types
+import timeit
+import importlib
+
+import numpy as np
+import pandas as pd
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# a bare `app` package, importing the real one starts the server state
+package = types.ModuleType("app")
+package.__path__ = [os.path.join(BACKEND, "app")]
+sys.modules["app"] = package
+
+store = importlib.import_module("app.store")
+indicator_io = importlib.import_module("app.indicator_io")
+
+
+class Cache:
+    def __init__(self, series):
+        self._series = series
+
+    def series(self, key):
+        return self._series.get(key)
+
+    def get(self, key, default=None):
+        series = self.series(key)
+        if series is None:
+            return default
+        return {"cached_df": series.to_df()}
+
+
+def make_cache(rows):
+    rng = np.random.default_rng(0)
+    dates = np.arange(rows, dtype=np.int64) * 60 * 10**9 + 1_700_000_040 * 10**9
+    close = 30000 + rng.normal(size=rows).cumsum()
+    btc = store.CandleSeries(
+        dates,
+        np.vstack([close, rng.random(rows) * 100]),
+        ["Binance-BTCUSDT-1m-close", "Binance-BTCUSDT-1m-volume"],
+        1,
+        None,
+    )
+    # the second series misses every tenth candle, so the join drops rows
+    kept = np.arange(rows) % 10 != 3
+    eth = store.CandleSeries(
+        dates[kept],
+        np.vstack([close[kept] / 15]),
+        ["Binance-ETHUSDT-1m-close"],
+        1,
+        None,
+    )
+    return Cache(
+        {
+            ("Binance", "BTCUSDT", "1m"): btc,
+            ("Binance", "ETHUSDT", "1m"): eth,
+        }
+    )
+
+
+DATA_MAP = {
+    "close": {
+        "source": "Binance",
+        "name": "BTCUSDT",
+        "interval": "1m",
+        "value": "Binance-BTCUSDT-1m-close",
+    },
+    "other": {
+        "source": "Binance",
+        "name": "ETHUSDT",
+        "interval": "1m",
+        "value": "Binance-ETHUSDT-1m-close",
+    },
+}
+
+
+def dataframe_path(cache, range):
+    df = pd.DataFrame()
+    for datasource in DATA_MAP.values():
+        key = (datasource["source"], datasource["name"], datasource["interval"])
+        column = datasource["value"]
+        cached_df = cache.get(key)["cached_df"]
+        if range:
+            t = cached_df.index[-1].to_pydatetime()
+            index_to = np.argmin(np.abs(cached_df.index.to_pydatetime() - t))
+            idf = cached_df.iloc[0 : index_to + 1]
+        else:
+            idf = cached_df
+        idf = pd.DataFrame(
+            [[index, float(row[column])] for index, row in idf.iterrows()]
+        )
+        idf.columns = ["Date", column]
+        df = idf if df.empty else pd.merge(df, idf, on=["Date"], how="inner")
+    df["Date"] = df["Date"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return df.values
+
+
+def columns_path(cache, range):
+    dates, columns, _, _ = indicator_io.load_inputs(cache, DATA_MAP, range, 600)
+    return indicator_io.input_rows(dates, columns)
+
+
+def bench(fn, cache, range, repeat):
+    return min(timeit.repeat(lambda: fn(cache, range), number=1, repeat=repeat))
+
+
+def main():
+    print(
+        f"{'candles':>8} {'mode':>6} {'dataframe ms':>13} {'columns ms':>11} {'x':>7}"
+    )
+    for rows in (1000, 10000, 100000):
+        cache = make_cache(rows)
+        for range in (None, ["2023-11-14 22:14:00", "2023-11-15 00:00:00"]):
+            old_rows = dataframe_path(cache, range)
+            new_rows = columns_path(cache, range)
+            assert old_rows.shape == new_rows.shape
+            assert (old_rows == new_rows).all()
+
+            repeat = 3 if rows > 10000 else 5
+            old = bench(dataframe_path, cache, range, repeat) * 1e3
+            new = bench(columns_path, cache, range, repeat) * 1e3
+            mode = "range" if range else "count"
+            print(f"{rows:>8} {mode:>6} {old:>13.2f} {new:>11.2f} {old / new:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Startup cost of the indicator registry in a fresh process, as every spawned
+provider and indicator worker pays it: importing every indicator module (the
+former `get_indicator_data`) against reading `indicators/manifest.json`.
+
+    cd backend && python benchmarks/indicator_registry.py
+"""
+
+import os
+import sys
+import subprocess
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import sys, time, resource
+t = time.perf_counter()
+import indicators
+registry = {call}
+elapsed = time.perf_counter() - t
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, rss, len(sys.modules))
+"""
+
+MODES = {
+    "modules": "indicators.build_manifest()",
+    "manifest": "indicators.get_indicator_data()",
+}
+
+
+def probe(call):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(call=call)],
+        cwd=BACKEND,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    return float(out[0]), int(out[1]), int(out[2])
+
+
+def main():
+    probe("indicators.write_manifest()")
+
+    print(f"{'registry':>9} {'startup ms':>11} {'max rss MB':>11} {'modules':>8}")
+    for mode, call in MODES.items():
+        runs = [probe(call) for _ in range(3)]
+        elapsed = min(r[0] for r in runs) * 1e3
+        rss = min(r[1] for r in runs) / 1024  # ru_maxrss is in KB on Linux
+        print(f"{mode:>9} {elapsed:>11.1f} {rss:>11.1f} {runs[0][2]:>8}")
+
+
+if __name__ == "__main__":
+    main()
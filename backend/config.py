@@ -55,8 +55,38 @@ CONFIG_FIELDS = [
         str(60 * 24),
         "Duration in minutes to retain the cache when not accessed by any user",
     ),
+    (
+        "HISTORICAL_CACHE_MAX_MB",
+        "0",
+        "Memory budget of the historical cache in MB (0 disables the budget)",
+    ),
+    (
+        "HISTORICAL_CACHE_EVICTION",
+        "lru",
+        "Eviction policy of the historical cache when over budget (lru or lfu)",
+    ),
+    (
+        "CANDLE_STORE_PATH",
+        "candles",
+        "Directory where candles are persisted for warm restarts (leave empty to disable)",
+    ),
+    (
+        "CANDLE_STORE_COMPACT_ROWS",
+        "0",
+        "Keep series longer than this many candles as float32 (0 keeps float64)",
+    ),
     ("ALERT_WORKERS", "5", "Number of dedicated alert worker threads"),
     ("INDICATOR_WORKERS", "5", "Number of dedicated indicator worker threads"),
+    (
+        "INDICATOR_RESULTS_CACHE_MB",
+        "64",
+        "Memory budget of the indicator results kept by every indicator worker in MB (0 disables them)",
+    ),
+    (
+        "INDICATOR_WORKER_LIMITS",
+        "optimization=1",
+        "Max indicator workers per job class: interactive, update, history, optimization (0 or unset for all, CSV format)",
+    ),
     ("SCANNER_WORKERS", "10", "Number of dedicated scanner worker threads"),
     ("MAX_REQUESTS_PER_IP_PER_HOUR", "100", "Max requests per hour per IP"),
     (
@@ -82,6 +82,22 @@ def fetch_binance_asset_data():
 class BinanceProvider(Provider):
     key = "Binance"
     type = "candlestick"
+    intervals = [
+        "1m",
+        "3m",
+        "5m",
+        "15m",
+        "30m",
+        "1h",
+        "2h",
+        "4h",
+        "6h",
+        "8h",
+        "12h",
+        "1d",
+        "1w",
+        "1M",
+    ]  # served natively, others are resampled locally
     client = "not initialized"
     twm = "not initialized"
     lock = threading.Lock()
@@ -132,22 +148,7 @@ class BinanceProvider(Provider):
                         "name_label": name_label,
                         "type": BinanceProvider.type,
                         "categories": ["Crypto"],
-                        "intervals": [
-                            "1m",
-                            "3m",
-                            "5m",
-                            "15m",
-                            "30m",
-                            "1h",
-                            "2h",
-                            "4h",
-                            "6h",
-                            "8h",
-                            "12h",
-                            "1d",
-                            "1w",
-                            "1M",
-                        ],
+                        "intervals": BinanceProvider.intervals,
                         "outputs": [
                             {"name": f"open", "y_axis": f"price"},
                             {"name": f"high", "y_axis": f"price"},
@@ -219,11 +220,11 @@ class BinanceProvider(Provider):
         )
         return {
             "date": date_str,
-            f"{BinanceProvider.key}-{symbol}-{interval}-open": k[1],
-            f"{BinanceProvider.key}-{symbol}-{interval}-high": k[2],
-            f"{BinanceProvider.key}-{symbol}-{interval}-low": k[3],
-            f"{BinanceProvider.key}-{symbol}-{interval}-close": k[4],
-            f"{BinanceProvider.key}-{symbol}-{interval}-volume": k[5],
+            f"{BinanceProvider.key}-{symbol}-{interval}-open": float(k[1]),
+            f"{BinanceProvider.key}-{symbol}-{interval}-high": float(k[2]),
+            f"{BinanceProvider.key}-{symbol}-{interval}-low": float(k[3]),
+            f"{BinanceProvider.key}-{symbol}-{interval}-close": float(k[4]),
+            f"{BinanceProvider.key}-{symbol}-{interval}-volume": float(k[5]),
         }
 
     def no_update(self, symbol, interval):
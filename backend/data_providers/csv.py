@@ -31,6 +31,13 @@ def replace_non_alphanumeric(text):
     return result
 
 
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
 def clean_header(filepath, date_column, lines_to_check=300):
     with open(filepath, "r", encoding="utf-8") as f:
         header = f.readline().strip().split(",")
@@ -185,11 +192,14 @@ class CSVProvider(Provider):
     def format_datapoint(self, name, interval, k, file_path):
         d = {"date": k["date"]}
         for c, _ in k.items():
+            if c == "date":
+                continue
+
             if len(name) == 1:
-                d[f"{CSVProvider.key}-{name[0]}-{interval}-{c}"] = k[c]
+                d[f"{CSVProvider.key}-{name[0]}-{interval}-{c}"] = to_float(k[c])
 
             if len(name) == 2:
-                d[f"{CSVProvider.key}-{name[0]}__{name[1]}-{interval}"] = k[c]
+                d[f"{CSVProvider.key}-{name[0]}__{name[1]}-{interval}"] = to_float(k[c])
 
         return d
 
@@ -25,6 +25,22 @@ from provider import Provider
 class HyperliquidProvider(Provider):
     key = "Hyperliquid"
     type = "candlestick"
+    intervals = [
+        "1m",
+        "3m",
+        "5m",
+        "15m",
+        "30m",
+        "1h",
+        "2h",
+        "4h",
+        "8h",
+        "12h",
+        "1d",
+        "3d",
+        "1w",
+        "1M",
+    ]  # served natively, others are resampled locally
     client = None
     lock = threading.Lock()
     ws_clients = {}  # Maps (symbol, interval) to list of clients
@@ -89,22 +105,7 @@ class HyperliquidProvider(Provider):
                             "name_label": name_label,
                             "type": HyperliquidProvider.type,
                             "categories": ["Crypto"],
-                            "intervals": [
-                                "1m",
-                                "3m",
-                                "5m",
-                                "15m",
-                                "30m",
-                                "1h",
-                                "2h",
-                                "4h",
-                                "8h",
-                                "12h",
-                                "1d",
-                                "3d",
-                                "1w",
-                                "1M",
-                            ],
+                            "intervals": HyperliquidProvider.intervals,
                             "outputs": [
                                 {"name": "open", "y_axis": "price"},
                                 {"name": "high", "y_axis": "price"},
@@ -188,11 +189,11 @@ class HyperliquidProvider(Provider):
         )
         return {
             "date": date_str,
-            f"{HyperliquidProvider.key}-{symbol}-{interval}-open": k[1],
-            f"{HyperliquidProvider.key}-{symbol}-{interval}-high": k[2],
-            f"{HyperliquidProvider.key}-{symbol}-{interval}-low": k[3],
-            f"{HyperliquidProvider.key}-{symbol}-{interval}-close": k[4],
-            f"{HyperliquidProvider.key}-{symbol}-{interval}-volume": k[5],
+            f"{HyperliquidProvider.key}-{symbol}-{interval}-open": float(k[1]),
+            f"{HyperliquidProvider.key}-{symbol}-{interval}-high": float(k[2]),
+            f"{HyperliquidProvider.key}-{symbol}-{interval}-low": float(k[3]),
+            f"{HyperliquidProvider.key}-{symbol}-{interval}-close": float(k[4]),
+            f"{HyperliquidProvider.key}-{symbol}-{interval}-volume": float(k[5]),
         }
 
     def no_update(self, symbol, interval):
@@ -61,6 +61,23 @@ class PolygonProvider(Provider):
     }
     key = "polygon_io"
     type = "candlestick"
+    intervals = [
+        "1m",
+        "3m",
+        "5m",
+        "15m",
+        "30m",
+        "1h",
+        "2h",
+        "4h",
+        "6h",
+        "8h",
+        "12h",
+        "1d",
+        "3d",
+        "1w",
+        "1M",
+    ]  # served natively, others are resampled locally
     client = "not initialized"
     twm = "not initialized"
     lock = threading.Lock()
@@ -105,23 +122,7 @@ class PolygonProvider(Provider):
                 "name_label": t.name,
                 "type": PolygonProvider.type,
                 "categories": [t.market.capitalize()],
-                "intervals": [
-                    "1m",
-                    "3m",
-                    "5m",
-                    "15m",
-                    "30m",
-                    "1h",
-                    "2h",
-                    "4h",
-                    "6h",
-                    "8h",
-                    "12h",
-                    "1d",
-                    "3d",
-                    "1w",
-                    "1M",
-                ],
+                "intervals": PolygonProvider.intervals,
                 "outputs": [
                     {"name": f"open", "y_axis": f"price"},
                     {"name": f"high", "y_axis": f"price"},
@@ -165,11 +166,13 @@ class PolygonProvider(Provider):
     def format_datapoint(self, ticker, interval, k):
         return {
             "date": k["date"],
-            f"{PolygonProvider.key}-{ticker}-{interval}-open": k["open"],
-            f"{PolygonProvider.key}-{ticker}-{interval}-high": k["high"],
-            f"{PolygonProvider.key}-{ticker}-{interval}-low": k["low"],
-            f"{PolygonProvider.key}-{ticker}-{interval}-close": k["close"],
-            f"{PolygonProvider.key}-{ticker}-{interval}-volume": k["volume"],
+            f"{PolygonProvider.key}-{ticker}-{interval}-open": float(k["open"]),
+            f"{PolygonProvider.key}-{ticker}-{interval}-high": float(k["high"]),
+            f"{PolygonProvider.key}-{ticker}-{interval}-low": float(k["low"]),
+            f"{PolygonProvider.key}-{ticker}-{interval}-close": float(k["close"]),
+            f"{PolygonProvider.key}-{ticker}-{interval}-volume": float(
+                k["volume"] or 0
+            ),
         }
 
     def interval_date(self, interval, date_str):
@@ -66,23 +66,16 @@ def populate_database(database_path):
             d = {
                 "categories": indicator["categories"],
                 "library": indicator["path"].split(".")[1],
-                "columns": indicator["klass"].columns,
+                "columns": indicator["columns"],
                 "inputs": [
                     {"name": i["name"], "default": i["default"]}
-                    for i in indicator["klass"].inputs
+                    for i in indicator["inputs"]
                 ],
-                "outputs": [{**i} for i in indicator["klass"].outputs],
+                "outputs": [{**i} for i in indicator["outputs"]],
             }
-            if hasattr(indicator["klass"], "optimization_strategies"):
-                d["optimization_strategies"] = indicator[
-                    "klass"
-                ].optimization_strategies
-
-            if hasattr(indicator["klass"], "mamode"):
-                d["mamode"] = indicator["klass"].mamode
-
-            if hasattr(indicator["klass"], "update_on"):
-                d["update_on"] = indicator["klass"].update_on
+            for attribute in ("optimization_strategies", "mamode", "update_on"):
+                if attribute in indicator:
+                    d[attribute] = indicator[attribute]
 
             data_entity = {
                 "id": indicator["path"],
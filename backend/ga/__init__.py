@@ -93,6 +93,8 @@ class GA:
             # num_genes=num_genes,
             "num_parents_mating": num_parents_mating,
             "fitness_func": self.fitness.get_func(),
+            # the fitness evaluates a generation with one indicator sweep
+            "fitness_batch_size": self.sol_per_pop,
             "on_generation": on_generation,
             "mutation_type": "random",
             "parallel_processing": self.parallel_processing,
@@ -107,7 +109,16 @@ class GA:
 
 
 def calculate(
-    strategy, settings, source, name, interval, indicator, data_map, history, ws_url
+    strategy,
+    settings,
+    source,
+    name,
+    interval,
+    indicator,
+    data_map,
+    history,
+    ws_url,
+    sweep,
 ):
     num_generations = 50
     sol_per_pop = 4
@@ -146,6 +157,7 @@ def calculate(
             data_map,
             history,
             ws,
+            sweep,
         )
     else:
         return None
@@ -34,6 +34,7 @@ class OscillatorFitness:
         data_map,
         history,
         ws,
+        sweep,
     ):
         self.settings = settings
         self.source = source
@@ -44,6 +45,9 @@ class OscillatorFitness:
         self.data_map = data_map
         self.history = history
         self.ws = ws
+        # sweep(input_sets, output) -> indicator_sweep message, see
+        # app.handlers._generation_sweep
+        self.sweep = sweep
 
         self._last_logged_generation = 0
 
@@ -120,37 +124,35 @@ class OscillatorFitness:
         indicator_id = self.indicator["id"]
         indicator_key = f"{indicator_id}-{selected_output}"
 
-        def fitness_func(pygad_instance, solution, solution_idx):
+        def fitness_func(pygad_instance, solutions, solution_indices):
+            # one sweep of the indicator for the whole batch of solutions
             if not data:
-                return -sys.float_info.max
-
-            inputs = {}
-            for i, input in enumerate(self.genetic_indicator.inputs):
-                inputs[input["name"]] = solution[i]
-
-            indicator_data = self.receive_message(
-                "indicator_history",
-                {
-                    "type": "indicator_history",
-                    "id": self.indicator["id"],
-                    "indicator": self.indicator,
-                    "inputs": inputs,
-                    "dataMap": self.data_map,
-                    "count": self.history,
-                    "render": {},
-                },
-            )
-            if data and indicator_data:
-                try:
-                    df_indicator_data = pd.DataFrame(indicator_data["data"])
-                    df_merged = pd.merge(
-                        df_data, df_indicator_data, on="date", how="left"
+                return [-sys.float_info.max] * len(solutions)
+
+            input_sets = []
+            for solution in solutions:
+                inputs = {}
+                for i, input in enumerate(self.genetic_indicator.inputs):
+                    value = solution[i]
+                    inputs[input["name"]] = (
+                        value.item() if hasattr(value, "item") else value
                     )
-                    return self.simulate_trading(df_merged, close_key, indicator_key)
-                except Exception as e:
-                    raise e
+                input_sets.append(inputs)
 
-            return -sys.float_info.max
+            sweep_data = self.sweep(input_sets, selected_output)
+            if not sweep_data:
+                return [-sys.float_info.max] * len(solutions)
+
+            fitness = []
+            for values in sweep_data["data"]:
+                df_indicator_data = pd.DataFrame(
+                    {"date": sweep_data["dates"], indicator_key: values}
+                )
+                df_merged = pd.merge(df_data, df_indicator_data, on="date", how="left")
+                fitness.append(
+                    self.simulate_trading(df_merged, close_key, indicator_key)
+                )
+            return fitness
 
         return fitness_func
 
@@ -7,6 +7,8 @@ Author: https://github.com/JaktensTid/true-zigzag
 """
 
 from math import floor
+from collections import OrderedDict, deque
+
 import pandas as pd
 import pandas_ta as ta
 import numpy as np
@@ -18,68 +20,210 @@ def _calc_dev(base_price, price):
     return 100 * (price - base_price) / base_price
 
 
+def _pivots(src, length, is_high):
+    """
+    Positions (oldest first) and prices of the pivots of `src`: the bars
+    above (below) the `length` bars before them and not below (above) the
+    `length` bars after them. Bars without `length` bars after them, the
+    first `length + 1` ones and NaN neighbours never count against a bar.
+    """
+    n = len(src)
+    if length < 1 or n < 2 * length + 2:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    # extremes of src[k:k + length], NaNs skipped as comparisons with them fail
+    windows = np.lib.stride_tricks.sliding_window_view(src, length)
+    pos = np.arange(length + 1, n - length)
+    p = src[pos]
+    if is_high:
+        extremes = np.fmax.reduce(windows, axis=1)
+        found = ~(extremes[pos + 1] > p) & ~(extremes[pos - length] >= p)
+    else:
+        extremes = np.fmin.reduce(windows, axis=1)
+        found = ~(extremes[pos + 1] < p) & ~(extremes[pos - length] <= p)
+    return pos[found], p[found]
+
+
+def _pairs(high_pos, high_p, low_pos, low_p, dev_threshold):
+    """
+    Every high paired with the first low after it, if they are
+    `dev_threshold` percent apart. Of the highs paired with the same low the
+    highest is kept, the latest of equal ones. Arrays `(high position, high,
+    low position, low)`, oldest first.
+    """
+    nearest = np.searchsorted(low_pos, high_pos, "right")
+    paired = nearest < len(low_pos)
+    high_pos, high_p, nearest = high_pos[paired], high_p[paired], nearest[paired]
+    if np.any(low_p[nearest] == 0):
+        raise ZeroDivisionError("float division by zero")
+
+    deviating = np.abs(_calc_dev(low_p[nearest], high_p)) >= dev_threshold
+    high_pos, high_p = high_pos[deviating], high_p[deviating]
+    nearest = nearest[deviating]
+
+    order = np.lexsort((-high_pos, -high_p, nearest))
+    _, first = np.unique(nearest[order], return_index=True)
+    best = order[first]
+    return high_pos[best], high_p[best], low_pos[nearest[best]], low_p[nearest[best]]
+
+
 def zigzag(highs, lows, depth=10, dev_threshold=5):
-    def pivots(src_raw, length, isHigh):
-        src = list(reversed(src_raw))
-        bar_index = list(range(len(src)))
-        for start in range(0, len(src)):
-            if start + 2 * length + 1 > len(src) - 1:
-                return
-            p = 0
-            if length < len(src) - start:
-                p = src[start + length]
-            if length == 0:
-                yield 0, p
-            else:
-                isFound = True
-                for i in range(start, start + length):
-                    if isHigh and src[i] > p:
-                        isFound = False
-                    if not isHigh and src[i] < p:
-                        isFound = False
-                for i in range(start + length + 1, start + 2 * length + 1):
-                    if isHigh and src[i] >= p:
-                        isFound = False
-                    c = not isHigh and src[i] <= p
-                    if c:
-                        isFound = False
-                if isFound:
-                    yield (bar_index[start + length], p)
-                else:
-                    yield None, None
-
-    data_highs = [x for x in pivots(highs, floor(depth / 2), True) if x[0]]
-    data_lows = [x for x in pivots(lows, floor(depth / 2), False) if x[0]]
-
-    raw_pairs = []
-
-    for i, (ind, p) in enumerate(data_highs):
-        lows_d = sorted(
-            [(ind_l, p_l) for ind_l, p_l in data_lows if ind > ind_l],
-            key=lambda x: x[0],
-        )
-        if lows_d:
-            lows = lows_d[-1]
+    """
+    Pairs `((high index, high), (low index, low))`, latest first, indices
+    counted back from the last bar.
+    """
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    length = floor(depth / 2)
+    pairs = _pairs(
+        *_pivots(highs, length, True), *_pivots(lows, length, False), dev_threshold
+    )
+
+    last = len(highs) - 1
+    return [
+        ((last - h_pos, h_p), (last - l_pos, l_p))
+        for h_pos, h_p, l_pos, l_p in zip(*(a.tolist() for a in pairs))
+    ][::-1]
+
+
+def _points(pairs):
+    """
+    Positions and prices of the pivots of `pairs`, by position. Written
+    latest pair first, of two pivots on one bar the earlier pair's stays.
+    """
+    if not pairs:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    points = [point for pair in reversed(pairs) for point in pair]
+    positions = np.array([pos for pos, _ in reversed(points)], dtype=np.int64)
+    prices = np.array([p for _, p in reversed(points)], dtype=np.float64)
+    positions, last = np.unique(positions, return_index=True)
+    prices = prices[last]
+    valid = ~np.isnan(prices)
+    return positions[valid], prices[valid]
+
+
+class ZigZagStream:
+    """
+    `zigzag` advanced one bar at a time, positions counted from the first
+    bar. A bar confirms the pivots `length` bars before it at most, and only
+    a new low adds a pair, with the highs since the previous low: the last
+    leg is all a step re-evaluates.
+
+    `step(high, low, commit)` returns the pair the bar adds, if any. With
+    `commit=False` the stream is left as it was, to revise the forming bar.
+    """
 
-            if abs(_calc_dev(lows[1], p)) >= dev_threshold:
-                raw_pairs.append(((ind, p), (lows[0], lows[1])))
+    def __init__(self, depth, dev_threshold):
+        self.length = floor(depth / 2)
+        self.dev_threshold = dev_threshold
+        self.count = 0  # committed bars
+        self.recent = deque(maxlen=2 * self.length)  # (high, low) of the last ones
+        self.highs = []  # pivot highs since the last pivot low
+        self.pairs = []  # oldest first
 
-    result = []
+    @classmethod
+    def from_arrays(cls, highs, lows, depth, dev_threshold):
+        """A stream with the bars `highs`, `lows` committed."""
+        stream = cls(depth, dev_threshold)
+        length = stream.length
+        high_pos, high_p = _pivots(highs, length, True)
+        low_pos, low_p = _pivots(lows, length, False)
+        pairs = _pairs(high_pos, high_p, low_pos, low_p, dev_threshold)
 
-    for (i_h, p_h), (i_l, p_l) in raw_pairs:
-        if not result:
-            result.append(((i_h, p_h), (i_l, p_l)))
-            continue
+        stream.count = len(highs)
+        if length > 0:
+            stream.recent.extend(
+                zip(highs[-2 * length :].tolist(), lows[-2 * length :].tolist())
+            )
+        pending = high_pos >= low_pos[-1] if len(low_pos) else slice(None)
+        stream.highs = list(zip(high_pos[pending].tolist(), high_p[pending].tolist()))
+        stream.pairs = [
+            ((h_pos, h_p), (l_pos, l_p))
+            for h_pos, h_p, l_pos, l_p in zip(*(a.tolist() for a in pairs))
+        ]
+        return stream
 
-        if i_l == result[-1][1][0]:
-            if p_h > result[-1][0][1]:
-                result = result[:-1]
-            else:
-                continue
+    def step(self, high, low, commit=True):
+        length = self.length
+        pair = None
+        is_high = is_low = False
+        if length > 0 and self.count >= 2 * length + 1:
+            bars = list(self.recent) + [(high, low)]
+            pos = self.count - length
+            h, l = bars[length]
+            before, after = bars[:length], bars[length + 1 :]
+            is_high = not any(b[0] > h for b in after) and not any(
+                b[0] >= h for b in before
+            )
+            is_low = not any(b[1] < l for b in after) and not any(
+                b[1] <= l for b in before
+            )
+            if is_low:
+                pair = self._pair(pos, l)
 
-        result.append(((i_h, p_h), (i_l, p_l)))
+        if commit:
+            self.count += 1
+            self.recent.append((high, low))
+            if is_low:
+                self.highs = []
+                if pair is not None:
+                    self.pairs.append(pair)
+            if is_high:
+                self.highs.append((pos, h))
+        return pair
 
-    return result
+    def _pair(self, pos, low):
+        best = None
+        for high in reversed(self.highs):
+            if abs(_calc_dev(low, high[1])) >= self.dev_threshold:
+                if best is None or high[1] > best[1]:
+                    best = high
+        return None if best is None else (best, (pos, low))
+
+    def points(self, pair=None):
+        """Positions and prices of the pivots, with a pending `pair`."""
+        return _points(self.pairs if pair is None else self.pairs + [pair])
+
+
+MAX_STREAMS = 32
+# bars a cached stream steps through at most, more are computed in full
+MAX_STEPS = 256
+
+# (depth, dev_threshold, first date) -> (stream, highs, lows) of the closed
+# bars it holds, least recently used first; separate in every worker process
+streams = OrderedDict()
+
+
+def _closed_stream(dates, highs, lows, depth, dev_threshold):
+    """A stream with all the bars but the forming one committed."""
+    closed = len(dates) - 1
+    key = (depth, dev_threshold, dates[0])
+    stream = None
+    cached = streams.pop(key, None)
+    if cached is not None:
+        stream, stream_highs, stream_lows = cached
+        count = stream.count
+        if (
+            closed - MAX_STEPS <= count <= closed
+            and np.array_equal(stream_highs, highs[:count], equal_nan=True)
+            and np.array_equal(stream_lows, lows[:count], equal_nan=True)
+        ):
+            for high, low in zip(
+                highs[count:closed].tolist(), lows[count:closed].tolist()
+            ):
+                stream.step(high, low)
+        else:
+            stream = None
+
+    if stream is None:
+        stream = ZigZagStream.from_arrays(
+            highs[:closed], lows[:closed], depth, dev_threshold
+        )
+    streams[key] = (stream, highs[:closed], lows[:closed])
+    while len(streams) > MAX_STREAMS:
+        streams.popitem(last=False)
+    return stream
 
 
 class ZIGZAG(Indicator):
@@ -102,43 +246,23 @@ class ZIGZAG(Indicator):
     outputs = [{"name": "ZigZag", "y_axis": "price"}]
 
     def calc(self, data, depth, dev_threshold):
-        df = pd.DataFrame(data)
-        df.columns = ["Date"] + self.columns
-        df.set_index(pd.DatetimeIndex(df["Date"]), inplace=True)
-        df[df.columns.difference(["Date"])] = (
-            df[df.columns.difference(["Date"])]
-            .apply(pd.to_numeric, errors="coerce")
-            .astype(np.float64)
-        )
-        out_name = "zig_zag"
-
-        # 1. Prepare an empty column.
-        df[out_name] = np.nan
-
-        # 2. Calculate pivot pairs.
-        zz_pairs = zigzag(
-            df["high"].tolist(),
-            df["low"].tolist(),
-            depth=int(depth),
-            dev_threshold=float(dev_threshold),
+        if len(data) == 0:
+            return [[]]
+        data = np.asarray(data, dtype=object)
+        dates = data[:, 0].tolist()
+        highs, lows = (
+            pd.to_numeric(pd.Series(data[:, i]), errors="coerce").to_numpy(np.float64)
+            for i in (1, 2)
         )
 
-        # --- pivot assignment only --------------------------------------------------
-        for i, price in sorted(
-            (
-                (len(df) - 1 - idx, p)  # convert reverse index
-                for pair in zz_pairs
-                for (idx, p) in pair
-            ),
-            key=lambda x: x[0],
-        ):
-            df.at[df.index[i], out_name] = price
-
-        # --- let pandas do the linear work -----------------------------------------
-        df[out_name] = df[out_name].interpolate(
-            method="linear", limit_area="inside"  # do NOT extrapolate ends
-        )
+        stream = _closed_stream(dates, highs, lows, int(depth), float(dev_threshold))
+        pair = stream.step(float(highs[-1]), float(lows[-1]), commit=False)
+        positions, prices = stream.points(pair)
+        if len(positions) == 0:
+            return [[]]
 
-        df.dropna(subset=[out_name], inplace=True)
-        result = [[[r["Date"], r[out_name]] for r in df.to_dict(orient="records")]]
-        return result
+        # linear between the pivots, nothing before the first or after the last
+        first, last = positions[0], positions[-1]
+        line = np.interp(np.arange(first, last + 1), positions, prices)
+        line[positions - first] = prices
+        return [[list(pair) for pair in zip(dates[first : last + 1], line.tolist())]]
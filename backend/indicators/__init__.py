@@ -10,11 +10,27 @@
 #
 # For full details, see the LICENSE.md file in the root directory of this project.
 
-from os import listdir
+from os import listdir, replace, stat, getpid
 from os.path import isfile, isdir, join, dirname, abspath
 import importlib
+import json
+import logging
 import sys, inspect
 
+# metadata of every indicator, so that processes look indicators up without
+# importing their modules; rebuilt when an indicator module changes
+MANIFEST = join(dirname(abspath(__file__)), "manifest.json")
+
+# class attributes kept in the manifest, when the class has them
+DESCRIBED = (
+    "columns",
+    "inputs",
+    "outputs",
+    "optimization_strategies",
+    "mamode",
+    "update_on",
+)
+
 
 def _get_modules(module_name):
 
@@ -69,29 +85,89 @@ def _iterator():
                 yield "indicators." + d2 + "." + d3 + "." + f[:-3]
 
 
-def get_indicator_data():
-    indicators = {}
+def _module_file(module_name):
+    parts = module_name.split(".")[1:]
+    return join(dirname(abspath(__file__)), *parts) + ".py"
+
+
+def _sources():
+    sources = {}
+    for m in _iterator():
+        st = stat(_module_file(m))
+        sources[m] = [st.st_mtime_ns, st.st_size]
+    return sources
+
+
+def build_manifest():
+    """Import every indicator module and describe its indicators."""
+    described = {}
     for m in _iterator():
         objs = _get_modules(m)
         for obj in objs:
             k = m + "." + obj.__name__
             if hasattr(obj, "disabled") and obj.disabled:
                 continue
-            indicators[k] = {
+            described[k] = {
                 "path": k,
-                "klass": obj,
                 "name": obj.name if hasattr(obj, "name") else None,
-                "categories": obj.categories if hasattr(obj, "categories") else [],
+                "categories": [
+                    c.lower()
+                    for c in (obj.categories if hasattr(obj, "categories") else [])
+                ],
             }
-            for i, c in enumerate(indicators[k]["categories"]):
-                indicators[k]["categories"][i] = c.lower()
-    return indicators
+            for attribute in DESCRIBED:
+                if hasattr(obj, attribute):
+                    described[k][attribute] = getattr(obj, attribute)
+    return {"sources": _sources(), "indicators": described}
+
+
+def write_manifest(manifest=None):
+    """Write the manifest, built from the modules unless given."""
+    manifest = manifest or build_manifest()
+    tmp = f"{MANIFEST}.{getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    replace(tmp, MANIFEST)
+    return manifest
+
+
+def _read_manifest():
+    """The manifest, None when missing or older than an indicator module."""
+    try:
+        with open(MANIFEST) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("sources") != _sources():
+        return None
+    return manifest
+
+
+class LazyIndicator(dict):
+    """
+    Registry entry of an indicator, its module imported on the first
+    `entry["klass"]`.
+    """
+
+    def __missing__(self, key):
+        if key != "klass":
+            raise KeyError(key)
+        module_name, class_name = self["path"].rsplit(".", 1)
+        self["klass"] = getattr(importlib.import_module(module_name), class_name)
+        return self["klass"]
+
+
+def get_indicator_data():
+    manifest = _read_manifest()
+    if manifest is None:
+        manifest = build_manifest()
+        try:
+            write_manifest(manifest)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"Unable to write the indicators manifest: {e}")
+
+    return {k: LazyIndicator(v) for k, v in manifest["indicators"].items()}
 
 
 def get_indicator_names():
-    indicator_names = []
-    for m in _iterator():
-        objs = _get_modules(m)
-        for obj in objs:
-            indicator_names.append(m + "." + obj.__name__)
-    return indicator_names
+    return list(get_indicator_data())
@@ -0,0 +1,31 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import numpy as np
+import pandas as pd
+
+
+def series(values):
+    """A float64 column as a pandas Series, without copying it."""
+    return pd.Series(values, dtype=np.float64, copy=False)
+
+
+def output_array(result, length, column=None):
+    """
+    float64 values of a pandas_ta result, a Series or the `column`-th column
+    of a DataFrame. NaNs when pandas_ta returned nothing (too short input).
+    """
+    if result is None:
+        return np.full(length, np.nan)
+    if column is not None:
+        result = result.iloc[:, column]
+    return result.to_numpy(dtype=np.float64)
@@ -0,0 +1,727 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Indicator state that advances one bar at a time.
+
+Every state has `step(x, commit)`: the output for `x` given the committed
+bars. With `commit=False` the state is left as it was, so the forming bar
+can be revised on every tick; `commit=True` appends `x` for good. Each step
+is O(1) (amortized for the rolling extremes and moments), but for the
+median, quantiles and mean absolute deviation, O(length).
+
+The primitives follow the pandas / pandas_ta 0.4 computations they stand
+in for, down to the order of the floating point operations where it
+matters.
+"""
+
+import sys
+import math
+import bisect
+from collections import deque
+
+import numpy as np
+
+from indicators.data import kernels
+
+nan = math.nan
+EPSILON = sys.float_info.epsilon
+
+
+def non_zero(diff):
+    """pandas_ta `non_zero_range`, for one value."""
+    return diff + EPSILON if diff == 0 else diff
+
+
+def divide(a, b):
+    """`a / b` with numpy semantics: inf or NaN instead of raising."""
+    if b == 0:
+        if a != a or a == 0:
+            return nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _kahan(total, compensation, x):
+    y = x - compensation
+    t = total + y
+    return t, t - total - y
+
+
+class EWM:
+    """`Series.ewm(com=com, adjust=adjust, min_periods=...).mean()`."""
+
+    def __init__(self, com, adjust=True, min_periods=0):
+        self.alpha = 1.0 / (1.0 + com)
+        self.adjust = adjust
+        self.min_periods = max(int(min_periods), 1)
+        self.state = None  # weighted, old_wt, nobs
+
+    def step(self, x, commit=True):
+        if self.state is None:
+            state = (x, 1.0, int(x == x))
+        else:
+            weighted, old_wt, nobs = self.state
+            is_observation = x == x
+            nobs += is_observation
+            if weighted == weighted:
+                # ignore_na=False: weights decay over missing values too
+                old_wt *= 1.0 - self.alpha
+                if is_observation:
+                    new_wt = 1.0 if self.adjust else self.alpha
+                    if weighted != x:
+                        weighted = old_wt * weighted + new_wt * x
+                        weighted /= old_wt + new_wt
+                    old_wt = old_wt + new_wt if self.adjust else 1.0
+            elif is_observation:
+                weighted = x
+            state = (weighted, old_wt, nobs)
+
+        if commit:
+            self.state = state
+        return state[0] if state[2] >= self.min_periods else nan
+
+
+class _Rolling:
+    """Fixed window of `length` values: the committed ones still in it."""
+
+    def __init__(self, length):
+        self.length = max(int(length), 1)
+        self.window = deque()
+        self.prev_value = nan
+        self.same = 0  # trailing run of equal values, NaNs left out
+
+    def _run(self, x):
+        if x != x:
+            return self.prev_value, self.same
+        return x, self.same + 1 if x == self.prev_value else 1
+
+    def _push(self, x, run):
+        self.prev_value, self.same = run
+        self.window.append(x)
+        if len(self.window) >= self.length:
+            return self.window.popleft()
+        return nan
+
+
+class RollingMean(_Rolling):
+    """`Series.rolling(length).mean()`, a compensated running sum."""
+
+    def __init__(self, length):
+        super().__init__(length)
+        self.sum = (0.0, 0.0)
+        self.nobs = 0
+
+    def step(self, x, commit=True):
+        total, nobs = self.sum, self.nobs
+        if x == x:
+            total, nobs = _kahan(*total, x), nobs + 1
+        run = self._run(x)
+
+        value = nan if nobs < self.length else self._value(total[0], nobs, run)
+
+        if commit:
+            dropped = self._push(x, run)
+            if dropped == dropped:
+                total, nobs = _kahan(*total, -dropped), nobs - 1
+            self.sum, self.nobs = total, nobs
+        return value
+
+    def _value(self, total, nobs, run):
+        return run[0] if run[1] >= nobs else total / nobs
+
+
+class RollingSum(RollingMean):
+    """`Series.rolling(length).sum()`."""
+
+    def _value(self, total, nobs, run):
+        return run[0] * nobs if run[1] >= nobs else total
+
+
+class RollingVar(_Rolling):
+    """`Series.rolling(length).var(ddof)`, Welford's running moments."""
+
+    def __init__(self, length, ddof=1):
+        super().__init__(length)
+        self.ddof = ddof
+        self.moments = (0, 0.0, 0.0, 0.0)  # nobs, mean, ssqdm, compensation
+
+    @staticmethod
+    def _add(moments, x):
+        nobs, mean, ssqdm, compensation = moments
+        nobs += 1
+        prev_mean = mean - compensation
+        y = x - compensation
+        t = y - mean
+        compensation = t + mean - y
+        mean += t / nobs
+        ssqdm += (x - prev_mean) * (x - mean)
+        return nobs, mean, ssqdm, compensation
+
+    @staticmethod
+    def _remove(moments, x):
+        nobs, mean, ssqdm, compensation = moments
+        nobs -= 1
+        if nobs == 0:
+            return 0, 0.0, 0.0, 0.0
+        prev_mean = mean - compensation
+        y = x - compensation
+        t = y - mean
+        compensation = t + mean - y
+        mean -= t / nobs
+        ssqdm -= (x - prev_mean) * (x - mean)
+        return nobs, mean, ssqdm, compensation
+
+    def step(self, x, commit=True):
+        moments = self._add(self.moments, x) if x == x else self.moments
+        run = self._run(x)
+
+        nobs, _, ssqdm, _ = moments
+        if nobs < self.length or nobs <= self.ddof:
+            value = nan
+        elif nobs == 1 or run[1] >= nobs:
+            value = 0.0
+        else:
+            value = max(ssqdm / (nobs - self.ddof), 0.0)
+
+        if commit:
+            dropped = self._push(x, run)
+            if dropped == dropped:
+                moments = self._remove(moments, dropped)
+            self.moments = moments
+        return value
+
+
+class RollingStd(RollingVar):
+    """`Series.rolling(length).var(ddof)`, square-rooted."""
+
+    def step(self, x, commit=True):
+        variance = super().step(x, commit)
+        return math.sqrt(variance) if variance == variance else nan
+
+
+class RollingMoments(_Rolling):
+    """
+    `Series.rolling(length).skew()` (`order=3`) or `.kurt()` (`order=4`),
+    compensated running power sums. Like pandas, the sums are of the values
+    less a rounded offset; it follows the window mean, the sums being
+    recomputed from the window once every `length` bars.
+    """
+
+    def __init__(self, length, order):
+        super().__init__(length)
+        self.order = order
+        self.offset = 0.0
+        self.sums = [(0.0, 0.0)] * order  # sum and compensation of each power
+        self.nobs = 0
+        self.since_refresh = 0
+
+    def _add(self, sums, x, sign):
+        d = x - self.offset
+        return [_kahan(*s, sign * d ** (k + 1)) for k, s in enumerate(sums)]
+
+    def _refresh(self):
+        values = [v for v in self.window if v == v]
+        self.offset = round(math.fsum(values) / len(values)) if values else 0.0
+        self.sums = [
+            (math.fsum((v - self.offset) ** (k + 1) for v in values), 0.0)
+            for k in range(self.order)
+        ]
+        self.since_refresh = 0
+
+    def step(self, x, commit=True):
+        sums, nobs = self.sums, self.nobs
+        if x == x:
+            sums, nobs = self._add(sums, x, 1.0), nobs + 1
+        run = self._run(x)
+
+        if nobs < self.length:
+            value = nan
+        elif self.order == 3:
+            value = self._skew(nobs, *(s[0] for s in sums), run)
+        else:
+            value = self._kurt(nobs, *(s[0] for s in sums), run)
+
+        if commit:
+            dropped = self._push(x, run)
+            if dropped == dropped:
+                sums, nobs = self._add(sums, dropped, -1.0), nobs - 1
+            self.sums, self.nobs = sums, nobs
+            self.since_refresh += 1
+            if self.since_refresh >= self.length:
+                self._refresh()
+        return value
+
+    @staticmethod
+    def _skew(nobs, x, xx, xxx, run):
+        n = float(nobs)
+        a = x / n
+        b = xx / n - a * a
+        c = xxx / n - a * a * a - 3 * a * b
+        if nobs < 3:
+            return nan
+        if run[1] >= nobs:
+            return 0.0
+        if b <= 1e-14:
+            return nan
+        r = math.sqrt(b)
+        return (math.sqrt(n * (n - 1.0)) * c) / ((n - 2) * r * r * r)
+
+    @staticmethod
+    def _kurt(nobs, x, xx, xxx, xxxx, run):
+        n = float(nobs)
+        a = x / n
+        r = a * a
+        b = xx / n - r
+        r = r * a
+        c = xxx / n - r - 3 * a * b
+        r = r * a
+        d = xxxx / n - r - 6 * b * a * a - 4 * c * a
+        if nobs < 4:
+            return nan
+        if run[1] >= nobs:
+            return -3.0
+        if b <= 1e-14:
+            return nan
+        k = (n * n - 1.0) * d / (b * b) - 3 * ((n - 1.0) ** 2)
+        return k / ((n - 2.0) * (n - 3.0))
+
+
+class RollingOrder:
+    """
+    `Series.rolling(length).median()`, or `.quantile(q)` with linear
+    interpolation: the window kept sorted.
+    """
+
+    def __init__(self, length, q=None):
+        self.length = max(int(length), 1)
+        self.q = q
+        self.window = deque()
+        self.sorted = []  # the values of the window but NaNs
+
+    def _value(self, values):
+        nobs = len(values)
+        if nobs < self.length:
+            return nan
+        if self.q is None:
+            mid = nobs // 2
+            if nobs % 2:
+                return values[mid]
+            return (values[mid] + values[mid - 1]) / 2
+        if nobs == 1:
+            return values[0]
+        position = self.q * (nobs - 1)
+        low = int(position)
+        if low == position:
+            return values[low]
+        return values[low] + (values[low + 1] - values[low]) * (position - low)
+
+    def step(self, x, commit=True):
+        values = self.sorted
+        if x == x:
+            if commit:
+                bisect.insort(values, x)
+            else:
+                values = values[:]
+                bisect.insort(values, x)
+        value = self._value(values)
+
+        if commit:
+            self.window.append(x)
+            if len(self.window) >= self.length:
+                dropped = self.window.popleft()
+                if dropped == dropped:
+                    del values[bisect.bisect_left(values, dropped)]
+        return value
+
+
+class RollingMAD:
+    """pandas_ta `mad`: the mean absolute deviation from the window mean."""
+
+    def __init__(self, length):
+        self.length = max(int(length), 1)
+        self.window = deque(maxlen=self.length - 1)
+
+    def step(self, x, commit=True):
+        value = nan
+        if len(self.window) == self.length - 1:
+            values = np.array([*self.window, x])
+            if not np.isnan(values).any():
+                value = float(np.fabs(values - values.mean()).mean())
+        if commit and self.length > 1:
+            self.window.append(x)
+        return value
+
+
+class RollingExtreme:
+    """`Series.rolling(length).max()` (or `.min()`), a monotonic queue."""
+
+    def __init__(self, length, largest=True):
+        self.length = max(int(length), 1)
+        self.largest = largest
+        self.count = 0
+        self.candidates = deque()  # (position, value), best first
+        self.window = deque()
+        self.missing = 0  # NaNs in the window
+
+    def _better(self, a, b):
+        return a >= b if self.largest else a <= b
+
+    def step(self, x, commit=True):
+        first = self.count - self.length + 1
+        while self.candidates and self.candidates[0][0] < first:
+            self.candidates.popleft()
+
+        nobs = len(self.window) - self.missing + (x == x)
+        if nobs < self.length:
+            value = nan
+        elif self.candidates and not self._better(x, self.candidates[0][1]):
+            value = self.candidates[0][1]
+        else:
+            value = x
+
+        if commit:
+            if x == x:
+                while self.candidates and self._better(x, self.candidates[-1][1]):
+                    self.candidates.pop()
+                self.candidates.append((self.count, x))
+            self.window.append(x)
+            self.missing += x != x
+            if len(self.window) >= self.length:
+                dropped = self.window.popleft()
+                self.missing -= dropped != dropped
+            self.count += 1
+        return value
+
+
+class Lag:
+    """`Series.shift(periods)`."""
+
+    def __init__(self, periods=1):
+        self.window = deque(maxlen=max(int(periods), 1))
+
+    def step(self, x, commit=True):
+        full = len(self.window) == self.window.maxlen
+        value = self.window[0] if full else nan
+        if commit:
+            self.window.append(x)
+        return value
+
+
+class FirstValid:
+    """Runs `inner` on `series.loc[series.first_valid_index():]`."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.started = False
+
+    def step(self, x, commit=True):
+        if not self.started and x != x:
+            return nan
+        if commit:
+            self.started = True
+        return self.inner.step(x, commit)
+
+
+class EMA:
+    """
+    pandas_ta `ema`: the mean of the first `length` values seeds an
+    `ewm(span=length, adjust=False)`, the bars before it are NaN.
+    """
+
+    def __init__(self, length):
+        self.length = max(int(length), 1)
+        self.ewm = EWM((self.length - 1) / 2.0, adjust=False)
+        self.count = 0
+        self.seed = (0.0, 0)  # sum, count of the first values
+
+    def step(self, x, commit=True):
+        total, nobs = self.seed
+        if self.count < self.length and x == x:
+            total, nobs = total + x, nobs + 1
+
+        if self.count < self.length - 1:
+            value = nan
+        elif self.count == self.length - 1:
+            value = self.ewm.step(total / nobs if nobs else nan, commit)
+        else:
+            value = self.ewm.step(x, commit)
+
+        if commit:
+            self.seed = (total, nobs)
+            self.count += 1
+        return value
+
+
+def RMA(length):
+    """pandas_ta `rma`: Wilder's smoothing, `ewm(alpha=1 / length, adjust=False)`."""
+    length = max(int(length), 1)
+    alpha = 1.0 / length
+    return EWM((1.0 - alpha) / alpha, adjust=False)
+
+
+class SeedMean:
+    """
+    The `presma` of pandas_ta `atr`: the mean of the first `length` values
+    at bar `length - 1`, NaN before it, the values as they are after it.
+    """
+
+    def __init__(self, length):
+        self.length = max(int(length), 1)
+        self.count = 0
+        self.seed = (0.0, 0)  # sum, count of the first values
+
+    def step(self, x, commit=True):
+        total, nobs = self.seed
+        if self.count < self.length and x == x:
+            total, nobs = total + x, nobs + 1
+
+        if self.count < self.length - 1:
+            value = nan
+        elif self.count == self.length - 1:
+            value = total / nobs if nobs else nan
+        else:
+            value = x
+
+        if commit:
+            self.seed = (total, nobs)
+            self.count += 1
+        return value
+
+
+# pandas_ta `ma(mamode, ...)` kinds with an incremental state
+MOVING_AVERAGES = {"sma": RollingMean, "ema": EMA, "rma": RMA}
+
+
+def moving_average(mamode, length):
+    return MOVING_AVERAGES[mamode](length)
+
+
+class Line:
+    """A single output from a single column."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def step(self, row, commit=True):
+        return [self.inner.step(row[0], commit)]
+
+
+class RSIState:
+    def __init__(self, length, scalar, drift):
+        self.scalar = scalar
+        self.prev_close = Lag(drift)
+        self.positive = RMA(length)
+        self.negative = RMA(length)
+
+    def step(self, row, commit=True):
+        close = row[0]
+        diff = close - self.prev_close.step(close, commit)
+        positive = self.positive.step(0.0 if diff < 0 else diff, commit)
+        negative = self.negative.step(0.0 if diff > 0 else diff, commit)
+        return [divide(self.scalar * positive, positive + abs(negative))]
+
+
+class MACDState:
+    """Outputs in the order MACD's `calc` reads them: macd, histogram, signal."""
+
+    def __init__(self, fast, slow, signal):
+        if slow < fast:
+            fast, slow = slow, fast
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = FirstValid(EMA(signal))
+
+    def step(self, row, commit=True):
+        close = row[0]
+        macd = self.fast.step(close, commit) - self.slow.step(close, commit)
+        signal = self.signal.step(macd, commit)
+        return [macd, macd - signal, signal]
+
+
+class ATRState:
+    def __init__(self, length, mamode, drift=1):
+        self.prev_close = Lag(drift)
+        self.seed = SeedMean(length)
+        self.average = moving_average(mamode, length)
+
+    def step(self, row, commit=True):
+        high, low, close = row[:3]
+        prev_close = self.prev_close.step(close, commit)
+        # the largest range that is not NaN, the high - low one on the
+        # first `drift` bars
+        ranges = [abs(non_zero(high - low)), abs(high - prev_close)]
+        ranges.append(abs(prev_close - low))
+        ranges = [r for r in ranges if r == r]
+        true_range = max(ranges) if ranges else nan
+        seeded = self.seed.step(true_range, commit)
+        return [self.average.step(seeded, commit)]
+
+
+class BBANDSState:
+    """Lower, mid, upper, bandwidth and percent."""
+
+    def __init__(self, length, std, mamode, ddof):
+        self.std = std
+        self.mid = moving_average(mamode, length)
+        self.variance = RollingVar(length, ddof)
+
+    def step(self, row, commit=True):
+        close = row[0]
+        deviations = self.std * math.sqrt(self.variance.step(close, commit))
+        mid = self.mid.step(close, commit)
+        lower = mid - deviations
+        upper = mid + deviations
+        ulr = non_zero(upper - lower)
+        return [
+            lower,
+            mid,
+            upper,
+            divide(100 * ulr, mid),
+            non_zero(close - lower) / ulr,
+        ]
+
+
+class STOCHState:
+    """%K and %D."""
+
+    def __init__(self, k, d, smooth_k, mamode):
+        self.highest_high = RollingExtreme(k, largest=True)
+        self.lowest_low = RollingExtreme(k, largest=False)
+        self.smooth_k = (
+            None if smooth_k == 1 else FirstValid(moving_average(mamode, smooth_k))
+        )
+        self.d = FirstValid(moving_average(mamode, d))
+
+    def step(self, row, commit=True):
+        high, low, close = row[:3]
+        highest_high = self.highest_high.step(high, commit)
+        lowest_low = self.lowest_low.step(low, commit)
+        stoch = divide(100 * (close - lowest_low), non_zero(highest_high - lowest_low))
+        if self.smooth_k is not None:
+            stoch = self.smooth_k.step(stoch, commit)
+        return [stoch, self.d.step(stoch, commit)]
+
+
+class _Kernel:
+    """A bar at a time through a `kernels` recurrence, its state carried."""
+
+    def __init__(self, kernel, *params):
+        self.kernel = kernel
+        self.params = params
+        self.state = None
+
+    def step(self, *values, commit=True):
+        outputs, state = self.kernel(
+            *([v] for v in values), *self.params, state=self.state
+        )
+        if commit:
+            self.state = state
+        return [float(o[0]) for o in outputs]
+
+
+class SupertrendState:
+    """Trend, direction, long and short."""
+
+    def __init__(self, length, multiplier):
+        length, self.multiplier = kernels.supertrend_params(length, multiplier)
+        self.atr = ATRState(length, "rma")
+        self.supertrend = _Kernel(kernels.supertrend, length)
+
+    def step(self, row, commit=True):
+        high, low, close = row[:3]
+        matr = self.multiplier * self.atr.step(row, commit)[0]
+        hl2 = 0.5 * (high + low)
+        return self.supertrend.step(close, hl2 + matr, hl2 - matr, commit=commit)
+
+
+class PSARState:
+    """Long, short, acceleration factor and reversal."""
+
+    def __init__(self, af0, af, max_af):
+        self.psar = _Kernel(kernels.psar, *kernels.psar_params(af0, af, max_af))
+
+    def step(self, row, commit=True):
+        high, low, close = row[:3]
+        return self.psar.step(high, low, close, commit=commit)
+
+
+class QQEState:
+    """QQE, RSI MA, long and short."""
+
+    def __init__(self, length, smooth, factor, mamode, drift):
+        length, smooth, self.factor, drift = kernels.qqe_params(
+            length, smooth, factor, drift
+        )
+        self.rsi = RSIState(length, 100.0, 1)
+        self.rsi_ma = moving_average(mamode, smooth)
+        self.prev_rsi_ma = Lag(drift)
+        self.smoothed_tr = EMA(2 * length - 1)
+        self.dar = EMA(2 * length - 1)
+        self.qqe = _Kernel(kernels.qqe)
+
+    def step(self, row, commit=True):
+        rsi_ma = self.rsi_ma.step(self.rsi.step(row, commit)[0], commit)
+        tr = abs(rsi_ma - self.prev_rsi_ma.step(rsi_ma, commit))
+        dar = self.factor * self.dar.step(self.smoothed_tr.step(tr, commit), commit)
+        line, long, short = self.qqe.step(
+            rsi_ma, rsi_ma + dar, rsi_ma - dar, commit=commit
+        )
+        return [line, rsi_ma, long, short]
+
+
+class HILOState:
+    """HiLo, long and short."""
+
+    def __init__(self, high_length, low_length, mamode):
+        high_length, low_length = kernels.hilo_params(high_length, low_length)
+        self.high_ma = moving_average(mamode, high_length)
+        self.low_ma = moving_average(mamode, low_length)
+        self.hilo = _Kernel(kernels.hilo)
+
+    def step(self, row, commit=True):
+        high, low, close = row[:3]
+        high_ma = self.high_ma.step(high, commit)
+        low_ma = self.low_ma.step(low, commit)
+        return self.hilo.step(close, high_ma, low_ma, commit=commit)
+
+
+class ZSCOREState:
+    def __init__(self, length, std):
+        self.std = std
+        self.mean = RollingMean(length)
+        self.stdev = RollingStd(length)
+
+    def step(self, row, commit=True):
+        close = row[0]
+        mean = self.mean.step(close, commit)
+        return [divide(close - mean, self.std * self.stdev.step(close, commit))]
+
+
+def _log(x):
+    """`np.log` of one value: NaN below 0, -inf at 0."""
+    if x != x or x < 0:
+        return nan
+    return -math.inf if x == 0 else math.log(x)
+
+
+class ENTROPYState:
+    def __init__(self, length, base):
+        self.log_base = _log(base)
+        self.total = RollingSum(length)
+        self.entropy = RollingSum(length)
+
+    def step(self, row, commit=True):
+        close = row[0]
+        p = divide(close, self.total.step(close, commit))
+        term = divide(-p * _log(p), self.log_base)
+        return [self.entropy.step(term, commit)]
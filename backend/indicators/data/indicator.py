@@ -17,6 +17,29 @@ from indicators.data.plottable import Plottable
 
 
 class Indicator(Serializable, Plottable):
+    """
+    Indicators implement `calc(data, **inputs)`, `data` being rows of
+    `[date string, value, ...]` with one value per entry of `columns`. It
+    returns one list of `[date, value]` pairs per output.
+
+    They can also implement the array contract, used instead of `calc`:
+
+        calc_arrays(dates, columns, **inputs)
+
+    `dates` are int64 nanoseconds since the epoch, `columns` maps every name
+    of `columns` to a float64 array aligned with them. It returns one float64
+    array per output, aligned with `dates` (NaN where there is no value),
+    optionally with annotations as `(outputs, annotations)`. Indicators with
+    `multi` outputs implement `calc` only.
+
+    Parameter sweeps evaluate many input sets over the same candles. An
+    indicator sharing work between them can implement
+
+        sweep_arrays(dates, columns, input_sets)
+
+    returning one 2-D float64 array per output, a row per input set, or None
+    to have every set computed on its own (see `indicators.data.sweep`).
+    """
 
     def __init__(self):
         self.initialized = False
@@ -38,6 +61,47 @@ class Indicator(Serializable, Plottable):
                 ohlc_data = kwargs["ohlc_data"]
             return self.calc_nan(ohlc_data)
 
+    def warmup(self, **inputs):
+        """
+        Bars an output row needs before it to match the computation over the
+        whole history (see `indicators.data.warmup`), None if it needs all of
+        it. Only the rows needed are passed to `calc` then.
+        """
+        return None
+
+    def incremental_state(self, **inputs):
+        """
+        State that advances the outputs bar by bar (see
+        `indicators.data.incremental`), None when the indicator can only be
+        recomputed in full.
+        """
+        return None
+
+    def initialize(self, data, **inputs):
+        """
+        Replay `data` (rows as passed to `calc`, the last one still forming)
+        into a fresh state. Returns the outputs of the last row, or None when
+        the indicator has no incremental state.
+        """
+        self.state = self.incremental_state(**inputs)
+        if self.state is None or len(data) == 0:
+            self.state = None
+            return None
+
+        for row in data[:-1]:
+            self.state.step([float(v) for v in row[1:]], commit=True)
+        return self.revise(data[-1])
+
+    def update(self, row):
+        """A new bar opened: the forming one is final, `row` is forming now."""
+        self.state.step(self.forming, commit=True)
+        return self.revise(row)
+
+    def revise(self, row):
+        """The forming bar changed, returns its outputs."""
+        self.forming = [float(v) for v in row[1:]]
+        return self.state.step(self.forming, commit=False)
+
     def calc_nan(self, ohlc_data):
         ret = []
         for o in range(len(self.outputs)):
@@ -0,0 +1,273 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Recurrences of the path-dependent pandas_ta indicators over whole arrays.
+
+pandas_ta runs them as Python loops reading and writing Series one cell at
+a time. The kernels here take the precomputed inputs of the loop (bands,
+moving averages) as arrays and run it over plain floats. Every kernel
+returns `(outputs, state)`, the float64 output arrays and the state after
+the last bar: passing the state with the next bars resumes where the call
+left off, a bar at a time for the incremental states. `tests/test_arrays.py`
+checks them against pandas_ta.
+"""
+
+import sys
+import math
+
+import numpy as np
+
+nan = math.nan
+EPSILON = sys.float_info.epsilon
+
+
+def nan_outputs(count, length):
+    """`count` outputs of NaNs, as pandas_ta gives too short an input."""
+    return [np.full(length, nan) for _ in range(count)]
+
+
+def _values(x):
+    return x.tolist() if isinstance(x, np.ndarray) else list(x)
+
+
+def _arrays(*outputs):
+    return tuple(np.array(o, dtype=np.float64) for o in outputs)
+
+
+def _maximum(a, b):
+    """`np.maximum` of two floats: NaN if either is."""
+    return nan if a != a or b != b else max(a, b)
+
+
+def _minimum(a, b):
+    return nan if a != a or b != b else min(a, b)
+
+
+def psar_params(af0, af, max_af):
+    """
+    `af0, max_af` as pandas_ta `psar` reads them: `af` is only the default
+    of `af0`, which is both the starting factor and its step.
+    """
+    af = float(af) if af and af > 0 else 0.02
+    af0 = float(af0) if af0 and af0 > 0 else af
+    max_af = float(max_af) if max_af and max_af > 0 else 0.2
+    return af0, max_af
+
+
+def supertrend_params(length, multiplier):
+    length = int(length) if length and length > 0 else 7
+    multiplier = float(multiplier) if multiplier and multiplier > 0 else 3.0
+    return length, multiplier
+
+
+def qqe_params(length, smooth, factor, drift):
+    """`length, smooth, factor, drift` with the pandas_ta `qqe` defaults."""
+    length = int(length) if length and length > 0 else 14
+    smooth = int(smooth) if smooth and smooth > 0 else 5
+    factor = float(factor) if factor else 4.236
+    drift = int(drift) if drift and drift > 0 else 1
+    return length, smooth, factor, drift
+
+
+def hilo_params(high_length, low_length):
+    high_length = int(high_length) if high_length and high_length > 0 else 13
+    low_length = int(low_length) if low_length and low_length > 0 else 21
+    return high_length, low_length
+
+
+def psar(high, low, close, af0, max_af, state=None):
+    """
+    pandas_ta `psar` given `close`: long, short, acceleration factor and
+    reversal. The trend starts falling if the second bar has a positive -DM.
+    The state after the first bar holds that bar only, as the direction is
+    only known on the second one.
+    """
+    high, low, close = _values(high), _values(low), _values(close)
+    m = len(high)
+    long, short, factor, reversal = [nan] * m, [nan] * m, [nan] * m, [0.0] * m
+
+    start = 0
+    if state is None and m:
+        factor[0] = af0
+        state = (None, high[0], low[0], close[0])  # the first bar only
+        start = 1
+    if state is not None and state[0] is None and start < m:
+        _, high_0, low_0, close_0 = state
+        up = high[start] - high_0
+        dn = low_0 - low[start]
+        falling = dn > up and dn > 0 and abs(dn) >= EPSILON
+        ep = low_0 if falling else high_0
+        state = (falling, close_0, ep, af0, high_0, low_0)
+
+    if state is None or state[0] is None:
+        return _arrays(long, short, factor, reversal), state
+
+    falling, sar, ep, af, high_1, low_1 = state
+    for i in range(start, m):
+        high_, low_ = high[i], low[i]
+        sar = sar + af * (ep - sar)
+        if falling:
+            reverse = high_ > sar
+            if low_ < ep:
+                ep = low_
+                af = min(af + af0, max_af)
+            sar = max(high_1, sar)
+        else:
+            reverse = low_ < sar
+            if high_ > ep:
+                ep = high_
+                af = min(af + af0, max_af)
+            sar = min(low_1, sar)
+
+        if reverse:
+            sar = ep
+            af = af0
+            falling = not falling
+            ep = low_ if falling else high_
+
+        if falling:
+            short[i] = sar
+        else:
+            long[i] = sar
+        factor[i] = af
+        reversal[i] = float(reverse)
+        high_1, low_1 = high_, low_
+
+    state = (falling, sar, ep, af, high_1, low_1)
+    return _arrays(long, short, factor, reversal), state
+
+
+def supertrend(close, upper, lower, length, state=None):
+    """
+    pandas_ta `supertrend` from its bands `hl2 ± multiplier * atr`: trend,
+    direction, long and short. A band only moves against the trend when the
+    close crossed the other band. The trend is NaN on the first bar and the
+    direction on the first `length` ones.
+    """
+    close, upper, lower = _values(close), _values(upper), _values(lower)
+    m = len(close)
+    trend, direction, long, short = [nan] * m, [nan] * m, [nan] * m, [nan] * m
+
+    start = 0
+    if state is None:
+        if not m:
+            return _arrays(trend, direction, long, short), None
+        state = (1, upper[0], lower[0], 1)
+        start = 1
+
+    dir_, prev_upper, prev_lower, bar = state
+    for i in range(start, m):
+        c, ub, lb = close[i], upper[i], lower[i]
+        if c > prev_upper:
+            dir_ = 1
+        elif c < prev_lower:
+            dir_ = -1
+        else:
+            if dir_ > 0 and lb < prev_lower:
+                lb = prev_lower
+            if dir_ < 0 and ub > prev_upper:
+                ub = prev_upper
+
+        if dir_ > 0:
+            trend[i] = long[i] = lb
+        else:
+            trend[i] = short[i] = ub
+        if bar >= length:
+            direction[i] = dir_
+        prev_upper, prev_lower = ub, lb
+        bar += 1
+
+    state = (dir_, prev_upper, prev_lower, bar)
+    return _arrays(trend, direction, long, short), state
+
+
+def qqe(rsi_ma, upper, lower, state=None):
+    """
+    pandas_ta `qqe` from the smoothed RSI and its bands: QQE, long and
+    short. The trend turns when the RSI MA crosses the prior line of the
+    other side.
+    """
+    rsi_ma, upper, lower = _values(rsi_ma), _values(upper), _values(lower)
+    m = len(rsi_ma)
+    line, line_long, line_short = [nan] * m, [nan] * m, [nan] * m
+
+    start = 0
+    if state is None:
+        if not m:
+            return _arrays(line, line_long, line_short), None
+        line[0] = rsi_ma[0]
+        # pandas_ta starts the lines at 0, the second bar reading the last
+        # (not yet set) value as the one two bars back
+        state = (rsi_ma[0], 0.0, 0.0, 0.0, 0.0, 1)
+        start = 1
+
+    p_rsi, c_long, p_long, c_short, p_short, trend = state
+    for i in range(start, m):
+        c_rsi = rsi_ma[i]
+        if p_rsi > c_long and c_rsi > c_long:
+            long_ = _maximum(c_long, lower[i])
+        else:
+            long_ = lower[i]
+        if p_rsi < c_short and c_rsi < c_short:
+            short_ = _minimum(c_short, upper[i])
+        else:
+            short_ = upper[i]
+
+        if (c_rsi > c_short and p_rsi < p_short) or (
+            c_rsi <= c_short and p_rsi >= p_short
+        ):
+            trend = 1
+        elif (c_rsi > c_long and p_rsi < p_long) or (
+            c_rsi <= c_long and p_rsi >= p_long
+        ):
+            trend = -1
+
+        if trend == 1:
+            line[i] = line_long[i] = long_
+        else:
+            line[i] = line_short[i] = short_
+        p_rsi = c_rsi
+        c_long, p_long = long_, c_long
+        c_short, p_short = short_, c_short
+
+    state = (p_rsi, c_long, p_long, c_short, p_short, trend)
+    return _arrays(line, line_long, line_short), state
+
+
+def hilo(close, high_ma, low_ma, state=None):
+    """
+    pandas_ta `hilo` from the moving averages of the highs and lows: HiLo,
+    long and short. Above the previous high average it follows the low
+    average, below the previous low average the high average, and it holds
+    its value in between. Vectorized, the held values filled forward.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    high_ma = np.asarray(high_ma, dtype=np.float64)
+    low_ma = np.asarray(low_ma, dtype=np.float64)
+    prev_line, prev_high, prev_low = (nan, nan, nan) if state is None else state
+    m = len(close)
+    if not m:
+        return _arrays([], [], []), state
+
+    above = close > np.concatenate([[prev_high], high_ma[:-1]])
+    below = ~above & (close < np.concatenate([[prev_low], low_ma[:-1]]))
+    moved = np.where(above, low_ma, high_ma)
+
+    last_moved = np.where(above | below, np.arange(m), -1)
+    np.maximum.accumulate(last_moved, out=last_moved)
+    line = np.where(last_moved >= 0, moved[last_moved], prev_line)
+
+    held = np.concatenate([[prev_line], line[:-1]])
+    long = np.where(above, low_ma, np.where(below, nan, held))
+    short = np.where(below, high_ma, np.where(above, nan, held))
+    return (line, long, short), (float(line[-1]), float(high_ma[-1]), float(low_ma[-1]))
@@ -0,0 +1,148 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Rolling statistics shared between the statistics indicators.
+
+`window(values, length)` is the rolling window of a column over a length.
+Inside `shared_windows()`, which a worker call holds while it computes its
+indicators, the indicators that read the same column rows get the same
+window, and each statistic is computed once for all of them. For example, a
+Z score shares its mean and standard deviation with a STDEV or a VARIANCE
+of the same length. The windows are dropped at the end of the call.
+
+The statistics are the ones pandas_ta takes from `Series.rolling`:
+- running sums for the mean, skew and kurtosis,
+- Welford updates for the variance,
+- a sorted skiplist for the median and quantiles.
+
+pandas_ta computes the mean absolute deviation with a Python `apply` per
+window. Here it is vectorized over the windows.
+
+The per-tick counterparts are in `indicators.data.incremental`.
+"""
+
+from contextlib import contextmanager
+
+import numpy as np
+
+from indicators.data.arrays import series
+
+# values per chunk of the vectorized windows
+CHUNK_VALUES = 1 << 20
+
+# (memory, shape, strides and type of the column, length) -> RollingWindow
+# while `shared_windows` is active; separate in every worker process
+windows = None
+
+
+@contextmanager
+def shared_windows():
+    """Share the windows `window` returns until the end of the block."""
+    global windows
+    outer = windows
+    if outer is None:
+        windows = {}
+    try:
+        yield
+    finally:
+        windows = outer
+
+
+def window(values, length):
+    """
+    The `RollingWindow` of the float64 column `values`, the same for every
+    call on the same rows and length inside `shared_windows`.
+    """
+    if windows is None:
+        return RollingWindow(values, length)
+
+    # the window keeps its values alive, so their memory is not reused
+    # for other ones while the key is in use
+    interface = values.__array_interface__
+    key = (
+        interface["data"][0],
+        interface["shape"],
+        interface["strides"],
+        interface["typestr"],
+        int(length),
+    )
+    if key not in windows:
+        windows[key] = RollingWindow(values, length)
+    return windows[key]
+
+
+class RollingWindow:
+    """
+    Statistics over the last `length` values, NaN until the window is full.
+    The returned arrays are shared and must not be modified.
+    """
+
+    def __init__(self, values, length):
+        self.values = values
+        self.length = max(int(length), 1)
+        self.rolling = series(values).rolling(self.length, min_periods=self.length)
+        self.stats = {}
+
+    def _stat(self, key, compute):
+        if key not in self.stats:
+            self.stats[key] = compute()
+        return self.stats[key]
+
+    def sum(self):
+        return self._stat("sum", lambda: self.rolling.sum().to_numpy())
+
+    def mean(self):
+        return self._stat("mean", lambda: self.rolling.mean().to_numpy())
+
+    def var(self, ddof=1):
+        return self._stat(("var", ddof), lambda: self.rolling.var(ddof).to_numpy())
+
+    def std(self, ddof=1):
+        return self._stat(("std", ddof), lambda: np.sqrt(self.var(ddof)))
+
+    def skew(self):
+        return self._stat("skew", lambda: self.rolling.skew().to_numpy())
+
+    def kurt(self):
+        return self._stat("kurt", lambda: self.rolling.kurt().to_numpy())
+
+    def median(self):
+        return self._stat("median", lambda: self.rolling.median().to_numpy())
+
+    def quantile(self, q):
+        return self._stat(("quantile", q), lambda: self.rolling.quantile(q).to_numpy())
+
+    def mad(self):
+        """pandas_ta `mad`: mean absolute deviation from the window mean."""
+        return self._stat("mad", self._mad)
+
+    def _mad(self):
+        n, length = len(self.values), self.length
+        out = np.full(n, np.nan)
+        if n < length:
+            return out
+
+        views = np.lib.stride_tricks.sliding_window_view(self.values, length)
+        rows = max(CHUNK_VALUES // length, 1)
+        for start in range(0, len(views), rows):
+            chunk = views[start : start + rows]
+            deviations = np.fabs(chunk - chunk.mean(axis=1, keepdims=True))
+            out[length - 1 + start : length - 1 + start + len(chunk)] = deviations.mean(
+                axis=1
+            )
+        return out
+
+
+def ta_length(length, default=30, above=0):
+    """A length as pandas_ta reads it: `default` unless above `above`."""
+    return int(length) if length and length > above else default
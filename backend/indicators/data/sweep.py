@@ -0,0 +1,78 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Shared work of parameter sweeps (`Indicator.sweep_arrays`): the outputs of
+an indicator for many input sets at once, one row per input set.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def sweep_lengths(input_sets):
+    """
+    The `length` of every input set, None unless the sets have no other
+    input.
+    """
+    lengths = []
+    for inputs in input_sets:
+        if set(inputs) != {"length"}:
+            return None
+        lengths.append(max(int(inputs["length"]), 1))
+    return lengths
+
+
+def _prefix_sums(values):
+    # offset by the first value, the sums stay small on price levels
+    return np.concatenate([[0.0], np.cumsum(values - values[0])]), values[0]
+
+
+def rolling_means(values, lengths):
+    """
+    `rolling(length).mean()` of `values` for every length, from one prefix
+    sum. None when `values` has NaNs, whose windows the sums do not skip.
+    """
+    n = len(values)
+    if n == 0 or np.isnan(values).any():
+        return None
+
+    sums, offset = _prefix_sums(values)
+    out = np.full((len(lengths), n), np.nan)
+    for i, length in enumerate(lengths):
+        if length <= n:
+            out[i, length - 1 :] = (sums[length:] - sums[:-length]) / length + offset
+    return out
+
+
+def emas(values, lengths):
+    """
+    pandas_ta `ema` of `values` for every length: the seeds (mean of the first
+    `length` values) come from one prefix sum, then one `ewm` pass per
+    length. None when `values` has NaNs.
+    """
+    n = len(values)
+    if n == 0 or np.isnan(values).any():
+        return None
+
+    sums, offset = _prefix_sums(values)
+    out = np.full((len(lengths), n), np.nan)
+    seeded = np.empty(n)
+    for i, length in enumerate(lengths):
+        if length > n:
+            continue
+        seeded[:] = values
+        seeded[: length - 1] = np.nan
+        seeded[length - 1] = sums[length] / length + offset
+        ewm = pd.Series(seeded, copy=False).ewm(span=length, adjust=False)
+        out[i] = ewm.mean().to_numpy()
+    return out
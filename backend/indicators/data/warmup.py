@@ -0,0 +1,43 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""
+Warm-up of indicators: the bars an output row needs before it to match the
+computation over the whole history (see `Indicator.warmup`).
+"""
+
+import math
+
+# weight the bars before the warm-up may keep in an exponential filter
+TOLERANCE = 1e-9
+
+# pandas_ta moving averages over a plain window of `length` bars
+WINDOWED = ("sma", "wma", "pwma", "sinwma", "swma", "trima", "fwma", "midpoint")
+
+
+def ewm_warmup(alpha):
+    """Bars until the weight of the older bars in an EWM is below TOLERANCE."""
+    if alpha >= 1:
+        return 1
+    return math.ceil(math.log(TOLERANCE) / math.log(1.0 - alpha))
+
+
+def ma_warmup(mamode, length):
+    """Warm-up of pandas_ta `ma(mamode, length)`, None if not known."""
+    length = max(int(length), 1)
+    if mamode in WINDOWED:
+        return length
+    if mamode == "ema":
+        return length + ewm_warmup(2.0 / (length + 1))
+    if mamode == "rma":
+        return length + ewm_warmup(1.0 / length)
+    return None
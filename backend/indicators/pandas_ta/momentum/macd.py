@@ -15,6 +15,9 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.warmup import ma_warmup
+from indicators.data.arrays import output_array, series
+from indicators.data.incremental import MACDState
 
 
 class MACD(Indicator):
@@ -44,6 +47,20 @@ class MACD(Indicator):
         },
     ]
 
+    def warmup(self, fast, slow, signal):
+        return max(ma_warmup("ema", fast), ma_warmup("ema", slow)) + ma_warmup(
+            "ema", signal
+        )
+
+    def incremental_state(self, fast, slow, signal):
+        return MACDState(int(fast), int(slow), int(signal))
+
+    def calc_arrays(self, dates, columns, fast, slow, signal):
+        macd = ta.macd(
+            series(columns["close"]), fast=int(fast), slow=int(slow), signal=int(signal)
+        )
+        return [output_array(macd, len(dates), column=i) for i in range(3)]
+
     def calc(self, data, fast, slow, signal):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
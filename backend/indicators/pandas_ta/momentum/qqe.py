@@ -15,6 +15,9 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.arrays import series
+from indicators.data.kernels import nan_outputs, qqe, qqe_params
+from indicators.data.incremental import MOVING_AVERAGES, QQEState
 
 
 class QQE(Indicator):
@@ -72,6 +75,28 @@ class QQE(Indicator):
         },
     ]
 
+    def incremental_state(self, length, smooth, factor, mamode, drift):
+        mamode = QQE.mamode[int(mamode)]
+        if mamode not in MOVING_AVERAGES:
+            return None
+        return QQEState(length, smooth, factor, mamode, drift)
+
+    def calc_arrays(self, dates, columns, length, smooth, factor, mamode, drift):
+        close = series(columns["close"])
+        mamode = QQE.mamode[int(mamode)]
+        length_, smooth_, factor_, drift_ = qqe_params(length, smooth, factor, drift)
+        wilders_length = 2 * length_ - 1
+        if len(dates) < max(length_, smooth_, wilders_length):
+            return nan_outputs(4, len(dates))
+        rsi_ma = ta.ma(mamode, ta.rsi(close, length_), length=smooth_)
+        rsi_ma_tr = rsi_ma.diff(drift_).abs()
+        smoothed_rsi_tr_ma = ta.ma("ema", rsi_ma_tr, length=wilders_length)
+        dar = factor_ * ta.ma("ema", smoothed_rsi_tr_ma, length=wilders_length)
+        (line, long, short), _ = qqe(
+            rsi_ma.to_numpy(), (rsi_ma + dar).to_numpy(), (rsi_ma - dar).to_numpy()
+        )
+        return [line, rsi_ma.to_numpy(dtype=np.float64), long, short]
+
     def calc(self, data, length, smooth, factor, mamode, drift):
 
         df = pd.DataFrame(data)
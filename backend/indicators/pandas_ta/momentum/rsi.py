@@ -15,6 +15,9 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.warmup import ma_warmup
+from indicators.data.arrays import output_array, series
+from indicators.data.incremental import RSIState
 
 
 class RSI(Indicator):
@@ -47,6 +50,22 @@ class RSI(Indicator):
 
     outputs = [{"name": "RSI", "y_axis": "rsi"}]
 
+    def warmup(self, length, scalar, drift):
+        return ma_warmup("rma", length) + int(drift)
+
+    def incremental_state(self, length, scalar, drift):
+        return RSIState(int(length), float(scalar), int(drift))
+
+    def calc_arrays(self, dates, columns, length, scalar, drift):
+        rsi = ta.rsi(
+            series(columns["close"]),
+            length=int(length),
+            scalar=float(scalar),
+            mamode="rma",
+            drift=int(drift),
+        )
+        return [output_array(rsi, len(dates))]
+
     def calc(self, data, length, scalar, drift):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
@@ -59,6 +78,7 @@ class RSI(Indicator):
         df.ta.rsi(
             length=int(length),
             scalar=float(scalar),
+            mamode="rma",
             drift=int(drift),
             cumulative=True,
             append=True,
@@ -15,6 +15,9 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.warmup import ma_warmup
+from indicators.data.arrays import output_array, series
+from indicators.data.incremental import MOVING_AVERAGES, STOCHState
 
 
 class STOCH(Indicator):
@@ -59,6 +62,36 @@ class STOCH(Indicator):
         },
     ]
 
+    def warmup(self, fast_k, slow_k, slow_d, mamode):
+        mamode = STOCH.mamode[int(mamode)]
+        smooth_k = ma_warmup(mamode, slow_k)
+        d = ma_warmup(mamode, slow_d)
+        if smooth_k is None or d is None:
+            return None
+        return int(fast_k) + smooth_k + d
+
+    def incremental_state(self, fast_k, slow_k, slow_d, mamode):
+        mamode = STOCH.mamode[int(mamode)]
+        if mamode not in MOVING_AVERAGES:
+            return None
+        # pandas_ta falls back to its defaults for lengths below 1
+        k = int(fast_k) if int(fast_k) > 0 else 14
+        smooth_k = int(slow_k) if int(slow_k) > 0 else 3
+        d = int(slow_d) if int(slow_d) > 0 else 3
+        return STOCHState(k, d, smooth_k, mamode)
+
+    def calc_arrays(self, dates, columns, fast_k, slow_k, slow_d, mamode):
+        stoch = ta.stoch(
+            series(columns["high"]),
+            series(columns["low"]),
+            series(columns["close"]),
+            fast_k=int(fast_k),
+            slow_k=int(slow_k),
+            slow_d=int(slow_d),
+            mamode=STOCH.mamode[int(mamode)],
+        )
+        return [output_array(stoch, len(dates), column=i) for i in range(2)]
+
     def calc(self, data, fast_k, slow_k, slow_d, mamode):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
@@ -15,6 +15,10 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.warmup import ma_warmup
+from indicators.data.arrays import output_array, series
+from indicators.data.sweep import emas, sweep_lengths
+from indicators.data.incremental import EMA as EMAState, Line
 
 
 class EMA(Indicator):
@@ -42,6 +46,23 @@ class EMA(Indicator):
 
     outputs = [{"name": "EMA", "y_axis": "price"}]
 
+    def warmup(self, length):
+        return ma_warmup("ema", length)
+
+    def incremental_state(self, length):
+        return Line(EMAState(int(length)))
+
+    def calc_arrays(self, dates, columns, length):
+        ema = ta.ema(series(columns["close"]), length=int(length))
+        return [output_array(ema, len(dates))]
+
+    def sweep_arrays(self, dates, columns, input_sets):
+        lengths = sweep_lengths(input_sets)
+        if lengths is None:
+            return None
+        out = emas(columns["close"], lengths)
+        return None if out is None else [out]
+
     def calc(self, data, length):
 
         df = pd.DataFrame(data)
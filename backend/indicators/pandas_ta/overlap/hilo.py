@@ -15,6 +15,9 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.arrays import series
+from indicators.data.kernels import hilo, hilo_params, nan_outputs
+from indicators.data.incremental import MOVING_AVERAGES, HILOState
 
 
 class HILO(Indicator):
@@ -62,6 +65,23 @@ class HILO(Indicator):
         },
     ]
 
+    def incremental_state(self, high_length, low_length, mamode):
+        mamode = HILO.mamode[int(mamode)]
+        if mamode not in MOVING_AVERAGES:
+            return None
+        return HILOState(high_length, low_length, mamode)
+
+    def calc_arrays(self, dates, columns, high_length, low_length, mamode):
+        high, low = series(columns["high"]), series(columns["low"])
+        mamode = HILO.mamode[int(mamode)]
+        high_length_, low_length_ = hilo_params(high_length, low_length)
+        if len(dates) < max(high_length_, low_length_):
+            return nan_outputs(3, len(dates))
+        high_ma = ta.ma(mamode, high, length=high_length_)
+        low_ma = ta.ma(mamode, low, length=low_length_)
+        outputs, _ = hilo(columns["close"], high_ma.to_numpy(), low_ma.to_numpy())
+        return list(outputs)
+
     def calc(self, data, high_length, low_length, mamode):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
@@ -16,6 +16,9 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.warmup import ma_warmup
+from indicators.data.arrays import output_array, series
+from indicators.data.incremental import RMA as RMAState, Line
 
 
 class RMA(Indicator):
@@ -33,6 +36,16 @@ class RMA(Indicator):
         }
     ]
 
+    def warmup(self, length):
+        return ma_warmup("rma", length)
+
+    def incremental_state(self, length):
+        return Line(RMAState(int(length)))
+
+    def calc_arrays(self, dates, columns, length):
+        rma = ta.rma(series(columns["close"]), length=int(length))
+        return [output_array(rma, len(dates))]
+
     def calc(self, data, length):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
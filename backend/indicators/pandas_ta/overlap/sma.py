@@ -16,6 +16,9 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.arrays import output_array, series
+from indicators.data.sweep import rolling_means, sweep_lengths
+from indicators.data.incremental import RollingMean, Line
 
 
 class SMA(Indicator):
@@ -33,6 +36,23 @@ class SMA(Indicator):
         }
     ]
 
+    def warmup(self, length):
+        return int(length)
+
+    def incremental_state(self, length):
+        return Line(RollingMean(int(length)))
+
+    def calc_arrays(self, dates, columns, length):
+        sma = ta.sma(series(columns["close"]), length=int(length))
+        return [output_array(sma, len(dates))]
+
+    def sweep_arrays(self, dates, columns, input_sets):
+        lengths = sweep_lengths(input_sets)
+        if lengths is None:
+            return None
+        out = rolling_means(columns["close"], lengths)
+        return None if out is None else [out]
+
     def calc(self, data, length):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
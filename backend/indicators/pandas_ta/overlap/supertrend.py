@@ -16,6 +16,9 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.arrays import series
+from indicators.data.kernels import nan_outputs, supertrend, supertrend_params
+from indicators.data.incremental import SupertrendState
 
 
 class SUPERTREND(Indicator):
@@ -52,6 +55,27 @@ class SUPERTREND(Indicator):
         },
     ]
 
+    def incremental_state(self, length, multiplier):
+        return SupertrendState(length, multiplier)
+
+    def calc_arrays(self, dates, columns, length, multiplier):
+        high, low, close = (series(columns[c]) for c in self.columns)
+        length_, multiplier_ = supertrend_params(length, multiplier)
+        if len(dates) < length_ + 1:
+            return nan_outputs(4, len(dates))
+        atr = ta.atr(high, low, close, length_, mamode="rma")
+        if atr is None:
+            return nan_outputs(4, len(dates))
+        hl2 = ta.hl2(high, low)
+        matr = multiplier_ * atr
+        outputs, _ = supertrend(
+            columns["close"],
+            (hl2 + matr).to_numpy(),
+            (hl2 - matr).to_numpy(),
+            length_,
+        )
+        return list(outputs)
+
     def calc(self, data, length, multiplier):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
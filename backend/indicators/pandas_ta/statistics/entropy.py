@@ -15,6 +15,13 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.arrays import series
+from indicators.data.rolling import ta_length, window
+from indicators.data.incremental import ENTROPYState
+
+
+def _base(base):
+    return float(base) if base and base > 0 else 2.0
 
 
 class ENTROPY(Indicator):
@@ -35,6 +42,18 @@ class ENTROPY(Indicator):
         }
     ]
 
+    def incremental_state(self, length, base):
+        return ENTROPYState(ta_length(length, 10), _base(base))
+
+    def calc_arrays(self, dates, columns, length, base):
+        close = columns["close"]
+
+        length_ = ta_length(length, 10)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p = close / window(close, length_).sum()
+            terms = -p * np.log(p) / np.log(_base(base))
+        return [series(terms).rolling(length_).sum().to_numpy()]
+
     def calc(self, data, length, base):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
@@ -15,6 +15,8 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.rolling import ta_length, window
+from indicators.data.incremental import Line, RollingMoments
 
 
 class KURTOSIS(Indicator):
@@ -34,6 +36,14 @@ class KURTOSIS(Indicator):
         }
     ]
 
+    def incremental_state(self, length):
+        return Line(RollingMoments(ta_length(length), 4))
+
+    def calc_arrays(self, dates, columns, length):
+        close = columns["close"]
+
+        return [window(close, ta_length(length)).kurt()]
+
     def calc(self, data, length):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
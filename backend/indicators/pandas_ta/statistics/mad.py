@@ -15,6 +15,8 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.rolling import ta_length, window
+from indicators.data.incremental import Line, RollingMAD
 
 
 class MAD(Indicator):
@@ -34,6 +36,14 @@ class MAD(Indicator):
         }
     ]
 
+    def incremental_state(self, length):
+        return Line(RollingMAD(ta_length(length)))
+
+    def calc_arrays(self, dates, columns, length):
+        close = columns["close"]
+
+        return [window(close, ta_length(length)).mad()]
+
     def calc(self, data, length):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
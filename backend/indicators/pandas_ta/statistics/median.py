@@ -14,6 +14,8 @@ import pandas as pd
 import pandas_ta as ta
 import numpy as np
 from indicators.data.indicator import Indicator
+from indicators.data.rolling import ta_length, window
+from indicators.data.incremental import Line, RollingOrder
 
 
 class MEDIAN(Indicator):
@@ -33,6 +35,14 @@ class MEDIAN(Indicator):
         }
     ]
 
+    def incremental_state(self, length):
+        return Line(RollingOrder(ta_length(length)))
+
+    def calc_arrays(self, dates, columns, length):
+        close = columns["close"]
+
+        return [window(close, ta_length(length)).median()]
+
     def calc(self, data, length):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
@@ -15,6 +15,12 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.rolling import ta_length, window
+from indicators.data.incremental import Line, RollingOrder
+
+
+def _q(quantile):
+    return float(quantile) if quantile and 0 < quantile < 1 else 0.5
 
 
 class QUANTILE(Indicator):
@@ -39,6 +45,14 @@ class QUANTILE(Indicator):
         }
     ]
 
+    def incremental_state(self, length, quantile):
+        return Line(RollingOrder(ta_length(length), _q(quantile)))
+
+    def calc_arrays(self, dates, columns, length, quantile):
+        close = columns["close"]
+
+        return [window(close, ta_length(length)).quantile(_q(quantile))]
+
     def calc(self, data, length, quantile):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
@@ -15,6 +15,12 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.rolling import ta_length, window
+from indicators.data.incremental import ZSCOREState
+
+
+def _std(std):
+    return float(std) if std and std > 1 else 1
 
 
 class ZSCORE(Indicator):
@@ -35,6 +41,16 @@ class ZSCORE(Indicator):
         }
     ]
 
+    def incremental_state(self, length, std):
+        return ZSCOREState(ta_length(length, above=1), _std(std))
+
+    def calc_arrays(self, dates, columns, length, std):
+        close = columns["close"]
+
+        rolling = window(close, ta_length(length, above=1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return [(close - rolling.mean()) / (_std(std) * rolling.std())]
+
     def calc(self, data, length, std):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
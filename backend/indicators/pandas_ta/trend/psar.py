@@ -14,6 +14,8 @@ import pandas as pd
 import pandas_ta as ta
 import numpy as np
 from indicators.data.indicator import Indicator
+from indicators.data.kernels import psar, psar_params
+from indicators.data.incremental import PSARState
 
 
 class PSAR(Indicator):
@@ -47,6 +49,14 @@ class PSAR(Indicator):
         },
     ]
 
+    def incremental_state(self, af0, af, max_af):
+        return PSARState(af0, af, max_af)
+
+    def calc_arrays(self, dates, columns, af0, af, max_af):
+        high, low, close = (columns[c] for c in self.columns)
+        outputs, _ = psar(high, low, close, *psar_params(af0, af, max_af))
+        return list(outputs)
+
     def calc(self, data, af0, af, max_af):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
@@ -14,6 +14,9 @@ import pandas as pd
 import pandas_ta as ta
 import numpy as np
 from indicators.data.indicator import Indicator
+from indicators.data.warmup import ma_warmup
+from indicators.data.arrays import output_array, series
+from indicators.data.incremental import MOVING_AVERAGES, ATRState
 
 
 class ATR(Indicator):
@@ -53,6 +56,26 @@ class ATR(Indicator):
         }
     ]
 
+    def warmup(self, length, mamode):
+        warmup = ma_warmup(ATR.mamode[int(mamode)], length)
+        return None if warmup is None else warmup + 1
+
+    def incremental_state(self, length, mamode):
+        mamode = ATR.mamode[int(mamode)]
+        if mamode not in MOVING_AVERAGES:
+            return None
+        return ATRState(int(length), mamode)
+
+    def calc_arrays(self, dates, columns, length, mamode):
+        atr = ta.atr(
+            series(columns["high"]),
+            series(columns["low"]),
+            series(columns["close"]),
+            length=int(length),
+            mamode=ATR.mamode[int(mamode)],
+        )
+        return [output_array(atr, len(dates))]
+
     def calc(self, data, length, mamode):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
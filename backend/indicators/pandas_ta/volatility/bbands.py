@@ -15,6 +15,12 @@ import pandas_ta as ta
 import numpy as np
 
 from indicators.data.indicator import Indicator
+from indicators.data.warmup import ma_warmup
+from indicators.data.arrays import output_array, series
+from indicators.data.incremental import MOVING_AVERAGES, BBANDSState
+
+# degrees of freedom of the band's standard deviation, pandas_ta's default
+DDOF = 1
 
 
 class BBANDS(Indicator):
@@ -84,6 +90,27 @@ class BBANDS(Indicator):
         },
     ]
 
+    def warmup(self, length, std, mamode):
+        warmup = ma_warmup(BBANDS.mamode[int(mamode)], length)
+        return None if warmup is None else max(warmup, int(length))
+
+    def incremental_state(self, length, std, mamode):
+        mamode = BBANDS.mamode[int(mamode)]
+        if mamode not in MOVING_AVERAGES:
+            return None
+        return BBANDSState(int(length), float(std), mamode, DDOF)
+
+    def calc_arrays(self, dates, columns, length, std, mamode):
+        bbands = ta.bbands(
+            series(columns["close"]),
+            length=int(length),
+            lower_std=float(std),
+            upper_std=float(std),
+            ddof=DDOF,
+            mamode=BBANDS.mamode[int(mamode)],
+        )
+        return [output_array(bbands, len(dates), column=i) for i in range(5)]
+
     def calc(self, data, length, std, mamode):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
@@ -95,7 +122,9 @@ class BBANDS(Indicator):
         )
         df.ta.bbands(
             length=int(length),
-            std=float(std),
+            lower_std=float(std),
+            upper_std=float(std),
+            ddof=DDOF,
             mamode=BBANDS.mamode[int(mamode)],
             cumulative=True,
             append=True,
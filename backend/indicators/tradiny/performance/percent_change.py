@@ -41,6 +41,24 @@ class PERCENTCHANGE(Indicator):
         }
     ]
 
+    def warmup(self, length):
+        return int(length)
+
+    def calc_arrays(self, dates, columns, length):
+        length = int(length)
+        close = columns["close"]
+        change = np.full(len(close), np.nan)
+        if length >= len(close):
+            return [change]
+
+        prev_close, curr_close = close[: -length or None], close[length:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = np.abs(curr_close - prev_close) / prev_close * 100.0
+        ret = np.where(prev_close > curr_close, -ret, ret)
+        ret[curr_close == prev_close] = 0.0
+        change[length:] = ret
+        return [change]
+
     def calc(self, data, length):
         df = pd.DataFrame(data)
         df.columns = ["Date"] + self.columns
@@ -129,6 +129,8 @@ class MonitoringThread(Thread):
 
 
 class Provider(Process):
+    intervals = None  # intervals served natively, None accepts any interval
+
     def __init__(self):
         super(Provider, self).__init__()
 
@@ -193,10 +195,12 @@ class Provider(Process):
         self.active_requests += 1
 
         if message["action"] == "get_history":
+            error = None
             try:
                 new_klines = self.get_history(*message["args"])
             except Exception as e:
                 new_klines = []
+                error = str(e)
                 logging.info(f"Error get history: {e}")
 
             self.respond(
@@ -212,6 +216,7 @@ class Provider(Process):
                     "end": message["end"],
                     "range": message["range"],
                     "new_klines": new_klines,
+                    "error": error,
                     "future_key": message["future_key"],
                 }
             )
@@ -30,8 +30,14 @@ def main():
         "CSV_DATE_COLUMN",
         "CSV_DATE_COLUMN_FORMATTER",
         "POLYGON_MARKETS",
+        "HISTORICAL_CACHE_MAX_MB",
+        "HISTORICAL_CACHE_EVICTION",
+        "CANDLE_STORE_PATH",
+        "CANDLE_STORE_COMPACT_ROWS",
         "ALERT_WORKERS",
         "INDICATOR_WORKERS",
+        "INDICATOR_RESULTS_CACHE_MB",
+        "INDICATOR_WORKER_LIMITS",
         "MAX_REQUESTS_PER_IP_PER_HOUR",
         "MAX_SIMULTANEOUS_CONNECTIONS_PER_IP",
         "MAX_DATA_REQUESTS_PER_IP_PER_HOUR",
@@ -0,0 +1,63 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""Fixed candles and indicator helpers shared by the tests."""
+
+import numpy as np
+import pandas as pd
+
+from db import indicators
+from indicators.data.indicator import Indicator
+
+
+def ids_with(method):
+    """Ids of the indicators implementing `method` of the Indicator contract."""
+    return sorted(
+        id
+        for id, entry in indicators.items()
+        if getattr(entry["klass"], method, None) is not getattr(Indicator, method, None)
+    )
+
+
+def defaults(obj):
+    return {i["name"]: i["default"][0] for i in obj.inputs}
+
+
+def ohlcv(n, seed=0):
+    """`n` hourly candles of a random walk, dates as strings."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(rng.normal(0, 0.01, n).cumsum())
+    spread = close * rng.uniform(0.001, 0.02, n)
+    return {
+        "date": pd.date_range("2024-01-01", periods=n, freq="1h").strftime(
+            "%Y-%m-%d %H:%M:%S"
+        ),
+        "open": close * (1 + rng.normal(0, 0.002, n)),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.uniform(1, 100, n),
+    }
+
+
+def rows(obj, data):
+    """The rows `obj.calc` takes: `[date, column values...]`."""
+    return [
+        [data["date"][i]] + [float(data[c][i]) for c in obj.columns]
+        for i in range(len(data["date"]))
+    ]
+
+
+def arrays(obj, data):
+    """`(dates, columns)` as `obj.calc_arrays` takes them."""
+    dates = pd.to_datetime(pd.Series(data["date"])).values.view(np.int64)
+    return dates, [np.asarray(data[c], dtype=np.float64) for c in obj.columns]
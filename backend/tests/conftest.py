@@ -0,0 +1,19 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import os
+import tempfile
+
+# the app package sets up its globals on import, keep them out of the tree
+_tmp = tempfile.mkdtemp(prefix="tradiny-tests-")
+os.environ["DB"] = os.path.join(_tmp, "db.sqlite3")
+os.environ["CANDLE_STORE_PATH"] = ""
@@ -0,0 +1,101 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""`calc_arrays`, kernels included, against the pandas_ta `calc` it replaces."""
+
+import numpy as np
+import pytest
+
+from app.indicator_io import output_columns
+from candles import arrays, defaults, ids_with, ohlcv, rows
+from db import indicators
+from indicators.data import kernels
+
+
+def outputs(result):
+    return result[0] if isinstance(result, tuple) else result
+
+
+# Inputs other than the defaults, to exercise the kernels' branches
+KERNEL_INPUTS = [
+    ("indicators.pandas_ta.trend.psar.PSAR", {"af0": 0.01, "af": 0.03, "max_af": 0.3}),
+    (
+        "indicators.pandas_ta.overlap.supertrend.SUPERTREND",
+        {"length": 20, "multiplier": 1.5},
+    ),
+    (
+        "indicators.pandas_ta.overlap.hilo.HILO",
+        {"high_length": 5, "low_length": 30, "mamode": 1},
+    ),
+    ("indicators.pandas_ta.momentum.qqe.QQE", {"length": 10, "smooth": 3, "mamode": 1}),
+]
+
+
+def assert_same(id, inputs, bars):
+    obj = indicators[id]["klass"]()
+    inputs = {**defaults(obj), **inputs}
+    data = ohlcv(bars)
+    dates, columns = arrays(obj, data)
+
+    got = output_columns(
+        obj.outputs,
+        outputs(obj.calc_arrays(dates, dict(zip(obj.columns, columns)), **inputs)),
+        dates,
+    )
+    expected = output_columns(obj.outputs, outputs(obj.calc(rows(obj, data), **inputs)))
+
+    # calc may leave out the rows calc_arrays gives as NaN
+    assert got[1] == expected[1]
+    assert np.isin(expected[0], got[0]).all()
+    aligned = np.full_like(got[2], np.nan)
+    aligned[:, np.searchsorted(got[0], expected[0])] = expected[2]
+    np.testing.assert_allclose(got[2], aligned, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("id", ids_with("calc_arrays"))
+def test_calc_arrays_matches_calc(id):
+    assert_same(id, {}, 400)
+
+
+@pytest.mark.parametrize("id, inputs", KERNEL_INPUTS)
+def test_kernels_match_calc(id, inputs):
+    assert_same(id, inputs, 400)
+
+
+@pytest.mark.parametrize("id", ids_with("sweep_arrays"))
+def test_sweep_arrays_matches_calc_arrays(id):
+    obj = indicators[id]["klass"]()
+    sets = [{**defaults(obj), "length": length} for length in (2, 5, 14, 50, 200)]
+    dates, columns = arrays(obj, ohlcv(400))
+    columns = dict(zip(obj.columns, columns))
+
+    swept = obj.sweep_arrays(dates, columns, sets)
+    for i, inputs in enumerate(sets):
+        expected = obj.calc_arrays(dates, columns, **inputs)
+        for rows, values in zip(swept, expected):
+            np.testing.assert_allclose(rows[i], values, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("split", [1, 2, 3, 50, 399])
+def test_kernels_resume_from_state(split):
+    data = ohlcv(400)
+    high, low, close = (np.asarray(data[c]) for c in ("high", "low", "close"))
+    runs = [
+        (kernels.psar, (high, low, close), (0.02, 0.2)),
+        (kernels.supertrend, (close, high, low), (7,)),
+    ]
+    for kernel, columns, params in runs:
+        whole, _ = kernel(*columns, *params)
+        head, state = kernel(*(c[:split] for c in columns), *params)
+        tail, _ = kernel(*(c[split:] for c in columns), *params, state=state)
+        for a, b, c in zip(whole, head, tail):
+            np.testing.assert_array_equal(a, np.concatenate([b, c]))
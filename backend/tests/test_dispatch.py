@@ -0,0 +1,117 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import json
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketState
+
+from app.indicator_dispatch import SHARED_ID, IndicatorDispatcher, with_id
+
+SMA = {"id": "indicators.pandas_ta.overlap.sma.SMA", "details": {}}
+DATA_MAP = {"close": {"source": "S", "name": "N", "interval": "1h", "value": "close"}}
+
+
+class Socket:
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, message):
+        self.sent.append(json.loads(message))
+
+
+class Lane:
+    """A scheduler lane admitting a job once `admit` is set."""
+
+    def __init__(self):
+        self.admit = asyncio.Event()
+
+    async def fetch(self, fn, args, admitted=None):
+        await self.admit.wait()
+        if admitted is not None:
+            admitted()
+        return fn(*args)
+
+
+def dispatcher():
+    calls = []
+
+    def compute_batch(message_type, specs):
+        calls.append(len(specs))
+        return [json.dumps({"id": SHARED_ID, "run": len(calls)}) for _ in specs]
+
+    lane = Lane()
+    return IndicatorDispatcher(lane, compute_batch), lane, calls
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def update(id):
+    return json.dumps(
+        {"type": "indicator_update", "id": id, "data": {"date": 1, f"{id}-SMA_5": 2.0}}
+    )
+
+
+@pytest.mark.parametrize("id", [7, "chart-1", 'say "hi"'])
+def test_with_id(id):
+    assert with_id(update(SHARED_ID), id) == update(id)
+
+
+def test_request_joins_a_queued_job():
+    async def run():
+        d, lane, calls = dispatcher()
+        ws = Socket()
+        d.request(ws, "a", SMA, {"length": 5}, DATA_MAP)
+        d.flush()
+        # a tick right after the flush, before the job's task started
+        d.request(ws, "a", SMA, {"length": 5}, DATA_MAP)
+        d.request(ws, "b", SMA, {"length": 5}, DATA_MAP)
+        await settle()
+        lane.admit.set()
+        await settle()
+        return d, ws, calls
+
+    d, ws, calls = asyncio.run(run())
+    assert calls == [1]
+    assert sorted(m["id"] for m in ws.sent) == ["a", "b"]
+    assert d.stats()["dropped"] == 0
+    assert d.stats()["superseded"] == 1
+
+
+def test_request_while_computed_reruns():
+    async def run():
+        d, lane, calls = dispatcher()
+        ws = Socket()
+        lane.admit.set()
+        original = d._compute_batch
+
+        def compute_batch(message_type, specs):
+            if not calls:  # a tick while the first run reads the candles
+                d.request(ws, "a", SMA, {"length": 5}, DATA_MAP)
+            return original(message_type, specs)
+
+        d._compute_batch = compute_batch
+        d.request(ws, "a", SMA, {"length": 5}, DATA_MAP)
+        d.flush()
+        await settle()
+        return d, ws, calls
+
+    d, ws, calls = asyncio.run(run())
+    assert calls == [1, 1]
+    assert [m["run"] for m in ws.sent] == [2]
+    assert d.stats()["dropped"] == 1
@@ -0,0 +1,113 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import fetcher, indicator_state
+from app.store import CandleStore
+from candles import defaults, ids_with, ohlcv, rows
+from db import indicators
+
+SEEDED = 150  # bars replayed by `initialize`, the rest arrive as ticks
+BARS = 260
+
+
+def assert_outputs(obj, got, full, i):
+    for output, value, expected in zip(obj.outputs, got, full):
+        want = expected[i][1]
+        want = math.nan if want is None else float(want)
+        assert (math.isnan(value) and math.isnan(want)) or math.isclose(
+            value, want, rel_tol=1e-6, abs_tol=1e-9
+        ), f"{output['name']} at bar {i}: {value} != {want}"
+
+
+def mamode(id, name):
+    return indicators[id]["klass"].mamode.index(name)
+
+
+ATR = "indicators.pandas_ta.volatility.atr.ATR"
+BBANDS = "indicators.pandas_ta.volatility.bbands.BBANDS"
+RSI = "indicators.pandas_ta.momentum.rsi.RSI"
+
+# inputs other than the defaults: other moving averages, deviations, drifts
+OTHER_INPUTS = [
+    (ATR, {"length": 10, "mamode": mamode(ATR, "ema")}),
+    (ATR, {"length": 10, "mamode": mamode(ATR, "sma")}),
+    (BBANDS, {"length": 20, "std": 1.5, "mamode": mamode(BBANDS, "ema")}),
+    (RSI, {"length": 7, "drift": 2}),
+]
+
+
+def assert_incremental(id, inputs):
+    obj = indicators[id]["klass"]()
+    inputs = {**defaults(obj), **inputs}
+    if obj.incremental_state(**inputs) is None:
+        pytest.skip("no incremental state for the inputs")
+
+    data = rows(obj, ohlcv(BARS))
+    full = obj.calc(data, **inputs)
+
+    assert_outputs(obj, obj.initialize(data[:SEEDED], **inputs), full, SEEDED - 1)
+    for i in range(SEEDED, len(data)):
+        tick = [data[i][0]] + [v * 1.01 for v in data[i][1:]]
+        obj.update(tick)  # the bar opens on other values
+        assert_outputs(obj, obj.revise(data[i]), full, i)
+
+
+@pytest.mark.parametrize("id", ids_with("incremental_state"))
+def test_incremental_matches_calc(id):
+    assert_incremental(id, {})
+
+
+@pytest.mark.parametrize("id, inputs", OTHER_INPUTS)
+def test_incremental_matches_calc_other_inputs(id, inputs):
+    assert_incremental(id, inputs)
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    store = CandleStore({})
+    monkeypatch.setattr(fetcher, "_shared_cache", store)
+    monkeypatch.setattr(indicator_state, "states", {})
+    yield store
+    store.close()
+
+
+def test_restated_candle_drops_state(shared_cache):
+    key = ("Binance", "BTCUSDT", "1h")
+    data = ohlcv(50)
+    dates = pd.to_datetime(data["date"]).values.view(np.int64)
+    shared_cache.put(key, dates, np.vstack([data["close"]]), ["close"])
+
+    indicator = {"id": "indicators.pandas_ta.overlap.sma.SMA", "details": {}}
+    inputs = {"length": 10}
+    data_map = {"close": {"source": key[0], "name": key[1], "interval": key[2]}}
+    data_map["close"]["value"] = "close"
+    obj = indicators[indicator["id"]]["klass"]()
+    seed_rows = rows(obj, data)
+    outputs = obj.initialize(seed_rows, **inputs)
+    expected = indicator_state._output_values("sma", obj.outputs, outputs)
+
+    indicator_state.seed_state("sma", indicator, inputs, data_map, seed_rows, expected)
+    shared_cache.merge(key, dates[-1:], np.array([[101.0]]), ["close"])
+    assert indicator_state.incremental_update("sma", indicator, inputs, data_map)
+
+    # a closed candle restated in the middle of the series
+    shared_cache.merge(key, dates[20:21], np.array([[90.0]]), ["close"])
+    assert (
+        indicator_state.incremental_update("sma", indicator, inputs, data_map) is None
+    )
+    assert indicator_state.states == {}
@@ -0,0 +1,137 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import resample as rs
+from app.store import CandleStore
+
+COLUMNS = [
+    f"Binance-BTCUSDT-1m-{c}" for c in ("open", "high", "low", "close", "volume")
+]
+
+
+def base_candles(n, start="2024-01-01 00:00", freq="1min", seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=n, freq=freq).values.view(np.int64)
+    close = 100 + rng.normal(size=n).cumsum()
+    values = np.vstack(
+        [close + rng.normal(size=n), close + 2, close - 2, close, rng.random(n) * 10]
+    )
+    values[:, 7] = np.nan  # a missing candle
+    return dates, values
+
+
+def pandas_resample(dates, values, rule):
+    df = pd.DataFrame(values.T, index=pd.to_datetime(dates), columns=COLUMNS)
+    how = {c: rs.aggregation(c) for c in COLUMNS}
+    how = {c: {"first": "first", "last": "last"}.get(h, h) for c, h in how.items()}
+    out = df.resample(rule).agg(how).dropna(how="all")
+    return out.index.values.view(np.int64), out.to_numpy().T
+
+
+@pytest.mark.parametrize("interval, rule", [("5m", "5min"), ("3h", "3h")])
+def test_resample_matches_pandas(interval, rule):
+    dates, values = base_candles(1000)
+    dates = np.delete(dates, [20, 21, 22])  # a gap in the base series
+    values = np.delete(values, [20, 21, 22], axis=1)
+
+    out_dates, out_values = rs.resample(dates, values, COLUMNS, interval)
+    expected_dates, expected_values = pandas_resample(dates, values, rule)
+
+    np.testing.assert_array_equal(out_dates, expected_dates)
+    np.testing.assert_allclose(out_values, expected_values, equal_nan=True)
+
+
+def test_resample_empty():
+    dates, values = rs.resample(np.array([], dtype=np.int64), None, COLUMNS, "5m")
+    assert len(dates) == 0 and values.shape == (5, 0)
+
+
+def test_aggregator_streams_the_resampled_candles():
+    dates, values = base_candles(300)
+    seeded = 123  # seed mid-bucket, the rest arrives as ticks
+
+    aggregator = rs.IntervalAggregator(COLUMNS, "15m")
+    aggregator.seed(dates[:seeded], values[:, :seeded])
+    candles = {}
+    for j in range(seeded - 1, len(dates)):
+        forming = values[:, j] + 0.25  # a tick before the candle closes
+        aggregator.update(int(dates[j]), forming)
+        bucket, candle = aggregator.update(int(dates[j]), values[:, j])
+        candles[bucket] = candle
+
+    expected_dates, expected_values = rs.resample(dates, values, COLUMNS, "15m")
+    for i, bucket in enumerate(expected_dates[-len(candles) :]):
+        np.testing.assert_allclose(
+            candles[bucket], expected_values[:, len(expected_dates) - len(candles) + i]
+        )
+
+
+def test_derived_base(monkeypatch):
+    provider = SimpleNamespace(
+        provider_class=SimpleNamespace(intervals=["1m", "5m", "1h", "1d", "1M"])
+    )
+    monkeypatch.setitem(rs.providers, "Test", provider)
+
+    assert rs.derived_base("Test", "5m") is None
+    assert rs.derived_base("Test", "15m") == "5m"
+    assert rs.derived_base("Test", "4h") == "1h"
+    assert rs.derived_base("Test", "1w") == "1d"
+    assert rs.derived_base("Test", "3M") == "1M"
+    assert rs.derived_base("Unknown", "15m") is None
+
+
+def test_with_bases(monkeypatch):
+    provider = SimpleNamespace(provider_class=SimpleNamespace(intervals=["1m", "1h"]))
+    monkeypatch.setitem(rs.providers, "Test", provider)
+
+    assert rs.with_bases([("Test", "BTC", "15m"), ("Test", "ETH", "1h")]) == {
+        ("Test", "BTC", "15m"),
+        ("Test", "BTC", "1m"),
+        ("Test", "ETH", "1h"),
+    }
+
+
+def test_derive_series_after_base_refetched(monkeypatch):
+    store = CandleStore({})
+    monkeypatch.setattr(rs, "historical_data_cache", store)
+    monkeypatch.setattr(rs, "built_from", {})
+    base, derived = ("Binance", "BTCUSDT", "1m"), ("Binance", "BTCUSDT", "15m")
+
+    dates, values = base_candles(120)
+    store.put(base, dates, values, COLUMNS)
+    rs.derive_series(*derived[:2], "15m", "1m")
+
+    # evicted and fetched again: the version restarts, the candles differ
+    del store[base]
+    dates, values = base_candles(120, seed=1)
+    store.put(base, dates, values, COLUMNS)
+    assert store.series(base).version == 1
+    rs.derive_series(*derived[:2], "15m", "1m")
+
+    expected_dates, expected_values = rs.resample(dates, values, COLUMNS, "15m")
+    np.testing.assert_array_equal(store.series(derived).dates, expected_dates)
+    np.testing.assert_allclose(store.series(derived).values, expected_values)
+    store.close()
+
+
+def test_rename_column():
+    assert rs.rename_column("Binance-BTCUSDT-1m-close", "1m", "15m") == (
+        "Binance-BTCUSDT-15m-close"
+    )
+    assert rs.rename_column("Binance-BTCUSDT-1m", "1m", "15m") == "Binance-BTCUSDT-15m"
+    assert rs.base_candles_needed("15m", "5m", 10) == 33
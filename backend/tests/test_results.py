@@ -0,0 +1,69 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from app import fetcher, handlers, indicator_results
+from app.store import CandleStore
+
+KEY = ("Binance", "BTCUSDT", "1h")
+HOUR = 3600 * 10**9
+SMA = {"id": "indicators.pandas_ta.overlap.sma.SMA", "details": {}}
+DATA_MAP = {
+    "close": {"source": KEY[0], "name": KEY[1], "interval": KEY[2], "value": "close"}
+}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = CandleStore({})
+    dates = np.arange(100, dtype=np.int64) * HOUR
+    close = 100 + np.random.default_rng(0).normal(size=(1, 100)).cumsum(axis=1)
+    store.put(KEY, dates, close, ["close"])
+    monkeypatch.setattr(fetcher, "_shared_cache", store)
+    monkeypatch.setattr(indicator_results, "MAX_BYTES", 1 << 20)
+    monkeypatch.setattr(indicator_results, "results", OrderedDict())
+    yield store
+    store.close()
+
+
+def sma(message_type="indicator_init"):
+    return handlers.send_indicator_data(
+        message_type, "sma", SMA, {"length": 5}, DATA_MAP, count=50
+    )
+
+
+def recomputed():
+    indicator_results.results.clear()
+    return sma()
+
+
+def test_tick_reuses_entry(store):
+    sma()
+    segment = store.series(KEY).segment
+    store.merge(KEY, np.array([100 * HOUR]), np.array([[101.0]]), ["close"])
+    assert store.series(KEY).segment == segment  # written in place
+
+    assert sma() == recomputed()
+
+
+def test_restated_candle_recomputes_entry(store):
+    sma()
+    # a tick, then a closed candle in the middle of the series restated
+    store.merge(KEY, np.array([100 * HOUR]), np.array([[101.0]]), ["close"])
+    sma("indicator_update")
+    store.merge(KEY, np.array([80 * HOUR]), np.array([[90.0]]), ["close"])
+
+    assert sma() == recomputed()
@@ -0,0 +1,83 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import numpy as np
+import pytest
+
+from app import fetcher, handlers
+from app.store import CandleStore
+from indicators.data import rolling
+from indicators.data.rolling import shared_windows, window
+
+KEY = ("Binance", "BTCUSDT", "1h")
+DATA_MAP = {
+    "close": {"source": KEY[0], "name": KEY[1], "interval": KEY[2], "value": "close"}
+}
+
+
+@pytest.fixture
+def created(monkeypatch):
+    """The windows `window` creates."""
+    created = []
+
+    class RollingWindow(rolling.RollingWindow):
+        def __init__(self, values, length):
+            super().__init__(values, length)
+            created.append(self)
+
+    monkeypatch.setattr(rolling, "RollingWindow", RollingWindow)
+    return created
+
+
+def test_windows_shared_inside_block(created):
+    column = np.arange(100, dtype=np.float64)
+    with shared_windows():
+        assert window(column[10:], 20) is window(column[10:], 20)
+        assert window(column[10:], 20) is not window(column[11:], 20)
+        assert window(column[10:], 20) is not window(column[10:], 21)
+        with shared_windows():
+            window(column[10:], 20)
+    assert len(created) == 3
+
+    assert window(column, 20) is not window(column, 20)
+    assert rolling.windows is None
+
+
+def test_batch_shares_windows(monkeypatch, created):
+    store = CandleStore({})
+    dates = np.arange(500, dtype=np.int64) * 3600 * 10**9
+    close = 100 + np.random.default_rng(0).normal(size=(1, 500)).cumsum(axis=1)
+    store.put(KEY, dates, close, ["close"])
+    monkeypatch.setattr(fetcher, "_shared_cache", store)
+
+    specs = [
+        (
+            id,
+            {"id": f"indicators.pandas_ta.statistics.{module}", "details": {}},
+            inputs,
+            DATA_MAP,
+            None,
+            100,
+        )
+        for id, module, inputs in [
+            ("stdev", "stdev.STDEV", {"length": 20}),
+            ("zscore", "zscore.ZSCORE", {"length": 20, "std": 1}),
+        ]
+    ]
+    try:
+        messages = handlers.send_indicator_batch("indicator_init", specs)
+    finally:
+        store.close()
+
+    assert all(messages)
+    assert len(created) == 1
+    assert rolling.windows is None
@@ -0,0 +1,51 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import json
+import asyncio
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+from starlette.websockets import WebSocketState
+
+from app import router
+
+
+class Socket:
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self, host):
+        self.client = SimpleNamespace(host=host)
+        self.sent = []
+
+    async def send_text(self, message):
+        self.sent.append(json.loads(message))
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    monkeypatch.setattr(router.Config, "MAX_DATA_REQUESTS_PER_IP_PER_HOUR", "1")
+    monkeypatch.setattr(router, "data_requests", defaultdict(list))
+
+
+def request(host, message_type):
+    websocket = Socket(host)
+    asyncio.run(router.process_message(websocket, {"type": message_type}, None, None))
+    return [m["type"] for m in websocket.sent]
+
+
+@pytest.mark.parametrize("message_type", ["cache_stats", "indicator_stats"])
+def test_stats_are_data_requests(message_type):
+    assert request("203.0.113.7", message_type) == [message_type]
+    assert request("203.0.113.7", message_type) == ["notification"]  # over limit
+    assert request("127.0.0.1", message_type) == [message_type]
@@ -0,0 +1,168 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import asyncio
+
+import pytest
+
+from app import router
+from app.scheduler import PRIORITIES, PriorityScheduler, parse_limits
+
+
+class Fetcher:
+    """A `BlockingFetcher` whose jobs run until their event is set."""
+
+    def __init__(self):
+        self.started = []
+        self.events = {}
+
+    async def fetch(self, fn, args):
+        name = args[0]
+        self.started.append(name)
+        self.events[name] = asyncio.Event()
+        await self.events[name].wait()
+        return name
+
+    def finish(self, name):
+        self.events[name].set()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def scheduler(workers, limits=""):
+    fetcher = Fetcher()
+    return fetcher, PriorityScheduler(fetcher, workers, parse_limits(limits, workers))
+
+
+def test_parse_limits():
+    assert parse_limits("optimization=1, history=9, bogus=2, update=x", 4) == {
+        "interactive": 4,
+        "update": 4,
+        "history": 4,
+        "optimization": 1,
+    }
+
+
+def test_most_urgent_class_first():
+    async def run():
+        fetcher, s = scheduler(1)
+        jobs = [asyncio.ensure_future(s.fetch("optimization", None, ("ga",)))]
+        await settle()
+        for priority in reversed(PRIORITIES[:-1]):
+            jobs.append(asyncio.ensure_future(s.fetch(priority, None, (priority,))))
+        await settle()
+        assert fetcher.started == ["ga"]  # one job per worker, not preempted
+
+        for name in ["ga", "interactive", "update", "history"]:
+            fetcher.finish(name)
+            await settle()
+        assert await asyncio.gather(*jobs) == ["ga", "history", "update", "interactive"]
+        assert fetcher.started == ["ga", "interactive", "update", "history"]
+
+    asyncio.run(run())
+
+
+def test_class_limit():
+    async def run():
+        fetcher, s = scheduler(2, "optimization=1")
+        jobs = [
+            asyncio.ensure_future(s.fetch("optimization", None, (f"ga{i}",)))
+            for i in range(2)
+        ]
+        jobs.append(asyncio.ensure_future(s.fetch("history", None, ("scroll",))))
+        await settle()
+        assert fetcher.started == ["ga0", "scroll"]
+        stats = s.stats()
+        assert stats["optimization"]["running"] == 1
+        assert stats["optimization"]["queued"] == 1
+
+        fetcher.finish("scroll")
+        await settle()
+        assert fetcher.started == ["ga0", "scroll"]  # still at its limit
+        fetcher.finish("ga0")
+        await settle()
+        fetcher.finish("ga1")
+        await asyncio.gather(*jobs)
+        assert s.stats()["optimization"]["admitted"] == 2
+
+    asyncio.run(run())
+
+
+def test_cancelled_jobs_free_their_place():
+    async def run():
+        fetcher, s = scheduler(1)
+        running = asyncio.ensure_future(s.fetch("history", None, ("a",)))
+        queued = asyncio.ensure_future(s.fetch("interactive", None, ("b",)))
+        await settle()
+        queued.cancel()
+        await settle()
+        assert s.stats()["interactive"]["queued"] == 0
+
+        # the worker stays taken until the job ends, even if its caller left
+        running.cancel()
+        await settle()
+        later = asyncio.ensure_future(s.fetch("update", None, ("c",)))
+        await settle()
+        assert fetcher.started == ["a"]
+        fetcher.finish("a")
+        await settle()
+        fetcher.finish("c")
+        assert await later == "c"
+        assert all(stats["running"] == 0 for stats in s.stats().values())
+
+    asyncio.run(run())
+
+
+class Client:
+    host = "127.0.0.1"
+
+
+class Socket:
+    client = Client()
+
+
+@pytest.mark.parametrize(
+    "request_type, message_type, lane",
+    [
+        ("indicator", "indicator_init", "interactive"),
+        ("indicator_history", "indicator_history", "history"),
+    ],
+)
+def test_indicator_lanes(monkeypatch, request_type, message_type, lane):
+    calls = []
+
+    async def allowed(websocket):
+        return True
+
+    async def do_indicators(websocket, lane, message_type, specs):
+        calls.append((lane.priority, message_type, len(specs)))
+
+    _, s = scheduler(1)
+    monkeypatch.setattr(router, "indicator_scheduler", s)
+    monkeypatch.setattr(router, "_data_request_allowed", allowed)
+    monkeypatch.setattr(router, "_do_indicators", do_indicators)
+
+    data_map = {"close": {"source": "S", "name": "N", "interval": "1h"}}
+    items = [
+        {"type": request_type, "id": str(i), "dataMap": data_map, "stream": False}
+        for i in range(2)
+    ]
+
+    async def run():
+        await router.process_indicators(Socket(), items)
+        await settle()
+
+    asyncio.run(run())
+    assert calls == [(lane, message_type, 2)]
@@ -0,0 +1,158 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import pickle
+from multiprocessing import Manager
+
+import numpy as np
+import pytest
+
+from app.store import CandleStore, MIN_CAPACITY
+
+MINUTE = 60 * 10**9
+COLUMNS = ["open", "close"]
+A, B, C, D = (("Binance", name, "1m") for name in ("A", "B", "C", "D"))
+K = ("Binance", "K", "1m")
+
+
+def candles(start, n, value=1.0):
+    dates = (np.arange(start, start + n) * MINUTE).astype(np.int64)
+    values = np.vstack([np.arange(n) + value, np.arange(n) + value + 0.5])
+    return dates, values
+
+
+@pytest.fixture
+def store():
+    store = CandleStore({})
+    yield store
+    store.close()
+
+
+def test_merge_appends_in_place(store):
+    store.put(K, *candles(0, 10), COLUMNS)
+    segment = store._headers[K]["shm"]
+    version = store.series(K).version
+
+    store.merge(K, *candles(9, 1, value=100.0), COLUMNS)  # forming candle
+    store.merge(K, *candles(10, 2, value=200.0), COLUMNS)  # new candles
+
+    series = store.series(K)
+    assert store._headers[K]["shm"] == segment
+    assert series.version == version + 2
+    assert len(series) == 12
+    assert series.values[0, 9] == 100.0
+    np.testing.assert_array_equal(series.values[0, 10:], [200.0, 201.0])
+
+
+def test_merge_older_rows_rebuilds(store):
+    store.put(K, *candles(10, 5), COLUMNS)
+    segment = store._headers[K]["shm"]
+
+    store.merge(K, *candles(5, 7, value=50.0), COLUMNS)
+
+    series = store.series(K)
+    assert store._headers[K]["shm"] != segment
+    np.testing.assert_array_equal(series.dates, np.arange(5, 15) * MINUTE)
+    assert series.values[0, 6] == 56.0  # the new row wins on equal dates
+    assert series.values[0, 9] == 5.0
+
+
+def test_append_past_capacity_grows_segment(store):
+    store.put(K, *candles(0, 10), COLUMNS)
+    store.merge(K, *candles(10, MIN_CAPACITY), COLUMNS)
+
+    series = store.series(K)
+    assert len(series) == MIN_CAPACITY + 10
+    assert series.dates[-1] == (MIN_CAPACITY + 9) * MINUTE
+
+
+def test_budget_evicts_least_recently_used(store):
+    store.put(A, *candles(0, 10), COLUMNS)
+    store.put(B, *candles(0, 10), COLUMNS)
+    store.put(C, *candles(0, 10), COLUMNS)
+    store.max_bytes = store._nbytes[A] * 2
+    store.series(A)  # b is now the least recently used
+
+    store.put(D, *candles(0, 10), COLUMNS)
+
+    assert B not in store and C not in store
+    assert A in store and D in store
+    assert store.evictions == 2
+
+
+def test_budget_keeps_pinned_series(store):
+    store.put(A, *candles(0, 10), COLUMNS)
+    store.pin(A)
+    store.max_bytes = store._nbytes[A]
+
+    store.put(B, *candles(0, 10), COLUMNS)
+
+    assert A in store and B in store
+    assert store.stats()["pinned"] == 1
+
+
+def test_streamed_series_is_in_use(store):
+    store.put(A, *candles(0, 10), COLUMNS)
+    store.put(B, *candles(0, 10), COLUMNS)
+    store.max_bytes = store._nbytes[A] * 2
+    segment = store._headers[A]["shm"]
+    store.merge(A, *candles(10, 1), COLUMNS)  # a tick, b is now idle
+    assert store._headers[A]["shm"] == segment
+
+    store.put(C, *candles(0, 10), COLUMNS)
+
+    assert B not in store and A in store
+
+
+def test_lfu_policy_evicts_least_hit(store):
+    store.policy = "lfu"
+    store.put(A, *candles(0, 10), COLUMNS)
+    store.put(B, *candles(0, 10), COLUMNS)
+    for _ in range(3):
+        store.series(A)
+    store.max_bytes = store._nbytes[A] * 2
+
+    store.put(C, *candles(0, 10), COLUMNS)
+
+    assert B not in store and A in store
+
+
+def test_readers_drop_evicted_segments():
+    with Manager() as manager:
+        store = CandleStore(manager.dict())
+        try:
+            store.put(A, *candles(0, 10), COLUMNS)
+            store.put(B, *candles(0, 10), COLUMNS)
+            reader = pickle.loads(pickle.dumps(store))  # as a worker gets it
+            assert reader.series(A) is not None
+            assert reader.series(B) is not None
+
+            del store[A]
+            store.put(B, *candles(0, 20), COLUMNS)  # swaps b's segment
+            stale = reader._segments[B].name
+            reader.series(B)
+
+            assert A not in reader._segments
+            assert reader._segments[B].name != stale
+            assert reader.series(A) is None
+        finally:
+            store.close()
+
+
+def test_generation_segment_created_by_owner_only(store):
+    store.put(A, *candles(0, 10), COLUMNS)
+    assert store._generation_shm is None  # importing processes leak nothing
+
+    reader = pickle.loads(pickle.dumps(store))
+    assert reader._generation_shm.name == store._generation_shm.name
+    reader._generation = None
+    reader._generation_shm.close()
@@ -0,0 +1,113 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+import json
+import asyncio
+
+import numpy as np
+import pytest
+from starlette.websockets import WebSocketState
+
+from app import fetcher, handlers
+from app.indicator_io import run_indicator
+from app.indicator_sweep import input_sets, sweep_rows
+from app.store import CandleStore
+from candles import defaults
+from db import indicators
+
+KEY = ("Binance", "BTCUSDT", "1h")
+SMA = {"id": "indicators.pandas_ta.overlap.sma.SMA", "details": {}}
+DATA_MAP = {
+    "close": {"source": KEY[0], "name": KEY[1], "interval": KEY[2], "value": "close"}
+}
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    store = CandleStore({})
+    rng = np.random.default_rng(0)
+    dates = np.arange(500, dtype=np.int64) * 3600 * 10**9
+    store.put(KEY, dates, 100 + rng.normal(size=(1, 500)).cumsum(axis=1), ["close"])
+    monkeypatch.setattr(fetcher, "_shared_cache", store)
+    yield store
+    store.close()
+
+
+class Socket:
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, message):
+        self.sent.append(json.loads(message))
+
+
+def test_input_sets():
+    assert input_sets(grid={"a": [1, 2], "b": [3, 4]}) == [
+        {"a": 1, "b": 3},
+        {"a": 1, "b": 4},
+        {"a": 2, "b": 3},
+        {"a": 2, "b": 4},
+    ]
+    with pytest.raises(ValueError):
+        input_sets(grid={"a": list(range(100)), "b": list(range(100))})
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_sweep_reads_count_and_warmup(shared_cache, shared):
+    sets = [{"length": 5}, {"length": 20}]
+    dates, rows = sweep_rows(SMA, DATA_MAP, sets, "SMA", shared, count=50)
+
+    assert len(dates) == 50 + 20  # the count after the longest warm-up
+    series = shared_cache.series(KEY)
+    obj = indicators[SMA["id"]]["klass"]()
+    for inputs, row in zip(sets, rows):
+        _, _, values, _, _ = run_indicator(
+            obj, series.dates, [series.values[0]], inputs
+        )
+        np.testing.assert_allclose(row[-50:], values[0, -50:])
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        {"indicator": {"id": "unknown"}, "count": 10},
+        {"indicator": SMA, "inputs": [{"length": 5}]},
+    ],
+)
+def test_sweep_errors_are_sent_back(request_):
+    ws = Socket()
+    asyncio.run(handlers._do_indicator_sweep(ws, None, dict(request_, id="s")))
+    assert ws.sent[0]["type"] == "notification"
+    assert ws.sent[0]["message"].startswith("Error")
+
+
+@pytest.mark.parametrize(
+    "indicator", [SMA, {"id": "indicators.pandas_ta.momentum.rsi.RSI", "details": {}}]
+)
+def test_generation_sweep_runs_in_process(shared_cache, monkeypatch, indicator):
+    # with the GA holding the only worker, a queued sweep would never start
+    monkeypatch.setattr(handlers, "indicator_scheduler", None)
+    klass = indicators[indicator["id"]]["klass"]
+    sets = [{**defaults(klass), "length": length} for length in (5, 20)]
+    output = klass.outputs[0]["name"]
+
+    message = handlers._generation_sweep(indicator, DATA_MAP, 50)(sets, output)
+
+    assert message["type"] == "indicator_sweep"
+    assert message["inputs"] == sets
+    assert len(message["dates"]) == 50
+    dates, rows = sweep_rows(indicator, DATA_MAP, sets, output, False, count=50)
+    np.testing.assert_allclose(
+        np.array(message["data"], dtype=np.float64), rows[:, -50:]
+    )
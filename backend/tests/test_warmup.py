@@ -0,0 +1,57 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""Indicators computed from their `warmup` against the whole history."""
+
+import numpy as np
+import pytest
+
+from app.indicator_io import compute, run_indicator, select_rows
+from candles import arrays, defaults, ids_with, ohlcv
+from db import indicators
+
+
+def same_rows(a, b, selection):
+    """Whether two results agree on the selected rows, to a tolerance."""
+    (a_index, a_names, a_values), (b_index, b_names, b_values) = a, b
+    a_lo, a_hi = select_rows(a_index, *selection)
+    b_lo, b_hi = select_rows(b_index, *selection)
+    if a_names != b_names or not np.array_equal(a_index[a_lo:a_hi], b_index[b_lo:b_hi]):
+        return False
+
+    a_values, b_values = a_values[:, a_lo:a_hi], b_values[:, b_lo:b_hi]
+    with np.errstate(invalid="ignore"):
+        scale = np.nanmax(np.abs(np.where(np.isinf(b_values), np.nan, b_values)), 1)
+    for a_column, b_column, column_scale in zip(a_values, b_values, scale):
+        atol = 1e-6 * (0.0 if np.isnan(column_scale) else column_scale)
+        if not np.allclose(a_column, b_column, rtol=1e-6, atol=atol, equal_nan=True):
+            return False
+    return True
+
+
+@pytest.mark.parametrize(
+    "message_type, count", [("indicator_init", 50), ("indicator_update", None)]
+)
+@pytest.mark.parametrize("id", ids_with("warmup"))
+def test_warmup_matches_whole_history(id, message_type, count):
+    obj = indicators[id]["klass"]()
+    inputs = defaults(obj)
+    if obj.warmup(**inputs) is None:
+        pytest.skip("needs the whole history")
+    dates, columns = arrays(obj, ohlcv(2000))
+    selection = (message_type, inputs, None, count)
+
+    result, start = compute(obj, dates, columns, inputs, selection)
+    full = run_indicator(obj, dates, columns, inputs)
+
+    assert start > 0
+    assert same_rows(result[:3], full[:3], selection)
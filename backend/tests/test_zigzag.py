@@ -0,0 +1,167 @@
+# This software is licensed under a dual-license model:
+# 1. Under the Affero General Public License (AGPL) for open-source use.
+# 2. With additional terms tailored to individual users (e.g., traders and investors):
+#
+#    - Individual users may use this software for personal profit (e.g., trading/investing)
+#      without releasing proprietary strategies.
+#
+#    - Redistribution, public tools, or commercial use require compliance with AGPL
+#      or a commercial license. Contact: license@tradiny.com
+#
+# For full details, see the LICENSE.md file in the root directory of this project.
+
+"""The vectorized and streamed ZigZag against the former loop implementation."""
+
+from collections import OrderedDict
+from math import floor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators.JaktensTid import true_zigzag
+from indicators.JaktensTid.true_zigzag import ZIGZAG
+
+from candles import ohlcv, rows
+
+PARAMS = [(1, 0.1), (4, 0.5), (10, 0.5), (11, 2.0), (20, 0.2)]
+
+
+def loop_zigzag(highs, lows, depth=10, dev_threshold=5):
+    def pivots(src_raw, length, isHigh):
+        src = list(reversed(src_raw))
+        bar_index = list(range(len(src)))
+        for start in range(0, len(src)):
+            if start + 2 * length + 1 > len(src) - 1:
+                return
+            p = 0
+            if length < len(src) - start:
+                p = src[start + length]
+            if length == 0:
+                yield 0, p
+            else:
+                isFound = True
+                for i in range(start, start + length):
+                    if isHigh and src[i] > p:
+                        isFound = False
+                    if not isHigh and src[i] < p:
+                        isFound = False
+                for i in range(start + length + 1, start + 2 * length + 1):
+                    if isHigh and src[i] >= p:
+                        isFound = False
+                    c = not isHigh and src[i] <= p
+                    if c:
+                        isFound = False
+                if isFound:
+                    yield (bar_index[start + length], p)
+                else:
+                    yield None, None
+
+    data_highs = [x for x in pivots(highs, floor(depth / 2), True) if x[0]]
+    data_lows = [x for x in pivots(lows, floor(depth / 2), False) if x[0]]
+
+    raw_pairs = []
+    for ind, p in data_highs:
+        lows_d = sorted(
+            [(ind_l, p_l) for ind_l, p_l in data_lows if ind > ind_l],
+            key=lambda x: x[0],
+        )
+        if lows_d:
+            lows = lows_d[-1]
+            if abs(true_zigzag._calc_dev(lows[1], p)) >= dev_threshold:
+                raw_pairs.append(((ind, p), (lows[0], lows[1])))
+
+    result = []
+    for (i_h, p_h), (i_l, p_l) in raw_pairs:
+        if not result:
+            result.append(((i_h, p_h), (i_l, p_l)))
+            continue
+        if i_l == result[-1][1][0]:
+            if p_h > result[-1][0][1]:
+                result = result[:-1]
+            else:
+                continue
+        result.append(((i_h, p_h), (i_l, p_l)))
+    return result
+
+
+def loop_calc(data, depth, dev_threshold):
+    df = pd.DataFrame(data, columns=["Date", "high", "low"])
+    df.index = pd.DatetimeIndex(df["Date"])
+    df["zig_zag"] = np.nan
+    pairs = loop_zigzag(
+        df["high"].tolist(), df["low"].tolist(), int(depth), float(dev_threshold)
+    )
+    for i, price in sorted(
+        ((len(df) - 1 - idx, p) for pair in pairs for idx, p in pair),
+        key=lambda x: x[0],
+    ):
+        df.at[df.index[i], "zig_zag"] = price
+    df["zig_zag"] = df["zig_zag"].interpolate(method="linear", limit_area="inside")
+    df = df.dropna(subset=["zig_zag"])
+    return [[[r["Date"], r["zig_zag"]] for r in df.to_dict(orient="records")]]
+
+
+def assert_same(result, expected):
+    (result,), (expected,) = result, expected
+    assert [d for d, _ in result] == [d for d, _ in expected]
+    np.testing.assert_allclose([v for _, v in result], [v for _, v in expected])
+
+
+def candles(n, seed, gaps=False):
+    data = rows(ZIGZAG(), ohlcv(n, seed))
+    if gaps:
+        for i in np.random.default_rng(seed).choice(n, n // 20, replace=False):
+            data[i][1] = data[i][2] = np.nan
+    return data
+
+
+@pytest.fixture(autouse=True)
+def streams(monkeypatch):
+    monkeypatch.setattr(true_zigzag, "streams", OrderedDict())
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("depth, dev_threshold", PARAMS)
+def test_zigzag_pairs(depth, dev_threshold, seed):
+    data = candles(400, seed)
+    highs, lows = [r[1] for r in data], [r[2] for r in data]
+    assert true_zigzag.zigzag(highs, lows, depth, dev_threshold) == loop_zigzag(
+        highs, lows, depth, dev_threshold
+    )
+
+
+@pytest.mark.parametrize("gaps", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("depth, dev_threshold", PARAMS)
+def test_full_compute(depth, dev_threshold, seed, gaps):
+    data = candles(400, seed, gaps)
+    assert_same(
+        ZIGZAG().calc(data, depth, dev_threshold),
+        loop_calc(data, depth, dev_threshold),
+    )
+
+
+@pytest.mark.parametrize("depth, dev_threshold", PARAMS)
+def test_tick_streaming(depth, dev_threshold, monkeypatch):
+    built = []
+    from_arrays = true_zigzag.ZigZagStream.from_arrays
+    monkeypatch.setattr(
+        true_zigzag.ZigZagStream,
+        "from_arrays",
+        lambda *args: built.append(len(args[0])) or from_arrays(*args),
+    )
+
+    data = candles(160, seed=1)
+    obj = ZIGZAG()
+    for i in range(40, len(data)):
+        date, high, low = data[i]
+        # the forming bar widens over its ticks before it closes
+        mid = (high + low) / 2
+        for tick in ([date, mid, mid], [date, high, mid], data[i]):
+            bars = data[:i] + [tick]
+            assert_same(
+                obj.calc(bars, depth, dev_threshold),
+                loop_calc(bars, depth, dev_threshold),
+            )
+    assert built == [40]  # stepped through every later bar
@@ -11,12 +11,17 @@
 # For full details, see the LICENSE.md file in the root directory of this project.
 
 from datetime import datetime, timedelta, timezone
+import numpy as np
 import pandas as pd
 import time
 import socket
 
 from pathlib import Path
 import sys
+import re
+
+INTERVAL_UNIT_MINUTES = {"m": 1, "h": 60, "d": 1440, "w": 10080, "M": 43800}
+WEEK_ORIGIN_NS = 4 * 24 * 3600 * 10**9  # 1970-01-05, a Monday
 
 
 def find_free_port(host, start_port=8000):
@@ -48,144 +53,88 @@ def resource_path(relative_path):
     return Path(base_path).joinpath(relative_path)
 
 
-def determine_data_needs(cached_data, start_time, end_time):
-    # Convert start_time and end_time to datetime objects
-    if isinstance(start_time, str):
-        start_time = pd.to_datetime(start_time).replace(tzinfo=timezone.utc)
-    if isinstance(end_time, str):
-        end_time = pd.to_datetime(end_time).replace(tzinfo=timezone.utc)
-
-    # If cached_df is empty, return the full range
-    if "cached_df" not in cached_data or cached_data["cached_df"].empty:
-        return start_time, end_time
-
-    # Extract the first and last dates from the cached DataFrame
-    cached_df = cached_data["cached_df"]
-    first_cached = cached_df.index.min().replace(tzinfo=timezone.utc)
-    last_cached = cached_df.index.max().replace(tzinfo=timezone.utc)
-
-    # Determine the data needs
-    start_needed = start_time if start_time < first_cached else None
-    end_needed = end_time if end_time > last_cached else None
-
-    return start_needed, end_needed
-
-
-def get_last_n_items(cached_data, n):
-    # Ensure 'cached_df' exists in cached_data and is not empty
-    if (
-        cached_data is None
-        or "cached_df" not in cached_data
-        or cached_data["cached_df"].empty
-    ):
-        return []
-
-    # Get the last n items from the DataFrame
-    last_n_df = cached_data["cached_df"].tail(n).copy()
-
-    # Convert the index back to a column and convert dates to strings
-    last_n_df = last_n_df.reset_index()
-    if "date" in last_n_df.columns and pd.api.types.is_datetime64_any_dtype(
-        last_n_df["date"]
-    ):
-        last_n_df["date"] = last_n_df["date"].dt.strftime("%Y-%m-%d %H:%M:%S")
+def to_ns(value):
+    """Nanoseconds since epoch (naive UTC) of a datetime, date string or int."""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None)
+    return timestamp.value
 
-    # Convert the DataFrame to a list of dictionaries
-    data_to_return = last_n_df.to_dict("records")
 
-    return data_to_return
+def add_coverage(coverage, start, end):
+    """Add [start, end] to a sorted list of fetched ranges, merging overlaps."""
+    merged = []
+    for range_start, range_end in sorted([*map(tuple, coverage), (start, end)]):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    return merged
 
 
-def filter_data(cached_data, required_start_time, required_end_time):
-    # Ensure 'cached_df' exists in cached_data
-    if "cached_df" not in cached_data or cached_data["cached_df"].empty:
-        return []
+def determine_data_needs(coverage, start_time, end_time, tolerance=0):
+    """
+    Return the sub-ranges of [start_time, end_time] (as nanoseconds) missing
+    from `coverage`, the sorted ranges fetched so far. Gaps shorter than
+    `tolerance` (usually one candle) cannot hold a candle and are skipped.
+    """
+    start_time, end_time = to_ns(start_time), to_ns(end_time)
 
-    # Convert start and end times to datetime
-    required_start_time = pd.to_datetime(required_start_time)
-    required_end_time = pd.to_datetime(required_end_time)
+    missing = []
+    cursor = start_time
+    for range_start, range_end in coverage:
+        if range_end < cursor:
+            continue
+        if range_start > end_time:
+            break
+        if range_start > cursor:
+            missing.append((cursor, range_start))
+        cursor = max(cursor, range_end)
 
-    if required_start_time.tzinfo is not None:
-        required_start_time = required_start_time.tz_convert(None)
-    if required_end_time.tzinfo is not None:
-        required_end_time = required_end_time.tz_convert(None)
+    if cursor < end_time:
+        missing.append((cursor, end_time))
 
-    # Filter cached_df within the required time range
-    filtered_df = (
-        cached_data["cached_df"].loc[required_start_time:required_end_time].copy()
-    )
+    return [(s, e) for s, e in missing if e - s >= tolerance]
 
-    # Convert the index back to a column and convert dates to strings
-    filtered_df = filtered_df.reset_index()
-    filtered_df["date"] = filtered_df["date"].dt.strftime("%Y-%m-%d %H:%M:%S")
 
-    # Convert the filtered DataFrame to a list of dictionaries
-    data_to_return = filtered_df.to_dict("records")
+def parse_interval(interval):
+    """Split an interval like "45m", "3h", "2d", "1w" or "1M" into (count, unit)."""
+    match = re.fullmatch(r"([1-9][0-9]*)([mhdwM])", str(interval))
+    if not match:
+        raise ValueError(f"Unsupported interval {interval}")
+    return int(match.group(1)), match.group(2)
 
-    return data_to_return
 
+def get_interval_duration(interval):
+    # Return the duration in minutes for a given interval (0 if unknown)
+    try:
+        count, unit = parse_interval(interval)
+    except ValueError:
+        return 0
+    return count * INTERVAL_UNIT_MINUTES[unit]
 
-def filter_df(df, required_start_time, required_end_time):
-    # Convert start and end times to datetime
-    required_start_time = pd.to_datetime(required_start_time)
-    required_end_time = pd.to_datetime(required_end_time)
-
-    if required_start_time.tzinfo is not None:
-        required_start_time = required_start_time.tz_convert(None)
-    if required_end_time.tzinfo is not None:
-        required_end_time = required_end_time.tz_convert(None)
-
-    # Filter cached_df within the required time range
-    filtered_df = df.loc[required_start_time:required_end_time].copy()
 
-    # Convert the index back to a column and convert dates to strings
-    filtered_df = filtered_df.reset_index()
-    filtered_df["date"] = filtered_df["date"].dt.strftime("%Y-%m-%d %H:%M:%S")
+def candle_starts(dates, interval):
+    """
+    Open times (int64 ns) of the `interval` candles the `dates` (int64 ns)
+    fall into. Candles are aligned to the epoch, weeks start on Monday and
+    months on a multiple of `count` months since year 0.
+    """
+    count, unit = parse_interval(interval)
+    dates = np.asarray(dates, dtype=np.int64)
 
-    return filtered_df
+    if unit == "M":
+        months = dates.view("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+        months -= (months + 1970 * 12) % count
+        return months.astype("datetime64[M]").astype("datetime64[ns]").view(np.int64)
 
-
-def get_interval_duration(interval):
-    # Return the duration in minutes for a given interval
-    interval_to_minutes = {
-        "1m": 1,
-        "3m": 3,
-        "5m": 5,
-        "15m": 15,
-        "30m": 30,
-        "1h": 60,
-        "2h": 120,
-        "4h": 240,
-        "6h": 360,
-        "8h": 480,
-        "12h": 720,
-        "1d": 1440,
-        "1w": 10080,
-        "1M": 43800,
-    }
-    return interval_to_minutes.get(interval, 0)
+    step = count * INTERVAL_UNIT_MINUTES[unit] * 60 * 10**9
+    origin = WEEK_ORIGIN_NS if unit == "w" else 0
+    return dates - (dates - origin) % step
 
 
 def get_lookback_period(interval, from_time=datetime.utcnow(), count=300):
-    # Mapping interval names to their total minutes
-    interval_to_minutes = {
-        "1m": 1,
-        "3m": 3,
-        "5m": 5,
-        "15m": 15,
-        "30m": 30,
-        "1h": 60,
-        "2h": 120,
-        "4h": 240,
-        "6h": 360,
-        "8h": 480,
-        "12h": 720,
-        "1d": 1440,
-        "1w": 10080,
-        "1M": 43800,  # Approximate average month in minutes (30.44 days)
-    }
-
-    minutes = interval_to_minutes.get(interval)
+    minutes = get_interval_duration(interval)
     if not minutes:
         raise ValueError("Unsupported interval")
 
@@ -196,47 +145,14 @@ def get_lookback_period(interval, from_time=datetime.utcnow(), count=300):
 
 
 def get_current_date(interval):
-    intervals = {
-        "1m": 1,
-        "3m": 3,
-        "5m": 5,
-        "15m": 15,
-        "30m": 30,
-        "1h": 60,
-        "2h": 120,
-        "4h": 240,
-        "6h": 360,
-        "8h": 480,
-        "12h": 720,
-        "1d": 1440,
-        "1w": 10080,
-        "1M": 43800,
-    }
-
-    now = datetime.now(timezone.utc)
-
-    if interval not in intervals:
+    if not get_interval_duration(interval):
         raise ValueError(
-            f"Interval {interval} is not recognized. Please use one of {list(intervals.keys())}"
+            f"Interval {interval} is not recognized. Please use e.g. 1m, 45m, 3h, 1d, 1w or 1M"
         )
 
-    minutes = intervals[interval]
-
-    if interval == "1M":  # Special case for monthly interval
-        start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        return start_of_month.strftime("%Y-%m-%d %H:%M:%S")
-
-    if interval == "1w":  # Special case for weekly interval
-        start_of_week = now - timedelta(days=now.weekday())
-        start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-        return start_of_week.strftime("%Y-%m-%d %H:%M:%S")
-
-    # For all other intervals
-    delta = timedelta(minutes=minutes)
-    current_candle_start = (
-        now - (now - datetime.min.replace(tzinfo=timezone.utc)) % delta
-    )
-    return current_candle_start.strftime("%Y-%m-%d %H:%M:%S")
+    now = pd.Timestamp.now(tz="UTC").tz_convert(None).value
+    current_candle_start = candle_starts([now], interval)[0]
+    return pd.Timestamp(current_candle_start).strftime("%Y-%m-%d %H:%M:%S")
 
 
 def generate_method_key(method_name, *args, **kwargs):
@@ -61,6 +61,10 @@ export class DataProvider {
     if (config && config.url) {
       const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
       this.config.full_url = `${protocol}//${config.url}/websocket/`;
+      if (config.protocol) {
+        // "columnar" or "binary" wire format for chart data
+        this.config.full_url += `?protocol=${config.protocol}`;
+      }
       this.initServerConnection();
     }
   }
@@ -12,6 +12,57 @@
  * For full details, see the LICENSE.md file in the root directory of this project.
  */
 
+// Chart data can arrive columnar or as binary frames (see backend/app/protocol.py),
+// both are expanded back to rows of {date, "<key>": value}
+function formatDate(milliseconds) {
+  return new Date(milliseconds).toISOString().slice(0, 19).replace("T", " ");
+}
+
+function toRows(message, dates, columns) {
+  const keys = message.columns.map((c) => message.prefix + c);
+  const rows = dates.map((milliseconds, i) => {
+    const row = { date: formatDate(milliseconds) };
+    for (let c = 0; c < keys.length; c++) {
+      const value = columns[c][i];
+      row[keys[c]] = value === null || Number.isNaN(value) ? null : value;
+    }
+    return row;
+  });
+
+  const decoded = { ...message };
+  for (const key of ["format", "prefix", "columns", "date", "values", "rows"]) {
+    delete decoded[key];
+  }
+  decoded.data = message.type === "data_update" ? rows[0] : rows;
+  return decoded;
+}
+
+export function decodeMessage(data) {
+  if (data instanceof ArrayBuffer) {
+    const headerLength = new DataView(data).getUint32(0, true);
+    const header = JSON.parse(
+      new TextDecoder().decode(new Uint8Array(data, 4, headerLength)),
+    );
+    const offset = Math.ceil((4 + headerLength) / 8) * 8;
+    const rows = header.rows;
+    const dates = Array.from(new Float64Array(data, offset, rows));
+    const columns = header.columns.map(
+      (_, c) => new Float64Array(data, offset + 8 * rows * (c + 1), rows),
+    );
+    return toRows(header, dates, columns);
+  }
+
+  const message = JSON.parse(data);
+  if (message.format === "columnar") {
+    return toRows(
+      message,
+      message.date.map((seconds) => seconds * 1000),
+      message.values,
+    );
+  }
+  return message;
+}
+
 export class WebSocketManager {
   constructor(url, onopen) {
     this.url = url;
@@ -24,6 +75,7 @@ export class WebSocketManager {
   // Establishes the WebSocket connection
   connect(onopen) {
     this.websocket = new WebSocket(this.url);
+    this.websocket.binaryType = "arraybuffer";
 
     this.websocket.onopen = () => {
       onopen();
@@ -67,7 +119,7 @@ export class WebSocketManager {
 
     if (this.handler) {
       this.websocket.onmessage = (event) => {
-        this.handler(JSON.parse(event.data));
+        this.handler(decodeMessage(event.data));
       };
     }
   }